@@ -0,0 +1,379 @@
+# ASGI entry point:
+#
+#     uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#
+# Serves the existing Flask routes. Birth places in a JSON request body are geocoded
+# first with a non-blocking, pooled keep-alive HTTP client, so a request waiting on
+# the geocoder holds no thread. The route then runs in a worker thread and finds the
+# coordinates in the geocode cache. One process can keep hundreds of requests
+# waiting on the geocoder while a handful of threads do the ephemeris work. Lookups
+# have the blocking path's time budget, hedging and circuit breakers, and a place
+# whose lookup failed is reported by the route without another geocoder attempt.
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from geopy.exc import GeocoderQueryError, GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
+from geocoding import (BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS, GEOCODE_DEADLINE_SECONDS, GEOCODER_SECONDARY_URL,
+                       GEOCODER_URL, HEDGE_DELAY_SECONDS, MAX_ATTEMPTS, CircuitBreaker, cache_coordinates, cached_coordinates, geocoder_bucket, is_retryable,
+                       remember_failure, secondary_geocoder_bucket)
+import main
+
+
+# Concurrent connections to the geocoder; further lookups wait (cheaply) for a free one.
+# httpx scans every pooled connection on each request, so very large pools get slow.
+GEOCODER_MAX_CONNECTIONS = int(os.environ.get("GEOCODER_MAX_CONNECTIONS", 32))
+GEOCODER_TIMEOUT = float(os.environ.get("GEOCODER_TIMEOUT", 10.0))
+
+# Threads running the Flask routes (CPU-bound chart work)
+EXECUTOR_THREADS = int(os.environ.get("ASGI_EXECUTOR_THREADS", 8))
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def birth_places(data, depth=0):
+    """Collect the "birth_place" strings anywhere in a decoded JSON request body"""
+    places = []
+    if depth > 4:
+        return places
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "birth_place" and isinstance(value, str):
+                places.append(value)
+            else:
+                places.extend(birth_places(value, depth + 1))
+    elif isinstance(data, list):
+        for value in data:
+            places.extend(birth_places(value, depth + 1))
+    return places
+
+
+class _AsyncProvider:
+    def __init__(self, base_url, bucket, breaker, max_connections, timeout):
+        """One geocoding provider of AsyncGeocoder: its connection pool, rate bucket and circuit breaker"""
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            headers={"User-Agent": "astrology_tool"}
+        )
+        self.bucket = bucket
+        self.breaker = breaker
+        # Lookups beyond the pool size wait here rather than in the pool's own request queue
+        self.slots = asyncio.Semaphore(max_connections)
+
+
+class AsyncGeocoder:
+    def __init__(self, base_url=GEOCODER_URL, max_connections=GEOCODER_MAX_CONNECTIONS, timeout=GEOCODER_TIMEOUT,
+                 secondary_url=GEOCODER_SECONDARY_URL, breakers=None, hedge_delay=HEDGE_DELAY_SECONDS,
+                 deadline=GEOCODE_DEADLINE_SECONDS):
+        """Nominatim client on pooled keep-alive HTTP connections, bounded like HedgedGeocoder
+
+        A lookup has a time budget of deadline seconds, which starts when its first
+        request gets a token from the rate bucket, so time spent queued behind other
+        lookups does not count. It goes to the first provider whose circuit breaker is
+        not open; if there is no answer after hedge_delay (or the provider failed), it
+        is also sent to the secondary provider, and the first answer wins. Transient
+        failures are retried with backoff within the budget. Requests already sent when
+        the lookup finishes complete in the background, so their outcome still counts
+        for the provider's breaker; queued ones are cancelled and give their token back.
+
+        Args:
+            breakers: CircuitBreaker per provider (primary, then secondary), to share
+                them with the blocking geocoding path; new ones by default
+        """
+        urls = [base_url] + ([secondary_url] if secondary_url else [])
+        buckets = [geocoder_bucket, secondary_geocoder_bucket]
+        breakers = breakers or [CircuitBreaker() for _ in urls]
+        self.providers = [_AsyncProvider(url, bucket, breaker, max_connections, timeout)
+                          for url, bucket, breaker in zip(urls, buckets, breakers)]
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+        self.hedged = 0
+        # Lookups in flight, so concurrent requests for one place share a request
+        self.pending = {}
+        # Provider requests still running after their lookup finished
+        self.background = set()
+
+    async def get_coordinates(self, location):
+        """Convert location name to latitude and longitude without blocking the event loop"""
+        coordinates = cached_coordinates(location)
+        if coordinates is not None:
+            return coordinates
+
+        lookup = self.pending.get(location)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._geocode(location))
+            self.pending[location] = lookup
+            lookup.add_done_callback(lambda _: self.pending.pop(location, None))
+        return await asyncio.shield(lookup)
+
+    async def _geocode(self, location):
+        """Look a place up within the time budget, hedging to the secondary provider
+
+        Failures are remembered for a few seconds, so the route that runs after this
+        lookup reports them instead of trying the geocoder again.
+        """
+        try:
+            return await self._hedged_lookup(location)
+        except ValueError as e:
+            remember_failure(location, e)
+            raise
+        except Exception as e:
+            remember_failure(location, e)
+            raise ValueError(f"Error getting coordinates: {e}")
+
+    async def _hedged_lookup(self, location):
+        loop = asyncio.get_running_loop()
+        # Set to the time the first request got its token, which starts the budget
+        granted = loop.create_future()
+        # Requests with an HTTP request outstanding
+        sending = set()
+        end = None
+        candidates = [provider for provider in self.providers if provider.breaker.available()]
+        pending = set()
+        errors = []
+        next_launch = loop.time()
+        try:
+            while True:
+                now = loop.time()
+                if candidates and (not pending or now >= next_launch):
+                    if pending:
+                        self.hedged += 1
+                    pending.add(asyncio.ensure_future(
+                        self._provider_lookup(candidates.pop(0), location, granted, sending)
+                    ))
+                    next_launch = now + self.hedge_delay
+                if not pending:
+                    if errors:
+                        raise errors[0]
+                    raise GeocoderUnavailable("No geocoding provider is available")
+                if end is None and granted.done():
+                    end = granted.result() + self.deadline
+                if end is not None and now >= end:
+                    raise GeocoderTimedOut(f"No geocoder answered within {self.deadline:g} s")
+
+                wake_times = [time for time in (end, next_launch if candidates else None) if time is not None]
+                timeout = min(wake_times) - now if wake_times else None
+                done, _ = await asyncio.wait(pending | ({granted} if end is None else set()), timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                done.discard(granted)
+                pending -= done
+                for request in done:
+                    error = request.exception()
+                    if error is None:
+                        return request.result()
+                    if not is_retryable(error):
+                        raise error
+                    errors.append(error)
+        finally:
+            for request in pending:
+                if request in sending:
+                    self.background.add(request)
+                    request.add_done_callback(self._request_finished)
+                else:
+                    request.cancel()
+
+    def _request_finished(self, request):
+        self.background.discard(request)
+        if not request.cancelled():
+            request.exception()  # retrieved, so an abandoned failure is not logged as unhandled
+
+    async def _provider_lookup(self, provider, location, granted=None, sending=None):
+        """Look a place up with one provider, retrying transient failures with jittered backoff like GeocodingScheduler"""
+        attempts = 0
+        while True:
+            try:
+                return await self._request(provider, location, granted, sending)
+            except Exception as e:
+                attempts += 1
+                if not is_retryable(e) or attempts >= MAX_ATTEMPTS or not provider.breaker.available():
+                    raise
+            await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempts)))
+
+    async def _request(self, provider, location, granted=None, sending=None):
+        """Query one provider, recording the outcome in its circuit breaker, and cache the coordinates
+
+        Args:
+            granted: Future set to the loop time once the request has its rate token
+            sending: Set holding the current task while the HTTP request is outstanding
+        """
+        async with provider.slots:
+            # Same request budget as the blocking path (the service's rate limit)
+            try:
+                await asyncio.sleep(provider.bucket.reserve())
+            except asyncio.CancelledError:
+                provider.bucket.refund()
+                raise
+            if granted is not None and not granted.done():
+                granted.set_result(asyncio.get_running_loop().time())
+            # Checked only now, so a queued request does not hold a half-open breaker's trial
+            if not provider.breaker.allow():
+                raise GeocoderUnavailable("The geocoding provider is unavailable")
+
+            task = asyncio.current_task()
+            if sending is not None:
+                sending.add(task)
+            try:
+                response = await provider.client.get("/search", params={"q": location, "format": "json", "limit": 1})
+            except httpx.TimeoutException as e:
+                provider.breaker.record_failure()
+                raise GeocoderTimedOut(str(e) or "Geocoder request timed out")
+            except httpx.HTTPError as e:
+                provider.breaker.record_failure()
+                raise GeocoderUnavailable(str(e) or type(e).__name__)
+            except BaseException:
+                provider.breaker.record_failure()
+                raise
+            finally:
+                if sending is not None:
+                    sending.discard(task)
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                provider.bucket.pause(int(retry_after))
+            provider.breaker.record_failure()
+            raise GeocoderRateLimited(f"HTTP {response.status_code}")
+        if response.status_code >= 500:
+            provider.breaker.record_failure()
+            raise GeocoderUnavailable(f"HTTP {response.status_code}")
+        provider.breaker.record_success()
+        if response.status_code >= 400:
+            raise GeocoderQueryError(f"HTTP {response.status_code}")
+
+        results = response.json()
+        if not results:
+            raise ValueError(f"Could not find coordinates for location: {location}")
+        latitude, longitude = float(results[0]["lat"]), float(results[0]["lon"])
+        cache_coordinates(location, latitude, longitude)
+        return latitude, longitude
+
+    async def aclose(self):
+        for request in list(self.background):
+            request.cancel()
+        for provider in self.providers:
+            await provider.client.aclose()
+
+
+class AsyncChartApp:
+    def __init__(self, wsgi_app, geocoder=None, executor=None):
+        """ASGI adapter around a WSGI app that resolves birth places before running the route"""
+        self.wsgi_app = wsgi_app
+        self.geocoder = geocoder or AsyncGeocoder()
+        self.executor = executor or ThreadPoolExecutor(max_workers=EXECUTOR_THREADS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.handle_http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        """Warm up before accepting requests and close the connection pool on shutdown"""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.get_running_loop().run_in_executor(self.executor, main.warm_up)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.geocoder.aclose()
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle_http(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if len(body) > MAX_BODY_BYTES:
+                await self.send_response(send, 413, [(b"content-type", b"application/json")],
+                                         [json.dumps({"error": "Request body too large"}).encode("utf-8")])
+                return
+            if not message.get("more_body"):
+                break
+
+        await self.resolve_birth_places(scope, body)
+
+        status, headers, chunks = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.run_wsgi, scope, body
+        )
+        await self.send_response(send, status, headers, chunks)
+
+    async def resolve_birth_places(self, scope, body):
+        """Geocode the birth places of a JSON request concurrently and fill the geocode cache
+
+        Failures are left for the route, which reports them in its usual format.
+        """
+        if scope["method"] != "POST" or not body:
+            return
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return
+
+        places = set(birth_places(data))
+        if places:
+            await asyncio.gather(*(self.geocoder.get_coordinates(place) for place in places), return_exceptions=True)
+
+    def run_wsgi(self, scope, body):
+        """Run the WSGI app for one request and collect its response"""
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", ""),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name != "CONTENT_LENGTH":
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            chunks = list(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response["status"], response["headers"], chunks
+
+    async def send_response(self, send, status, headers, chunks):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"".join(chunks)})
+
+
+# The async lookups share the blocking path's circuit breakers, so a provider that fails
+# on one path is skipped on both
+app = AsyncChartApp(main.app, AsyncGeocoder(
+    breakers=[provider.breaker for provider in main.tool.hedged_geocoding.providers]
+))
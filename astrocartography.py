@@ -0,0 +1,172 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import swisseph as swe
+import ephemeris
+
+
+# Angle codes used in angularity grids
+ANGLES = ["ASC", "MC", "DSC", "IC"]
+
+# Process pools used to fan grid bands out across cores, one per worker count. They
+# live as long as the process, so a pool is never shut down while a grid is using it.
+_process_pools = {}
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(workers):
+    """Get the shared process pool with this many workers"""
+    with _process_pool_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = _process_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def wrap_longitude(angle):
+    """Wrap angles in degrees to geographic longitudes in [-180, 180)"""
+    return np.mod(np.asarray(angle) + 180.0, 360.0) - 180.0
+
+
+def rising_hour_angles(latitudes, declinations):
+    """Semi-diurnal arcs in degrees (hour angle of setting) for each latitude and declination
+
+    Returns NaN where the body never rises or never sets at that latitude.
+    """
+    tangents = -np.tan(np.radians(latitudes)) * np.tan(np.radians(declinations))
+    with np.errstate(invalid="ignore"):
+        return np.degrees(np.arccos(np.where(np.abs(tangents) <= 1, tangents, np.nan)))
+
+
+def angularity_band(latitudes, longitudes, right_ascensions, declinations, sidereal_degrees, orb):
+    """Find the nearest angle to each planet over a band of a latitude/longitude grid
+
+    Distances are measured in degrees of hour angle (the east-west distance to the
+    planet's line). Cells further than the orb from every line get angle -1.
+
+    Returns:
+        Tuple (angles, distances), each shaped (planets, latitudes, longitudes)
+    """
+    lat = np.asarray(latitudes, dtype=float)[None, :, None]
+    lon = np.asarray(longitudes, dtype=float)[None, None, :]
+    ra = np.asarray(right_ascensions, dtype=float)[:, None, None]
+    dec = np.asarray(declinations, dtype=float)[:, None, None]
+
+    # Local hour angle of each planet at each cell
+    hour_angles, semi_arcs = np.broadcast_arrays(
+        wrap_longitude(sidereal_degrees + lon - ra), rising_hour_angles(lat, dec)
+    )
+
+    # Keep a running minimum over the four angles instead of stacking them
+    angle_distances = [
+        lambda: np.abs(wrap_longitude(hour_angles + semi_arcs)),  # ASC: rising at hour angle -semi_arc
+        lambda: np.abs(hour_angles),                              # MC: hour angle 0
+        lambda: np.abs(wrap_longitude(hour_angles - semi_arcs)),  # DSC: setting at hour angle +semi_arc
+        lambda: 180.0 - np.abs(hour_angles)                       # IC: hour angle 180
+    ]
+    nearest = np.zeros(hour_angles.shape, dtype=np.int8)
+    nearest_distance = np.full(hour_angles.shape, np.inf)
+    for index, angle_distance in enumerate(angle_distances):
+        distance = angle_distance()
+        closer = distance < nearest_distance  # NaN (never rises or sets) is never closer
+        nearest[closer] = index
+        nearest_distance[closer] = distance[closer]
+
+    nearest[nearest_distance > orb] = -1
+    return nearest, nearest_distance.astype(np.float32)
+
+
+class Astrocartography:
+    def __init__(self, tool):
+        self.tool = tool
+
+    def planet_coordinates(self, jd):
+        """Get right ascension and declination of each planet and the Greenwich sidereal time in degrees"""
+        names = []
+        right_ascensions = []
+        declinations = []
+        for planet_id, planet_name in self.tool.planets.items():
+            result, _ = ephemeris.calc_ut(jd, planet_id, swe.FLG_SWIEPH | swe.FLG_EQUATORIAL)
+            names.append(planet_name)
+            right_ascensions.append(result[0])
+            declinations.append(result[1])
+
+        sidereal_degrees = ephemeris.sidtime(jd) * 15.0
+        return names, np.array(right_ascensions), np.array(declinations), sidereal_degrees
+
+    def angle_lines(self, jd, latitude_step=1.0):
+        """Compute each planet's ASC, MC, DSC and IC lines analytically
+
+        MC and IC lines are meridians, returned as a single longitude. ASC and DSC lines
+        are returned as [latitude, longitude] points; latitudes where the planet is
+        circumpolar (never rises or sets) are left out.
+        """
+        names, right_ascensions, declinations, sidereal_degrees = self.planet_coordinates(jd)
+        latitudes = np.arange(-90.0 + latitude_step, 90.0, latitude_step)
+
+        # Hour angle is sidereal time + longitude - RA, so a planet is on the meridian
+        # at longitude RA - sidereal time and rises at hour angle -semi_arc
+        meridians = wrap_longitude(right_ascensions - sidereal_degrees)
+        semi_arcs = rising_hour_angles(latitudes[None, :], declinations[:, None])
+        rising = wrap_longitude(meridians[:, None] - semi_arcs)
+        setting = wrap_longitude(meridians[:, None] + semi_arcs)
+
+        lines = {}
+        for i, planet_name in enumerate(names):
+            visible = ~np.isnan(semi_arcs[i])
+            lines[planet_name] = {
+                "MC": float(meridians[i]),
+                "IC": float(wrap_longitude(meridians[i] + 180.0)),
+                "ASC": np.column_stack([latitudes[visible], rising[i][visible]]).round(3).tolist(),
+                "DSC": np.column_stack([latitudes[visible], setting[i][visible]]).round(3).tolist()
+            }
+
+        print(f"Astrocartography lines computed for {len(names)} planets.")
+        return lines
+
+    def angularity_grid(self, jd, resolution=1.0, orb=2.0, workers=1):
+        """Find where on Earth each planet is angular over a latitude/longitude grid
+
+        The grid is split into latitude bands that are evaluated in parallel when
+        workers > 1.
+
+        Returns:
+            Dictionary with the grid latitudes and longitudes, the planet names, and
+            arrays "angles" (index into ANGLES, -1 when not within orb) and
+            "distances", both shaped (planets, latitudes, longitudes)
+        """
+        names, right_ascensions, declinations, sidereal_degrees = self.planet_coordinates(jd)
+        latitudes = np.arange(-90.0 + resolution / 2, 90.0, resolution)
+        longitudes = np.arange(-180.0 + resolution / 2, 180.0, resolution)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1:
+            angles, distances = angularity_band(
+                latitudes, longitudes, right_ascensions, declinations, sidereal_degrees, orb
+            )
+        else:
+            bands = np.array_split(latitudes, workers * 4)
+            pool = _get_process_pool(workers)
+            results = list(pool.map(
+                angularity_band,
+                bands,
+                [longitudes] * len(bands),
+                [right_ascensions] * len(bands),
+                [declinations] * len(bands),
+                [sidereal_degrees] * len(bands),
+                [orb] * len(bands)
+            ))
+            angles = np.concatenate([band[0] for band in results], axis=1)
+            distances = np.concatenate([band[1] for band in results], axis=1)
+
+        print(f"Astrocartography grid computed: {len(latitudes)}x{len(longitudes)} cells, {len(names)} planets.")
+        return {
+            "planets": names,
+            "latitudes": latitudes,
+            "longitudes": longitudes,
+            "angles": angles,
+            "distances": distances
+        }
@@ -1,151 +1,526 @@
 import datetime
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+from collections import OrderedDict
+from types import MappingProxyType
 import pytz
 import math
 from timezonefinder import TimezoneFinder
 from geopy.geocoders import Nominatim
 import swisseph as swe
+import ephemeris
 import matplotlib.pyplot as plt
 import numpy as np
+from event_calendar import EventCalendar
+from house_lookup import chart_cusps, house_of, houses_for_longitudes
+from singleflight import SingleFlight, private_directory
+from geocoding import (GEOCODER_SECONDARY_URL, GEOCODER_URL, INTERACTIVE, GeocodingScheduler, HedgedGeocoder,
+                       cached_coordinates, recent_failure, secondary_geocoder_bucket)
+
+
+# Transiting positions depend only on the date, so every weekly prediction for the
+# same days shares one process-wide table instead of recomputing them per user.
+TRANSIT_TABLE_MAX_DAYS = 400
+_transit_table = OrderedDict()
+_transit_table_lock = threading.Lock()
+
+# Finished weekly predictions, keyed by (natal chart hash, week start date)
+WEEKLY_PREDICTION_CACHE_SIZE = 1024
+_weekly_prediction_cache = OrderedDict()
+_weekly_prediction_cache_lock = threading.Lock()
+
+# Finished compatibility analyses, keyed by the pair of chart hashes in sorted order
+# and stored with the hash of their person 1; hit and miss counts for the metrics
+COMPATIBILITY_CACHE_SIZE = 4096
+_compatibility_cache = OrderedDict()
+_compatibility_cache_lock = threading.Lock()
+_compatibility_cache_counts = {"hits": 0, "reversed_hits": 0, "misses": 0}
+
+# Values (pairs x planet pairs x aspects) computed at a time when scoring a group's synastry
+COMPATIBILITY_BATCH_VALUES = 2 ** 22
+
+
+def chart_hash(chart):
+    """Content hash of a birth chart's positional data (planets, ascendant and house cusps)"""
+    chart_data = chart["chart_data"]
+    content = {
+        "planets": {name: round(data["longitude"], 6) for name, data in chart_data["planets"].items()},
+        "ascendant": round(chart_data["ascendant"]["degree"], 6),
+        "houses": [round(cusp, 6) for _, cusp in sorted(chart_data["houses"].items(), key=lambda item: int(item[0]))]
+    }
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def birth_coordinates(chart):
+    """Geocoded (latitude, longitude) of a chart's birth place, at full precision
+
+    Charts built before birth_info carried the numbers (such as older batch output)
+    only have the rounded "coordinates" text, which is parsed instead.
+    """
+    birth_info = chart["birth_info"]
+    if "latitude" in birth_info:
+        return float(birth_info["latitude"]), float(birth_info["longitude"])
+    latitude, longitude = (float(part) for part in birth_info["coordinates"].split(","))
+    return latitude, longitude
+
+
+def compatibility_cache_stats():
+    """Hit and miss counts, hit rate and size of this process's compatibility cache"""
+    with _compatibility_cache_lock:
+        counts = dict(_compatibility_cache_counts)
+        size = len(_compatibility_cache)
+    lookups = counts["hits"] + counts["reversed_hits"] + counts["misses"]
+    hit_rate = (counts["hits"] + counts["reversed_hits"]) / lookups if lookups else 0.0
+    return dict(counts, lookups=lookups, hit_rate=round(hit_rate, 4), size=size, max_size=COMPATIBILITY_CACHE_SIZE)
+
+
+def _read_only(table):
+    """Wrap a (possibly nested) dict table in read-only mapping proxies"""
+    return MappingProxyType({
+        key: _read_only(value) if isinstance(value, dict) else value
+        for key, value in table.items()
+    })
+
+
+# Reference tables. They are built once per process and are read-only, so every
+# AstrologyTool instance shares them and forked workers keep them in shared pages.
+PLANETS = _read_only({
+    swe.SUN: "Sun",
+    swe.MOON: "Moon",
+    swe.MERCURY: "Mercury",
+    swe.VENUS: "Venus",
+    swe.MARS: "Mars",
+    swe.JUPITER: "Jupiter",
+    swe.SATURN: "Saturn",
+    swe.URANUS: "Uranus",
+    swe.NEPTUNE: "Neptune",
+    swe.PLUTO: "Pluto"
+})
+
+SIGNS = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+)
+SIGN_INDEX = MappingProxyType({sign: index for index, sign in enumerate(SIGNS)})
+
+ELEMENTS = ("Fire", "Earth", "Air", "Water")
+QUALITIES = ("Cardinal", "Fixed", "Mutable")
+
+# Element and quality of each sign by sign index (both cycles start at Aries)
+SIGN_ELEMENT_INDEX = np.arange(12) % len(ELEMENTS)
+SIGN_QUALITY_INDEX = np.arange(12) % len(QUALITIES)
+SIGN_ELEMENT_INDEX.flags.writeable = False
+SIGN_QUALITY_INDEX.flags.writeable = False
+
+SIGN_ELEMENTS = MappingProxyType({sign: ELEMENTS[SIGN_ELEMENT_INDEX[index]] for index, sign in enumerate(SIGNS)})
+SIGN_QUALITIES = MappingProxyType({sign: QUALITIES[SIGN_QUALITY_INDEX[index]] for index, sign in enumerate(SIGNS)})
+
+# Traditional sign rulers
+SIGN_RULERS = _read_only({
+    "Aries": "Mars",
+    "Taurus": "Venus",
+    "Gemini": "Mercury",
+    "Cancer": "Moon",
+    "Leo": "Sun",
+    "Virgo": "Mercury",
+    "Libra": "Venus",
+    "Scorpio": "Mars/Pluto",
+    "Sagittarius": "Jupiter",
+    "Capricorn": "Saturn",
+    "Aquarius": "Saturn/Uranus",
+    "Pisces": "Jupiter/Neptune"
+})
+
+HOUSE_MEANINGS = _read_only({
+    1: "Self, appearance, beginnings",
+    2: "Values, possessions, resources",
+    3: "Communication, siblings, short trips",
+    4: "Home, family, roots",
+    5: "Creativity, romance, children",
+    6: "Health, service, daily routine",
+    7: "Partnerships, marriage, open enemies",
+    8: "Transformation, shared resources, death",
+    9: "Higher education, philosophy, long journeys",
+    10: "Career, public reputation, authority",
+    11: "Friends, groups, hopes and wishes",
+    12: "Subconscious, isolation, hidden enemies"
+})
+
+PLANET_MEANINGS = _read_only({
+    "Sun": "Core identity, life purpose, vitality",
+    "Moon": "Emotions, instincts, subconscious patterns",
+    "Mercury": "Communication, thinking, learning",
+    "Venus": "Love, beauty, values, attraction",
+    "Mars": "Action, desire, energy, assertion",
+    "Jupiter": "Expansion, growth, abundance, wisdom",
+    "Saturn": "Structure, limitations, responsibility, time",
+    "Uranus": "Innovation, rebellion, sudden change",
+    "Neptune": "Dreams, spirituality, illusion, dissolution",
+    "Pluto": "Transformation, power, elimination, rebirth"
+})
+
+# Major aspects and their orbs
+ASPECTS = _read_only({
+    "Conjunction": {"angle": 0, "orb": 8, "nature": "Intensification"},
+    "Opposition": {"angle": 180, "orb": 8, "nature": "Tension, awareness"},
+    "Trine": {"angle": 120, "orb": 8, "nature": "Harmony, flow"},
+    "Square": {"angle": 90, "orb": 7, "nature": "Challenge, action"},
+    "Sextile": {"angle": 60, "orb": 6, "nature": "Opportunity, ease"}
+})
+
+# Sun sign traits, and gender-specific nuances (simplified and generalized)
+SUN_SIGN_TRAITS = _read_only({
+    "Aries": "courageous, energetic, and pioneering. You have a strong drive to initiate and lead. You're direct, enthusiastic, and can be impulsive at times.",
+    "Taurus": "reliable, patient, and practical. You value stability and comfort. You can be stubborn but also incredibly loyal and determined.",
+    "Gemini": "versatile, curious, and communicative. You love learning and sharing ideas. You seek variety and can adapt quickly to new situations.",
+    "Cancer": "nurturing, intuitive, and protective. You have strong emotional awareness and value security. Your home and family are central to your identity.",
+    "Leo": "confident, generous, and dramatic. You have natural leadership qualities and love to be appreciated. You're warm-hearted and enjoy creative expression.",
+    "Virgo": "analytical, meticulous, and practical. You have an eye for detail and a strong desire to be of service. You strive for improvement and perfection.",
+    "Libra": "diplomatic, fair-minded, and sociable. You seek harmony and balance in all things. Relationships and beauty are highly important to you.",
+    "Scorpio": "intense, passionate, and resourceful. You have powerful emotions and desires. You seek truth beneath the surface and can be transformative.",
+    "Sagittarius": "optimistic, freedom-loving, and philosophical. You seek meaning and adventure. You're honest, open-minded, and enjoy exploring new horizons.",
+    "Capricorn": "ambitious, disciplined, and responsible. You have strong determination and organizational skills. You're practical and work toward long-term goals.",
+    "Aquarius": "independent, original, and humanitarian. You think in innovative ways and value your uniqueness. You're drawn to progressive ideas and causes.",
+    "Pisces": "compassionate, imaginative, and intuitive. You're highly sensitive to energies around you. You're spiritual and can be artistic or musical."
+})
+
+SUN_SIGN_GENDER_TRAITS = _read_only({
+    "Male": {
+        "Aries": "You may express your Aries energy through direct action and leadership.",
+        "Taurus": "Your Taurus nature might manifest in a provider role and material security focus.",
+        "Gemini": "As a Gemini man, you may channel your communication skills into intellectual debates.",
+        "Cancer": "Your Cancer traits might be expressed through protective instincts and emotional depth.",
+        "Leo": "Your Leo qualities may show through pride in accomplishments and desire for recognition.",
+        "Virgo": "As a Virgo man, you might focus your analytical skills on practical problem-solving.",
+        "Libra": "Your Libra traits may appear in diplomatic approaches to relationships.",
+        "Scorpio": "Your Scorpio intensity might express through ambition and strategic thinking.",
+        "Sagittarius": "As a Sagittarius man, you may seek freedom through adventure and exploration.",
+        "Capricorn": "Your Capricorn nature might focus on career advancement and authority.",
+        "Aquarius": "Your Aquarius qualities may show through intellectual independence.",
+        "Pisces": "As a Pisces man, you might express your sensitivity through creative or spiritual pursuits."
+    },
+    "Female": {
+        "Aries": "You may express your Aries energy through pioneering initiatives and independence.",
+        "Taurus": "Your Taurus nature might manifest in appreciating beauty and creating comfort.",
+        "Gemini": "As a Gemini woman, you may use your communication skills in social connections.",
+        "Cancer": "Your Cancer traits might appear through nurturing and intuitive understanding.",
+        "Leo": "Your Leo qualities may show through creative self-expression and warm leadership.",
+        "Virgo": "As a Virgo woman, you might channel your detailed analysis into helping others.",
+        "Libra": "Your Libra traits may appear in creating harmony and aesthetic appreciation.",
+        "Scorpio": "Your Scorpio intensity might express through emotional depth and perception.",
+        "Sagittarius": "As a Sagittarius woman, you may seek truth through educational pursuits.",
+        "Capricorn": "Your Capricorn nature might focus on structured achievement and responsibility.",
+        "Aquarius": "Your Aquarius qualities may show through social activism and progressive thinking.",
+        "Pisces": "As a Pisces woman, you might express your compassion through empathy and intuition."
+    },
+    "Other": {
+        # Gender-neutral interpretations
+        "Aries": "Your Aries energy can manifest through self-directed initiative and courage.",
+        "Taurus": "Your Taurus nature might express through appreciation of sensory experiences.",
+        "Gemini": "Your Gemini traits can appear through versatile communication and adaptability.",
+        "Cancer": "Your Cancer qualities might show through emotional intelligence and creating safety.",
+        "Leo": "Your Leo energy can manifest through authentic self-expression and generosity.",
+        "Virgo": "Your Virgo traits might appear through skillful analysis and practical helpfulness.",
+        "Libra": "Your Libra nature can express through creating balance and fair mediation.",
+        "Scorpio": "Your Scorpio qualities might show through transformative insight and resourcefulness.",
+        "Sagittarius": "Your Sagittarius energy can manifest through philosophical exploration.",
+        "Capricorn": "Your Capricorn traits might appear through structured approach and integrity.",
+        "Aquarius": "Your Aquarius nature can express through innovative thinking and community focus.",
+        "Pisces": "Your Pisces qualities might show through intuitive understanding and compassion."
+    }
+})
+
+MOON_SIGN_INTERPRETATIONS = _read_only({
+    "Aries": "Your emotions are dynamic and quickly expressed. You react instinctively and may become impatient with subtle feelings. You need independence to process emotions.",
+    "Taurus": "Your emotional nature seeks stability and comfort. You process feelings slowly and thoroughly. Security and physical comfort help you feel emotionally balanced.",
+    "Gemini": "Your emotions connect to your thoughts. You process feelings through conversation and intellectual understanding. Emotional variety keeps you engaged.",
+    "Cancer": "Your emotional responses are deep and protective. You're highly sensitive to moods around you. Family connections provide emotional security.",
+    "Leo": "Your emotions are expressed dramatically and warmly. You need recognition for your feelings. Creative expression helps process emotional experiences.",
+    "Virgo": "Your emotional nature is careful and analytical. You process feelings by organizing and understanding them. Small acts of service help you feel emotionally balanced.",
+    "Libra": "Your emotions are tied to harmony in relationships. You process feelings through connection with others. Balance and beauty help calm emotional turbulence.",
+    "Scorpio": "Your emotional responses are intense and transformative. You feel deeply and may keep emotions private. Emotional truth and intimacy are essential to you.",
+    "Sagittarius": "Your emotional nature seeks meaning and expansion. You process feelings through philosophical understanding. Freedom helps you manage emotions.",
+    "Capricorn": "Your emotions are controlled and structured. You process feelings through practical action. Achievement helps you feel emotionally secure.",
+    "Aquarius": "Your emotional responses are unique and detached. You process feelings through intellectual understanding. Friendship and community support your emotional wellbeing.",
+    "Pisces": "Your emotional nature is fluid and compassionate. You absorb feelings from your environment. Spiritual connection helps you process emotional experiences."
+})
+
+ASCENDANT_INTERPRETATIONS = _read_only({
+    "Aries": "You appear direct, energetic, and self-motivated. First impressions show your confidence and pioneering spirit. You approach new situations with enthusiasm.",
+    "Taurus": "You appear reliable, steady, and practical. First impressions show your grounded nature. You approach new situations with patience and consideration.",
+    "Gemini": "You appear versatile, communicative, and curious. First impressions show your mental agility. You approach new situations with adaptability and questions.",
+    "Cancer": "You appear sensitive, nurturing, and protective. First impressions show your caring nature. You approach new situations with caution and emotional awareness.",
+    "Leo": "You appear confident, warm, and dramatic. First impressions show your expressive personality. You approach new situations with enthusiasm and creativity.",
+    "Virgo": "You appear analytical, helpful, and detailed. First impressions show your practical intelligence. You approach new situations with careful observation.",
+    "Libra": "You appear diplomatic, charming, and balanced. First impressions show your social grace. You approach new situations with fairness and consideration.",
+    "Scorpio": "You appear intense, mysterious, and perceptive. First impressions show your depth. You approach new situations with strategic awareness.",
+    "Sagittarius": "You appear optimistic, straightforward, and adventurous. First impressions show your expansive outlook. You approach new situations with enthusiasm.",
+    "Capricorn": "You appear responsible, ambitious, and reserved. First impressions show your composed nature. You approach new situations with strategic planning.",
+    "Aquarius": "You appear unique, innovative, and independent. First impressions show your originality. You approach new situations with fresh perspective.",
+    "Pisces": "You appear compassionate, dreamy, and gentle. First impressions show your sensitivity. You approach new situations with intuitive understanding."
+})
+
+MERCURY_INTERPRETATIONS = _read_only({
+    "Aries": "Your communication style is direct and assertive. You think quickly and enjoy mental challenges. You learn best through active engagement and competition.",
+    "Taurus": "Your communication style is deliberate and practical. You think thoroughly and value sensory information. You learn best through hands-on experience.",
+    "Gemini": "Your communication style is versatile and quick. You think in varied ways and enjoy gathering information. You learn best through conversation and variety.",
+    "Cancer": "Your communication style is empathetic and protective. You think with emotional awareness. You learn best in nurturing environments where you feel safe.",
+    "Leo": "Your communication style is expressive and confident. You think creatively and enjoy being heard. You learn best when recognized for your ideas.",
+    "Virgo": "Your communication style is precise and analytical. You think critically and notice details. You learn best through organized systems and practical application.",
+    "Libra": "Your communication style is diplomatic and considerate. You think with awareness of others' perspectives. You learn best through discussion and cooperation.",
+    "Scorpio": "Your communication style is intense and probing. You think deeply and seek hidden truths. You learn best through investigation and transformation.",
+    "Sagittarius": "Your communication style is enthusiastic and expansive. You think philosophically and optimistically. You learn best through exploration and meaning.",
+    "Capricorn": "Your communication style is structured and purposeful. You think strategically with long-term goals. You learn best through established methods.",
+    "Aquarius": "Your communication style is inventive and objective. You think in original ways that may seem unconventional. You learn best through experimentation.",
+    "Pisces": "Your communication style is intuitive and compassionate. You think imaginatively and absorb information. You learn best through creative association."
+})
+
+# Element compatibility scores (out of 10)
+ELEMENT_COMPATIBILITY = _read_only({
+    ("Fire", "Fire"): 8,    # Enthusiastic but can burn out
+    ("Fire", "Earth"): 4,   # Can be challenging but grounding
+    ("Fire", "Air"): 9,     # Excellent synergy and stimulation
+    ("Fire", "Water"): 3,   # Can create steam or extinguish
+
+    ("Earth", "Fire"): 4,   # Earth can contain fire or smother it
+    ("Earth", "Earth"): 7,  # Stable but can be too rigid
+    ("Earth", "Air"): 3,    # Difficult combination
+    ("Earth", "Water"): 8,  # Productive and nurturing
+
+    ("Air", "Fire"): 9,     # Air feeds fire, creates inspiration
+    ("Air", "Earth"): 3,    # Communication challenges
+    ("Air", "Air"): 7,      # Intellectual but may lack grounding
+    ("Air", "Water"): 5,    # Can be refreshing or stormy
+
+    ("Water", "Fire"): 3,   # Water can extinguish fire's enthusiasm
+    ("Water", "Earth"): 8,  # Nurturing and productive
+    ("Water", "Air"): 5,    # Emotional understanding challenges
+    ("Water", "Water"): 9,  # Deep emotional connection but can be overwhelming
+})
+
+# Quality compatibility scores (out of 10)
+QUALITY_COMPATIBILITY = _read_only({
+    ("Cardinal", "Cardinal"): 5,  # Dynamic but challenging
+    ("Cardinal", "Fixed"): 7,     # Balance between action and stability
+    ("Cardinal", "Mutable"): 8,   # Action and adaptation work well
+
+    ("Fixed", "Cardinal"): 7,     # Provides structure to initiative
+    ("Fixed", "Fixed"): 4,        # Stable but stubborn combination
+    ("Fixed", "Mutable"): 6,      # Balance between stability and flexibility
+
+    ("Mutable", "Cardinal"): 8,   # Adaptability supports action
+    ("Mutable", "Fixed"): 6,      # Flexibility meets determination
+    ("Mutable", "Mutable"): 7,    # Adaptable but can lack direction
+})
+
+# Special aspects for relationships and their weights
+RELATIONSHIP_ASPECTS = _read_only({
+    # Sun-Moon connections are crucial for basic compatibility
+    "Sun-Moon": 15,
+    # Venus connections indicate love and attraction
+    "Venus-Venus": 12,
+    "Venus-Mars": 10,
+    "Venus-Sun": 8,
+    "Venus-Moon": 8,
+    # Mars connections indicate physical chemistry
+    "Mars-Mars": 7,
+    "Mars-Moon": 6,
+    "Mars-Sun": 6,
+    # Mercury connections indicate communication
+    "Mercury-Mercury": 9,
+    "Mercury-Sun": 5,
+    "Mercury-Moon": 5,
+})
+
+# Aspect weights for relationship compatibility
+ASPECT_WEIGHTS = _read_only({
+    "Conjunction": 10,
+    "Opposition": 5,
+    "Trine": 8,
+    "Square": 3,
+    "Sextile": 7
+})
+
+
+def _sign_pair_text(element_score, quality_score):
+    """Describe a pair of signs from its element and quality compatibility scores"""
+    if element_score >= 8:
+        element_text = "strong natural harmony"
+    elif element_score >= 6:
+        element_text = "good compatibility"
+    elif element_score >= 4:
+        element_text = "moderate interaction"
+    else:
+        element_text = "potential challenges"
+
+    if quality_score >= 7:
+        quality_text = "complementary approaches"
+    elif quality_score >= 5:
+        quality_text = "workable dynamics"
+    else:
+        quality_text = "potential friction in approaches"
+
+    return f"{element_text} with {quality_text}"
+
+
+def _is_batch(signs):
+    """Whether sign indices given as {point: indices} are arrays (many pairs) rather than ints"""
+    return isinstance(next(iter(signs.values())), np.ndarray)
+
+
+def _round_scores(scores, low=None, high=None):
+    """Round a score, or an array of scores, to whole numbers and clip it to [low, high]"""
+    if isinstance(scores, np.ndarray):
+        scores = np.round(scores)
+        return scores if low is None else np.clip(scores, low, high)
+    score = round(float(scores))
+    return score if low is None else max(low, min(high, score))
+
+
+def _read_only_array(values):
+    array = np.array(values)
+    array.flags.writeable = False
+    return array
+
+
+# Sign-pair tables for compatibility scoring, indexed [person 1 sign index, person 2 sign index].
+# There are only 144 sign pairs, so every score and text is computed once here.
+
+# Relationship score by number of signs apart: conjunction, semisextile, sextile, square,
+# trine, quincunx, opposition, then the same distances counted the other way
+SIGN_DISTANCE_SCORES = _read_only_array([0.9, 0.5, 0.7, 0.4, 0.9, 0.3, 0.6, 0.3, 0.9, 0.4, 0.7, 0.5])
+SIGN_RELATIONSHIP_SCORES = _read_only_array(
+    SIGN_DISTANCE_SCORES[(np.arange(12)[None, :] - np.arange(12)[:, None]) % 12]
+)
+
+SIGN_ELEMENT_SCORES = _read_only_array([
+    [ELEMENT_COMPATIBILITY[(ELEMENTS[SIGN_ELEMENT_INDEX[sign1]], ELEMENTS[SIGN_ELEMENT_INDEX[sign2]])]
+     for sign2 in range(12)]
+    for sign1 in range(12)
+])
+SIGN_QUALITY_SCORES = _read_only_array([
+    [QUALITY_COMPATIBILITY[(QUALITIES[SIGN_QUALITY_INDEX[sign1]], QUALITIES[SIGN_QUALITY_INDEX[sign2]])]
+     for sign2 in range(12)]
+    for sign1 in range(12)
+])
+SAME_ELEMENT_SIGNS = _read_only_array(SIGN_ELEMENT_INDEX[:, None] == SIGN_ELEMENT_INDEX[None, :])
+
+# Complementary signs (especially for Mercury): different elements with well-matched qualities
+COMPLEMENTARY_SIGNS = _read_only_array(~SAME_ELEMENT_SIGNS & (SIGN_QUALITY_SCORES >= 7))
+
+# The same tables keyed by (sign index, sign index) with plain Python values, for scoring
+# a single pair without NumPy scalar overhead
+def _pair_dict(table):
+    return MappingProxyType({(sign1, sign2): value for sign1, row in enumerate(table.tolist())
+                             for sign2, value in enumerate(row)})
+
+
+SIGN_PAIR_LOOKUPS = MappingProxyType({
+    "relationship": _pair_dict(SIGN_RELATIONSHIP_SCORES),
+    "element": _pair_dict(SIGN_ELEMENT_SCORES),
+    "same_element": _pair_dict(SAME_ELEMENT_SIGNS),
+    "complementary": _pair_dict(COMPLEMENTARY_SIGNS)
+})
+
+# Points whose signs the compatibility scores use
+COMPATIBILITY_POINTS = ("Sun", "Moon", "Mercury", "Venus", "Mars", "Ascendant")
+
+SIGN_PAIR_TEXTS = tuple(
+    tuple(_sign_pair_text(SIGN_ELEMENT_SCORES[sign1, sign2], SIGN_QUALITY_SCORES[sign1, sign2])
+          for sign2 in range(12))
+    for sign1 in range(12)
+)
 
 
 class AstrologyTool:
     def __init__(self):
-        # Initialize Swiss Ephemeris
-        swe.set_ephe_path()  # Uses default ephemeris path
+        # Initialize Swiss Ephemeris (the path is process-wide and set only once)
+        ephemeris.init_ephemeris()
         print("Swiss Ephemeris initialized.")
 
-        # Define planets
-        self.planets = {
-            swe.SUN: "Sun",
-            swe.MOON: "Moon",
-            swe.MERCURY: "Mercury",
-            swe.VENUS: "Venus",
-            swe.MARS: "Mars",
-            swe.JUPITER: "Jupiter",
-            swe.SATURN: "Saturn",
-            swe.URANUS: "Uranus",
-            swe.NEPTUNE: "Neptune",
-            swe.PLUTO: "Pluto"
-        }
-        print("Planets defined.")
-
-        # Define zodiac signs
-        self.signs = [
-            "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-            "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
-        ]
-        print("Zodiac signs defined.")
-
-        # Define sign rulers (traditional)
-        self.sign_rulers = {
-            "Aries": "Mars",
-            "Taurus": "Venus",
-            "Gemini": "Mercury",
-            "Cancer": "Moon",
-            "Leo": "Sun",
-            "Virgo": "Mercury",
-            "Libra": "Venus",
-            "Scorpio": "Mars/Pluto",
-            "Sagittarius": "Jupiter",
-            "Capricorn": "Saturn",
-            "Aquarius": "Saturn/Uranus",
-            "Pisces": "Jupiter/Neptune"
-        }
-        print("Sign rulers defined.")
-
-        # Define sign elements
-        self.sign_elements = {
-            "Aries": "Fire",
-            "Taurus": "Earth",
-            "Gemini": "Air",
-            "Cancer": "Water",
-            "Leo": "Fire",
-            "Virgo": "Earth",
-            "Libra": "Air",
-            "Scorpio": "Water",
-            "Sagittarius": "Fire",
-            "Capricorn": "Earth",
-            "Aquarius": "Air",
-            "Pisces": "Water"
-        }
-        print("Sign elements defined.")
-
-        # Define sign qualities
-        self.sign_qualities = {
-            "Aries": "Cardinal",
-            "Taurus": "Fixed",
-            "Gemini": "Mutable",
-            "Cancer": "Cardinal",
-            "Leo": "Fixed",
-            "Virgo": "Mutable",
-            "Libra": "Cardinal",
-            "Scorpio": "Fixed",
-            "Sagittarius": "Mutable",
-            "Capricorn": "Cardinal",
-            "Aquarius": "Fixed",
-            "Pisces": "Mutable"
-        }
-        print("Sign qualities defined.")
-
-        # Define house meanings
-        self.house_meanings = {
-            1: "Self, appearance, beginnings",
-            2: "Values, possessions, resources",
-            3: "Communication, siblings, short trips",
-            4: "Home, family, roots",
-            5: "Creativity, romance, children",
-            6: "Health, service, daily routine",
-            7: "Partnerships, marriage, open enemies",
-            8: "Transformation, shared resources, death",
-            9: "Higher education, philosophy, long journeys",
-            10: "Career, public reputation, authority",
-            11: "Friends, groups, hopes and wishes",
-            12: "Subconscious, isolation, hidden enemies"
-        }
-        print("House meanings defined.")
-
-        # Define planet meanings
-        self.planet_meanings = {
-            "Sun": "Core identity, life purpose, vitality",
-            "Moon": "Emotions, instincts, subconscious patterns",
-            "Mercury": "Communication, thinking, learning",
-            "Venus": "Love, beauty, values, attraction",
-            "Mars": "Action, desire, energy, assertion",
-            "Jupiter": "Expansion, growth, abundance, wisdom",
-            "Saturn": "Structure, limitations, responsibility, time",
-            "Uranus": "Innovation, rebellion, sudden change",
-            "Neptune": "Dreams, spirituality, illusion, dissolution",
-            "Pluto": "Transformation, power, elimination, rebirth"
-        }
-        print("Planet meanings defined.")
-
-        # Define major aspects and their orbs
-        self.aspects = {
-            "Conjunction": {"angle": 0, "orb": 8, "nature": "Intensification"},
-            "Opposition": {"angle": 180, "orb": 8, "nature": "Tension, awareness"},
-            "Trine": {"angle": 120, "orb": 8, "nature": "Harmony, flow"},
-            "Square": {"angle": 90, "orb": 7, "nature": "Challenge, action"},
-            "Sextile": {"angle": 60, "orb": 6, "nature": "Opportunity, ease"}
-        }
-        print("Major aspects defined.")
+        # Geocoder and timezone lookup shared by every request on this instance.
+        # TimezoneFinder keeps open data files, so lookups go through a lock.
+        geocoder = urlsplit(GEOCODER_URL)
+        self.geolocator = Nominatim(user_agent="astrology_tool", domain=geocoder.netloc, scheme=geocoder.scheme)
+        self.timezone_finder = TimezoneFinder()
+        self.timezone_finder_lock = threading.Lock()
+
+        # Geocoder requests are queued, deduplicated, paced to the service's rate limit
+        # and retried on transient errors; interactive lookups go before batch imports
+        self.geocoding = GeocodingScheduler(self.geolocator.geocode)
+
+        # Interactive lookups have a time budget and are hedged to the secondary
+        # provider (if configured) when the primary one is slow or unavailable
+        providers = [self.geocoding]
+        if GEOCODER_SECONDARY_URL:
+            secondary = urlsplit(GEOCODER_SECONDARY_URL)
+            secondary_geolocator = Nominatim(user_agent="astrology_tool", domain=secondary.netloc, scheme=secondary.scheme)
+            providers.append(GeocodingScheduler(secondary_geolocator.geocode, bucket=secondary_geocoder_bucket))
+        self.hedged_geocoding = HedgedGeocoder(providers)
+
+        # Concurrent identical geocoding, timezone and chart requests share one computation.
+        # With SINGLEFLIGHT_DIR set, geocoding and charts are also shared between processes;
+        # the directory must be private to the server's user. Charts that failed are not shared.
+        lock_dir = os.environ.get("SINGLEFLIGHT_DIR")
+        if lock_dir:
+            private_directory(lock_dir)
+        self.coordinates_flight = SingleFlight(lock_dir and os.path.join(lock_dir, "coordinates"))
+        self.timezone_flight = SingleFlight()
+        self.chart_flight = SingleFlight(lock_dir and os.path.join(lock_dir, "charts"),
+                                         shareable=lambda chart: "error" not in chart)
+
+        # Reference tables are shared module-level constants
+        self.planets = PLANETS
+        self.signs = SIGNS
+        self.sign_rulers = SIGN_RULERS
+        self.sign_elements = SIGN_ELEMENTS
+        self.sign_qualities = SIGN_QUALITIES
+        self.house_meanings = HOUSE_MEANINGS
+        self.planet_meanings = PLANET_MEANINGS
+        self.aspects = ASPECTS
+        print("Reference tables loaded.")
+
+        # Stations, ingresses and lunations, computed once per year and shared process-wide
+        self.event_calendar = EventCalendar(self)
+
+        # Compatibility tables are set up here so the instance is never modified afterwards
+        self.add_compatibility_analysis()
 
     def get_coordinates(self, location):
-        """Convert location name to latitude and longitude"""
-        geolocator = Nominatim(user_agent="astrology_tool")
+        """Convert location name to latitude and longitude
+
+        Concurrent lookups of the same place share one geocoder request, and a lookup
+        gives up after GEOCODE_DEADLINE_SECONDS. A place whose lookup just failed on the
+        ASGI path fails again at once.
+        """
+        coordinates = cached_coordinates(location)
+        if coordinates is not None:
+            return coordinates
+        error = recent_failure(location)
+        if error is not None:
+            raise ValueError(f"Error getting coordinates: {error}")
+        return self.coordinates_flight.do(location, self._geocode, location)
+
+    def _geocode(self, location):
+        """Look a place up with the geocoder and cache its coordinates"""
         try:
-            location_data = geolocator.geocode(location)
-            if location_data:
-                print(f"Coordinates found for {location}: {location_data.latitude}, {location_data.longitude}")
-                return location_data.latitude, location_data.longitude
-            else:
-                raise ValueError(f"Could not find coordinates for location: {location}")
+            latitude, longitude = self.hedged_geocoding.get(location, INTERACTIVE)
+            print(f"Coordinates found for {location}: {latitude}, {longitude}")
+            return latitude, longitude
         except Exception as e:
             raise ValueError(f"Error getting coordinates: {e}")
 
     def get_timezone(self, latitude, longitude):
         """Get timezone for given coordinates"""
-        tf = TimezoneFinder()
-        timezone_str = tf.timezone_at(lat=latitude, lng=longitude)
+        return self.timezone_flight.do((latitude, longitude), self._lookup_timezone, latitude, longitude)
+
+    def _lookup_timezone(self, latitude, longitude):
+        """Find the timezone containing a point"""
+        with self.timezone_finder_lock:
+            timezone_str = self.timezone_finder.timezone_at(lat=latitude, lng=longitude)
         if not timezone_str:
             raise ValueError("Could not determine timezone for the provided coordinates")
         print(f"Timezone determined: {timezone_str}")
@@ -155,6 +530,13 @@ class AstrologyTool:
         """Calculate Julian day for the birth date and time"""
         # Get timezone for the location
         timezone_str = self.get_timezone(latitude, longitude)
+        jd = self.local_time_to_julian_day(birth_date, birth_time, timezone_str)
+
+        print(f"Julian Day calculated: {jd}")
+        return jd, timezone_str
+
+    def local_time_to_julian_day(self, birth_date, birth_time, timezone_str):
+        """Convert a local date and time in a known timezone to a Julian day (UT)"""
         timezone = pytz.timezone(timezone_str)
 
         # Combine date and time
@@ -169,11 +551,8 @@ class AstrologyTool:
         utc_datetime = local_datetime.astimezone(pytz.UTC)
 
         # Calculate Julian day
-        jd = swe.julday(utc_datetime.year, utc_datetime.month, utc_datetime.day,
-                        utc_datetime.hour + utc_datetime.minute / 60.0 + utc_datetime.second / 3600.0)
-
-        print(f"Julian Day calculated: {jd}")
-        return jd, timezone_str
+        return swe.julday(utc_datetime.year, utc_datetime.month, utc_datetime.day,
+                          utc_datetime.hour + utc_datetime.minute / 60.0 + utc_datetime.second / 3600.0)
 
     def calculate_houses(self, jd, latitude, longitude):
         """Calculate the house cusps using Placidus system"""
@@ -181,7 +560,7 @@ class AstrologyTool:
         geolat, geolon = latitude, longitude
 
         # Calculate houses
-        houses = swe.houses(jd, geolat, geolon)[0]
+        houses = ephemeris.houses(jd, geolat, geolon)[0]
 
         # Calculate Ascendant and Midheaven
         ascendant = houses[0]
@@ -196,7 +575,7 @@ class AstrologyTool:
 
         for planet_id, planet_name in self.planets.items():
             # Calculate planet's position
-            result, _ = swe.calc_ut(jd, planet_id)
+            result, _ = ephemeris.calc_ut(jd, planet_id)
             print(f"Result for {planet_name}: {result}")  # Debugging line
 
             # Ensure result is a tuple and has the expected structure
@@ -210,7 +589,8 @@ class AstrologyTool:
                 planet_positions[planet_name] = {
                     "longitude": longitude,
                     "sign": self.signs[sign_num],
-                    "degree": sign_deg
+                    "degree": sign_deg,
+                    "speed": result[3]  # Degrees per day, negative when retrograde
                 }
             else:
                 print(f"Unexpected result format for {planet_name}: {result}")
@@ -260,100 +640,16 @@ class AstrologyTool:
 
     def assign_planets_to_houses(self, planet_positions, houses):
         """Assign planets to houses"""
-        planets_in_houses = {}
-
-        for house_num in range(1, 13):
-            planets_in_houses[house_num] = []
-
-            # House boundaries
-            house_start = houses[house_num - 1]
-            house_end = houses[house_num % 12]  # Wrap around to house 1 for house 12
-
-            # Handle house spanning 0° Aries
-            if house_end < house_start:
-                house_end += 360
-
-            # Check each planet
-            for planet, data in planet_positions.items():
-                planet_long = data["longitude"]
-
-                # Adjust longitude if house spans 0° Aries
-                if house_end > 360 and planet_long < house_end - 360:
-                    adjusted_long = planet_long + 360
-                else:
-                    adjusted_long = planet_long
-
-                # Check if planet is in this house
-                if house_start <= adjusted_long < house_end:
-                    planets_in_houses[house_num].append(planet)
+        # One chart's few planets: a binary search each is cheaper than building arrays
+        planets_in_houses = {house_num: [] for house_num in range(1, 13)}
+        for planet, position in planet_positions.items():
+            planets_in_houses[house_of(houses, position["longitude"])].append(planet)
 
         print("Planets assigned to houses.")
         return planets_in_houses
 
     def interpret_sun_sign(self, sign, gender):
         """Basic Sun sign interpretation with gender considerations"""
-        base_traits = {
-            "Aries": "courageous, energetic, and pioneering. You have a strong drive to initiate and lead. You're direct, enthusiastic, and can be impulsive at times.",
-            "Taurus": "reliable, patient, and practical. You value stability and comfort. You can be stubborn but also incredibly loyal and determined.",
-            "Gemini": "versatile, curious, and communicative. You love learning and sharing ideas. You seek variety and can adapt quickly to new situations.",
-            "Cancer": "nurturing, intuitive, and protective. You have strong emotional awareness and value security. Your home and family are central to your identity.",
-            "Leo": "confident, generous, and dramatic. You have natural leadership qualities and love to be appreciated. You're warm-hearted and enjoy creative expression.",
-            "Virgo": "analytical, meticulous, and practical. You have an eye for detail and a strong desire to be of service. You strive for improvement and perfection.",
-            "Libra": "diplomatic, fair-minded, and sociable. You seek harmony and balance in all things. Relationships and beauty are highly important to you.",
-            "Scorpio": "intense, passionate, and resourceful. You have powerful emotions and desires. You seek truth beneath the surface and can be transformative.",
-            "Sagittarius": "optimistic, freedom-loving, and philosophical. You seek meaning and adventure. You're honest, open-minded, and enjoy exploring new horizons.",
-            "Capricorn": "ambitious, disciplined, and responsible. You have strong determination and organizational skills. You're practical and work toward long-term goals.",
-            "Aquarius": "independent, original, and humanitarian. You think in innovative ways and value your uniqueness. You're drawn to progressive ideas and causes.",
-            "Pisces": "compassionate, imaginative, and intuitive. You're highly sensitive to energies around you. You're spiritual and can be artistic or musical."
-        }
-
-        # Gender-specific traits (simplified and generalized)
-        gender_traits = {
-            "Male": {
-                "Aries": "You may express your Aries energy through direct action and leadership.",
-                "Taurus": "Your Taurus nature might manifest in a provider role and material security focus.",
-                "Gemini": "As a Gemini man, you may channel your communication skills into intellectual debates.",
-                "Cancer": "Your Cancer traits might be expressed through protective instincts and emotional depth.",
-                "Leo": "Your Leo qualities may show through pride in accomplishments and desire for recognition.",
-                "Virgo": "As a Virgo man, you might focus your analytical skills on practical problem-solving.",
-                "Libra": "Your Libra traits may appear in diplomatic approaches to relationships.",
-                "Scorpio": "Your Scorpio intensity might express through ambition and strategic thinking.",
-                "Sagittarius": "As a Sagittarius man, you may seek freedom through adventure and exploration.",
-                "Capricorn": "Your Capricorn nature might focus on career advancement and authority.",
-                "Aquarius": "Your Aquarius qualities may show through intellectual independence.",
-                "Pisces": "As a Pisces man, you might express your sensitivity through creative or spiritual pursuits."
-            },
-            "Female": {
-                "Aries": "You may express your Aries energy through pioneering initiatives and independence.",
-                "Taurus": "Your Taurus nature might manifest in appreciating beauty and creating comfort.",
-                "Gemini": "As a Gemini woman, you may use your communication skills in social connections.",
-                "Cancer": "Your Cancer traits might appear through nurturing and intuitive understanding.",
-                "Leo": "Your Leo qualities may show through creative self-expression and warm leadership.",
-                "Virgo": "As a Virgo woman, you might channel your detailed analysis into helping others.",
-                "Libra": "Your Libra traits may appear in creating harmony and aesthetic appreciation.",
-                "Scorpio": "Your Scorpio intensity might express through emotional depth and perception.",
-                "Sagittarius": "As a Sagittarius woman, you may seek truth through educational pursuits.",
-                "Capricorn": "Your Capricorn nature might focus on structured achievement and responsibility.",
-                "Aquarius": "Your Aquarius qualities may show through social activism and progressive thinking.",
-                "Pisces": "As a Pisces woman, you might express your compassion through empathy and intuition."
-            },
-            "Other": {
-                # Gender-neutral interpretations
-                "Aries": "Your Aries energy can manifest through self-directed initiative and courage.",
-                "Taurus": "Your Taurus nature might express through appreciation of sensory experiences.",
-                "Gemini": "Your Gemini traits can appear through versatile communication and adaptability.",
-                "Cancer": "Your Cancer qualities might show through emotional intelligence and creating safety.",
-                "Leo": "Your Leo energy can manifest through authentic self-expression and generosity.",
-                "Virgo": "Your Virgo traits might appear through skillful analysis and practical helpfulness.",
-                "Libra": "Your Libra nature can express through creating balance and fair mediation.",
-                "Scorpio": "Your Scorpio qualities might show through transformative insight and resourcefulness.",
-                "Sagittarius": "Your Sagittarius energy can manifest through philosophical exploration.",
-                "Capricorn": "Your Capricorn traits might appear through structured approach and integrity.",
-                "Aquarius": "Your Aquarius nature can express through innovative thinking and community focus.",
-                "Pisces": "Your Pisces qualities might show through intuitive understanding and compassion."
-            }
-        }
-
         # Combine base interpretation with gender-specific nuance
         if gender.lower() in ["male", "m"]:
             gender_key = "Male"
@@ -362,66 +658,24 @@ class AstrologyTool:
         else:
             gender_key = "Other"
 
-        interpretation = f"As a {sign} Sun, you are {base_traits[sign]} {gender_traits[gender_key][sign]}"
+        interpretation = f"As a {sign} Sun, you are {SUN_SIGN_TRAITS[sign]} {SUN_SIGN_GENDER_TRAITS[gender_key][sign]}"
         print(f"Sun sign interpretation for {sign} ({gender}): {interpretation}")
         return interpretation
 
     def interpret_moon_sign(self, sign):
         """Basic Moon sign interpretation"""
-        interpretations = {
-            "Aries": "Your emotions are dynamic and quickly expressed. You react instinctively and may become impatient with subtle feelings. You need independence to process emotions.",
-            "Taurus": "Your emotional nature seeks stability and comfort. You process feelings slowly and thoroughly. Security and physical comfort help you feel emotionally balanced.",
-            "Gemini": "Your emotions connect to your thoughts. You process feelings through conversation and intellectual understanding. Emotional variety keeps you engaged.",
-            "Cancer": "Your emotional responses are deep and protective. You're highly sensitive to moods around you. Family connections provide emotional security.",
-            "Leo": "Your emotions are expressed dramatically and warmly. You need recognition for your feelings. Creative expression helps process emotional experiences.",
-            "Virgo": "Your emotional nature is careful and analytical. You process feelings by organizing and understanding them. Small acts of service help you feel emotionally balanced.",
-            "Libra": "Your emotions are tied to harmony in relationships. You process feelings through connection with others. Balance and beauty help calm emotional turbulence.",
-            "Scorpio": "Your emotional responses are intense and transformative. You feel deeply and may keep emotions private. Emotional truth and intimacy are essential to you.",
-            "Sagittarius": "Your emotional nature seeks meaning and expansion. You process feelings through philosophical understanding. Freedom helps you manage emotions.",
-            "Capricorn": "Your emotions are controlled and structured. You process feelings through practical action. Achievement helps you feel emotionally secure.",
-            "Aquarius": "Your emotional responses are unique and detached. You process feelings through intellectual understanding. Friendship and community support your emotional wellbeing.",
-            "Pisces": "Your emotional nature is fluid and compassionate. You absorb feelings from your environment. Spiritual connection helps you process emotional experiences."
-        }
-        print(f"Moon sign interpretation for {sign}: {interpretations[sign]}")
-        return interpretations[sign]
+        print(f"Moon sign interpretation for {sign}: {MOON_SIGN_INTERPRETATIONS[sign]}")
+        return MOON_SIGN_INTERPRETATIONS[sign]
 
     def interpret_ascendant(self, sign):
         """Basic Ascendant interpretation"""
-        interpretations = {
-            "Aries": "You appear direct, energetic, and self-motivated. First impressions show your confidence and pioneering spirit. You approach new situations with enthusiasm.",
-            "Taurus": "You appear reliable, steady, and practical. First impressions show your grounded nature. You approach new situations with patience and consideration.",
-            "Gemini": "You appear versatile, communicative, and curious. First impressions show your mental agility. You approach new situations with adaptability and questions.",
-            "Cancer": "You appear sensitive, nurturing, and protective. First impressions show your caring nature. You approach new situations with caution and emotional awareness.",
-            "Leo": "You appear confident, warm, and dramatic. First impressions show your expressive personality. You approach new situations with enthusiasm and creativity.",
-            "Virgo": "You appear analytical, helpful, and detailed. First impressions show your practical intelligence. You approach new situations with careful observation.",
-            "Libra": "You appear diplomatic, charming, and balanced. First impressions show your social grace. You approach new situations with fairness and consideration.",
-            "Scorpio": "You appear intense, mysterious, and perceptive. First impressions show your depth. You approach new situations with strategic awareness.",
-            "Sagittarius": "You appear optimistic, straightforward, and adventurous. First impressions show your expansive outlook. You approach new situations with enthusiasm.",
-            "Capricorn": "You appear responsible, ambitious, and reserved. First impressions show your composed nature. You approach new situations with strategic planning.",
-            "Aquarius": "You appear unique, innovative, and independent. First impressions show your originality. You approach new situations with fresh perspective.",
-            "Pisces": "You appear compassionate, dreamy, and gentle. First impressions show your sensitivity. You approach new situations with intuitive understanding."
-        }
-        print(f"Ascendant interpretation for {sign}: {interpretations[sign]}")
-        return interpretations[sign]
+        print(f"Ascendant interpretation for {sign}: {ASCENDANT_INTERPRETATIONS[sign]}")
+        return ASCENDANT_INTERPRETATIONS[sign]
 
     def interpret_mercury(self, sign):
         """Basic Mercury sign interpretation"""
-        interpretations = {
-            "Aries": "Your communication style is direct and assertive. You think quickly and enjoy mental challenges. You learn best through active engagement and competition.",
-            "Taurus": "Your communication style is deliberate and practical. You think thoroughly and value sensory information. You learn best through hands-on experience.",
-            "Gemini": "Your communication style is versatile and quick. You think in varied ways and enjoy gathering information. You learn best through conversation and variety.",
-            "Cancer": "Your communication style is empathetic and protective. You think with emotional awareness. You learn best in nurturing environments where you feel safe.",
-            "Leo": "Your communication style is expressive and confident. You think creatively and enjoy being heard. You learn best when recognized for your ideas.",
-            "Virgo": "Your communication style is precise and analytical. You think critically and notice details. You learn best through organized systems and practical application.",
-            "Libra": "Your communication style is diplomatic and considerate. You think with awareness of others' perspectives. You learn best through discussion and cooperation.",
-            "Scorpio": "Your communication style is intense and probing. You think deeply and seek hidden truths. You learn best through investigation and transformation.",
-            "Sagittarius": "Your communication style is enthusiastic and expansive. You think philosophically and optimistically. You learn best through exploration and meaning.",
-            "Capricorn": "Your communication style is structured and purposeful. You think strategically with long-term goals. You learn best through established methods.",
-            "Aquarius": "Your communication style is inventive and objective. You think in original ways that may seem unconventional. You learn best through experimentation.",
-            "Pisces": "Your communication style is intuitive and compassionate. You think imaginatively and absorb information. You learn best through creative association."
-        }
-        print(f"Mercury sign interpretation for {sign}: {interpretations[sign]}")
-        return interpretations[sign]
+        print(f"Mercury sign interpretation for {sign}: {MERCURY_INTERPRETATIONS[sign]}")
+        return MERCURY_INTERPRETATIONS[sign]
 
     def generate_basic_chart_interpretation(self, planet_positions, ascendant_sign, houses, planets_in_houses, aspects, gender):
         """Generate a basic interpretation of the birth chart"""
@@ -465,82 +719,128 @@ class AstrologyTool:
         return "\n\n".join(interpretation)
 
     def create_birth_chart(self, birth_date, birth_time, birth_place, gender):
-        """Create a birth chart from the provided information"""
-        try:
-            # Parse input
-            year, month, day = birth_date
-            hour, minute, second = birth_time
+        """Create a birth chart from the provided information
 
+        Concurrent requests for the same chart share one computation and get the same
+        result object, which callers must not modify.
+        """
+        key = (tuple(birth_date), tuple(birth_time), birth_place, gender)
+        return self.chart_flight.do(key, self._create_birth_chart, birth_date, birth_time, birth_place, gender)
+
+    def _create_birth_chart(self, birth_date, birth_time, birth_place, gender):
+        """Geocode the birth place and build the chart"""
+        try:
             # Get coordinates for birth place
             latitude, longitude = self.get_coordinates(birth_place)
 
             # Calculate Julian day
-            jd, timezone = self.calculate_julian_day((year, month, day), (hour, minute, second), latitude, longitude)
+            jd, timezone = self.calculate_julian_day(tuple(birth_date), tuple(birth_time), latitude, longitude)
 
-            # Calculate houses and angles
-            houses, ascendant, midheaven = self.calculate_houses(jd, latitude, longitude)
+            result = self.build_birth_chart(
+                birth_date, birth_time, birth_place, gender, latitude, longitude, jd, timezone
+            )
+
+            print("Birth chart created successfully.")
+            return result
+
+        except Exception as e:
+            print(f"Error creating birth chart: {e}")
+            return {"error": str(e)}
+
+    def build_birth_chart(self, birth_date, birth_time, birth_place, gender, latitude, longitude, jd, timezone,
+                          planet_positions=None):
+        """Build a birth chart for an already resolved place and Julian day
+
+        planet_positions can be passed in when they are already known (for example
+        interpolated during birth-time rectification) to skip the ephemeris.
+        """
+        # Parse input
+        year, month, day = birth_date
+        hour, minute, second = birth_time
+
+        # Calculate houses and angles
+        houses, ascendant, midheaven = self.calculate_houses(jd, latitude, longitude)
 
-            # Determine ascendant sign
-            asc_sign_num = int(ascendant / 30)
-            ascendant_sign = self.signs[asc_sign_num]
+        # Determine ascendant sign
+        asc_sign_num = int(ascendant / 30)
+        ascendant_sign = self.signs[asc_sign_num]
 
-            # Calculate planet positions
+        # Calculate planet positions
+        if planet_positions is None:
             planet_positions = self.calculate_planet_positions(jd)
 
-            # Calculate aspects
-            aspects = self.calculate_aspects(planet_positions)
+        # Calculate aspects
+        aspects = self.calculate_aspects(planet_positions)
 
-            # Assign planets to houses
-            planets_in_houses = self.assign_planets_to_houses(planet_positions, houses)
+        # Assign planets to houses
+        planets_in_houses = self.assign_planets_to_houses(planet_positions, houses)
 
-            # Generate interpretation
-            interpretation = self.generate_basic_chart_interpretation(
-                planet_positions, ascendant_sign, houses, planets_in_houses, aspects, gender
-            )
+        # Generate interpretation
+        interpretation = self.generate_basic_chart_interpretation(
+            planet_positions, ascendant_sign, houses, planets_in_houses, aspects, gender
+        )
 
-            # Prepare result
-            result = {
-                "birth_info": {
-                    "date": f"{day}/{month}/{year}",
-                    "time": f"{hour:02d}:{minute:02d}:{second:02d}",
-                    "place": birth_place,
-                    "coordinates": f"{latitude:.4f}, {longitude:.4f}",
-                    "timezone": timezone
+        # Prepare result
+        return {
+            "birth_info": {
+                "date": f"{day}/{month}/{year}",
+                "time": f"{hour:02d}:{minute:02d}:{second:02d}",
+                "place": birth_place,
+                "coordinates": f"{latitude:.4f}, {longitude:.4f}",
+                "latitude": latitude,
+                "longitude": longitude,
+                "timezone": timezone
+            },
+            "chart_data": {
+                "julian_day": jd,
+                "ascendant": {
+                    "degree": ascendant,
+                    "sign": ascendant_sign
                 },
-                "chart_data": {
-                    "julian_day": jd,
-                    "ascendant": {
-                        "degree": ascendant,
-                        "sign": ascendant_sign
-                    },
-                    "midheaven": {
-                        "degree": midheaven,
-                        "sign": self.signs[int(midheaven / 30)]
-                    },
-                    "houses": {i+1: houses[i] for i in range(12)},
-                    "planets": planet_positions,
-                    "aspects": aspects
+                "midheaven": {
+                    "degree": midheaven,
+                    "sign": self.signs[int(midheaven / 30)]
                 },
-                "interpretation": interpretation
-            }
+                "houses": {i+1: houses[i] for i in range(12)},
+                "planets": planet_positions,
+                "aspects": aspects
+            },
+            "interpretation": interpretation
+        }
 
-            print("Birth chart created successfully.")
-            return result
+    def get_daily_transits(self, day_jd):
+        """Get transiting planet positions and speeds for a Julian day from the shared transit table"""
+        with _transit_table_lock:
+            day_planets = _transit_table.get(day_jd)
+            if day_planets is not None:
+                _transit_table.move_to_end(day_jd)
+                return day_planets
 
-        except Exception as e:
-            print(f"Error creating birth chart: {e}")
-            return {"error": str(e)}
+        day_planets = self.calculate_planet_positions(day_jd)
+
+        with _transit_table_lock:
+            _transit_table[day_jd] = day_planets
+            while len(_transit_table) > TRANSIT_TABLE_MAX_DAYS:
+                _transit_table.popitem(last=False)
+
+        return day_planets
 
-    
     def generate_weekly_prediction(self, birth_chart_data, start_date=None):
         """Generate a comprehensive weekly prediction based on birth chart and transits for each day of the week"""
         # Use current date as start date if not provided
         if start_date is None:
-            start_date = datetime.datetime.now().replace(hour=12, minute=0, second=0)
+            start_date = datetime.datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
         else:
             # Ensure we have a datetime object with noon time
-            start_date = start_date.replace(hour=12, minute=0, second=0)
-        
+            start_date = start_date.replace(hour=12, minute=0, second=0, microsecond=0)
+
+        # Reuse a prediction already generated for this chart and week
+        cache_key = (chart_hash(birth_chart_data), start_date.date().isoformat())
+        with _weekly_prediction_cache_lock:
+            if cache_key in _weekly_prediction_cache:
+                _weekly_prediction_cache.move_to_end(cache_key)
+                return _weekly_prediction_cache[cache_key]
+
         # Create a list of dates for the week (7 days from start date)
         week_dates = [start_date + datetime.timedelta(days=i) for i in range(7)]
         
@@ -559,8 +859,8 @@ class AstrologyTool:
             day_jd = swe.julday(day_date.year, day_date.month, day_date.day,
                         day_date.hour + day_date.minute / 60.0 + day_date.second / 3600.0)
             
-            # Get planetary positions for this day
-            day_planets = self.calculate_planet_positions(day_jd)
+            # Get planetary positions for this day (shared by every chart)
+            day_planets = self.get_daily_transits(day_jd)
             
             # Calculate transit aspects (current planets to natal planets)
             day_transit_aspects = []
@@ -579,7 +879,7 @@ class AstrologyTool:
                         if abs(angle - aspect_angle) <= orb:
                             # Check if this aspect is applying or separating
                             is_applying = self._is_aspect_applying(
-                                transit_planet, natal_planet, angle, aspect_angle, day_date
+                                transit_planet, natal_data["longitude"], angle, aspect_angle, day_jd
                             )
                             
                             day_transit_aspects.append({
@@ -598,39 +898,31 @@ class AstrologyTool:
         # Get current planetary positions (for general week overview)
         start_jd = swe.julday(start_date.year, start_date.month, start_date.day,
                         start_date.hour + start_date.minute / 60.0 + start_date.second / 3600.0)
-        current_planets = self.calculate_planet_positions(start_jd)
+        current_planets = self.get_daily_transits(start_jd)
         
         # Generate week-long prediction
         prediction = self._interpret_weekly_transits_improved(
             all_week_aspects, daily_transits, natal_planets, current_planets, week_dates
         )
+
+        with _weekly_prediction_cache_lock:
+            _weekly_prediction_cache[cache_key] = prediction
+            while len(_weekly_prediction_cache) > WEEKLY_PREDICTION_CACHE_SIZE:
+                _weekly_prediction_cache.popitem(last=False)
         
         return prediction
 
-    def _is_aspect_applying(self, transit_planet, natal_planet, current_angle, aspect_angle, date):
+    def _is_aspect_applying(self, transit_planet, natal_longitude, current_angle, aspect_angle, day_jd):
         """Determine if an aspect is applying (getting closer) or separating (moving apart)"""
-        # Calculate planet positions tomorrow
-        tomorrow = date + datetime.timedelta(days=1)
-        tomorrow_jd = swe.julday(tomorrow.year, tomorrow.month, tomorrow.day, 12.0)
-        
-        # Get transit planet position tomorrow
-        tomorrow_planets = self.calculate_planet_positions(tomorrow_jd)
+        # Get transit planet position tomorrow from the shared table
+        tomorrow_planets = self.get_daily_transits(day_jd + 1)
         if transit_planet not in tomorrow_planets:
             return False  # Cannot determine, assume separating
         
         tomorrow_pos = tomorrow_planets[transit_planet]["longitude"]
         
-        # Get natal planet position (doesn't change)
-        natal_pos = 0
-        for planet, data in self.planets.items():
-            if data == natal_planet:
-                result, _ = swe.calc_ut(tomorrow_jd, planet)
-                if isinstance(result, tuple) and len(result) > 0:
-                    natal_pos = result[0]
-                    break
-        
-        # Calculate tomorrow's angle
-        tomorrow_angle = abs(tomorrow_pos - natal_pos)
+        # Calculate tomorrow's angle (the natal position doesn't change)
+        tomorrow_angle = abs(tomorrow_pos - natal_longitude)
         if tomorrow_angle > 180:
             tomorrow_angle = 360 - tomorrow_angle
         
@@ -661,6 +953,12 @@ class AstrologyTool:
         retrograde_planets = self._check_retrograde_planets(week_dates)
         if retrograde_planets:
             predictions.append(f"\nNOTE: {', '.join(retrograde_planets)} {'is' if len(retrograde_planets) == 1 else 'are'} retrograde this week, which may impact related areas of life.")
+
+        weekly_events = self._describe_weekly_events(week_dates)
+        if weekly_events:
+            predictions.append("\nPLANETARY EVENTS THIS WEEK:")
+            for event in weekly_events:
+                predictions.append(f"• {event}")
         
         # Group aspects by planet to identify themes
         planet_aspects = {}
@@ -722,30 +1020,40 @@ class AstrologyTool:
         }
         return themes[sign]
 
+    def _week_julian_day_range(self, week_dates):
+        """Julian days spanning the whole week, from the start of the first day to the end of the last"""
+        first, last = week_dates[0], week_dates[-1]
+        start_jd = swe.julday(first.year, first.month, first.day, 0.0)
+        end_jd = swe.julday(last.year, last.month, last.day, 0.0) + 1
+        return start_jd, end_jd
+
     def _check_retrograde_planets(self, week_dates):
-        """Check which planets are retrograde during the week"""
-        retrograde_planets = []
-        
+        """Check which planets are retrograde at any point during the week"""
         # Check common retrograde planets - Mercury, Venus, Mars, Jupiter, Saturn
-        planets_to_check = [swe.MERCURY, swe.VENUS, swe.MARS, swe.JUPITER, swe.SATURN]
-        planet_names = {
-            swe.MERCURY: "Mercury", 
-            swe.VENUS: "Venus", 
-            swe.MARS: "Mars",
-            swe.JUPITER: "Jupiter", 
-            swe.SATURN: "Saturn"
-        }
-        
-        # Use the middle of the week to check
-        mid_week = week_dates[3]
-        mid_jd = swe.julday(mid_week.year, mid_week.month, mid_week.day, 12.0)
-        
-        for planet_id in planets_to_check:
-            res, _ = swe.calc_ut(mid_jd, planet_id)
-            if isinstance(res, tuple) and len(res) >= 4 and res[3] < 0:  # Negative speed indicates retrograde
-                retrograde_planets.append(planet_names[planet_id])
-        
-        return retrograde_planets
+        planets_to_check = ["Mercury", "Venus", "Mars", "Jupiter", "Saturn"]
+        start_jd, end_jd = self._week_julian_day_range(week_dates)
+        return self.event_calendar.retrograde_planets_between(start_jd, end_jd, planets_to_check)
+
+    def _describe_weekly_events(self, week_dates):
+        """Describe the stations, sign ingresses and lunations that happen during the week"""
+        start_jd, end_jd = self._week_julian_day_range(week_dates)
+        descriptions = []
+
+        for event in self.event_calendar.events_between(start_jd, end_jd):
+            # The Moon changes sign every couple of days, so its ingresses are not listed
+            if event["type"] == "ingress" and event["planet"] == "Moon":
+                continue
+
+            day = datetime.datetime.fromisoformat(event["time"]).strftime("%A, %b %d")
+            if event["type"] == "station":
+                descriptions.append(f"{day}: {event['planet']} stations {event['direction']} in {event['sign']}")
+            elif event["type"] == "ingress":
+                motion = " (retrograde)" if event["retrograde"] else ""
+                descriptions.append(f"{day}: {event['planet']} enters {event['sign']}{motion}")
+            else:
+                descriptions.append(f"{day}: {event['phase']} in {event['sign']}")
+
+        return descriptions
 
     def _identify_significant_days(self, daily_transits):
         """Identify and explain particularly significant days in the week"""
@@ -1102,77 +1410,21 @@ class AstrologyTool:
         return " ".join(advice)
 
     def add_compatibility_analysis(self):
-        """Add methods for compatibility analysis to the AstrologyTool class"""
-        
-        # Element compatibility scores (out of 10)
-        self.element_compatibility = {
-            ("Fire", "Fire"): 8,    # Enthusiastic but can burn out
-            ("Fire", "Earth"): 4,   # Can be challenging but grounding
-            ("Fire", "Air"): 9,     # Excellent synergy and stimulation
-            ("Fire", "Water"): 3,   # Can create steam or extinguish
-            
-            ("Earth", "Fire"): 4,   # Earth can contain fire or smother it
-            ("Earth", "Earth"): 7,  # Stable but can be too rigid
-            ("Earth", "Air"): 3,    # Difficult combination
-            ("Earth", "Water"): 8,  # Productive and nurturing
-            
-            ("Air", "Fire"): 9,     # Air feeds fire, creates inspiration
-            ("Air", "Earth"): 3,    # Communication challenges
-            ("Air", "Air"): 7,      # Intellectual but may lack grounding
-            ("Air", "Water"): 5,    # Can be refreshing or stormy
-            
-            ("Water", "Fire"): 3,   # Water can extinguish fire's enthusiasm
-            ("Water", "Earth"): 8,  # Nurturing and productive
-            ("Water", "Air"): 5,    # Emotional understanding challenges
-            ("Water", "Water"): 9,  # Deep emotional connection but can be overwhelming
-        }
-        
-        # Quality compatibility scores (out of 10)
-        self.quality_compatibility = {
-            ("Cardinal", "Cardinal"): 5,  # Dynamic but challenging
-            ("Cardinal", "Fixed"): 7,     # Balance between action and stability
-            ("Cardinal", "Mutable"): 8,   # Action and adaptation work well
-            
-            ("Fixed", "Cardinal"): 7,     # Provides structure to initiative
-            ("Fixed", "Fixed"): 4,        # Stable but stubborn combination
-            ("Fixed", "Mutable"): 6,      # Balance between stability and flexibility
-            
-            ("Mutable", "Cardinal"): 8,   # Adaptability supports action
-            ("Mutable", "Fixed"): 6,      # Flexibility meets determination
-            ("Mutable", "Mutable"): 7,    # Adaptable but can lack direction
-        }
-        
-        # Special aspects for relationships and their weights
-        self.relationship_aspects = {
-            # Sun-Moon connections are crucial for basic compatibility
-            "Sun-Moon": 15,
-            # Venus connections indicate love and attraction
-            "Venus-Venus": 12,
-            "Venus-Mars": 10,
-            "Venus-Sun": 8,
-            "Venus-Moon": 8,
-            # Mars connections indicate physical chemistry
-            "Mars-Mars": 7,
-            "Mars-Moon": 6,
-            "Mars-Sun": 6,
-            # Mercury connections indicate communication
-            "Mercury-Mercury": 9,
-            "Mercury-Sun": 5,
-            "Mercury-Moon": 5,
-        }
-        
-        # Aspect weights for relationship compatibility
-        self.aspect_weights = {
-            "Conjunction": 10,
-            "Opposition": 5,
-            "Trine": 8,
-            "Square": 3,
-            "Sextile": 7
-        }
+        """Add the compatibility tables to the AstrologyTool instance"""
+        self.element_compatibility = ELEMENT_COMPATIBILITY
+        self.quality_compatibility = QUALITY_COMPATIBILITY
+        self.relationship_aspects = RELATIONSHIP_ASPECTS
+        self.aspect_weights = ASPECT_WEIGHTS
 
     def analyze_compatibility(self, chart1, chart2):
         """Analyze compatibility between two birth charts
         
+        Results are cached per pair of charts (by content hash) in either order. When a
+        pair is asked for the other way round, the cached synastry aspects and house
+        overlays are turned around and reused, and only the directional scores and the
+        interpretation text are computed again. Cached results are shared and must be
+        treated as read-only.
+        
         Args:
             chart1: First person's chart data (from create_birth_chart)
             chart2: Second person's chart data (from create_birth_chart)
@@ -1180,50 +1432,101 @@ class AstrologyTool:
         Returns:
             Dictionary with compatibility analysis
         """
-        if not hasattr(self, 'element_compatibility'):
-            self.add_compatibility_analysis()
-        
+        hash1 = chart_hash(chart1)
+        hash2 = chart_hash(chart2)
+        cache_key = (min(hash1, hash2), max(hash1, hash2))
+        with _compatibility_cache_lock:
+            cached = _compatibility_cache.get(cache_key)
+            if cached is not None:
+                _compatibility_cache.move_to_end(cache_key)
+                if cached[0] == hash1:
+                    _compatibility_cache_counts["hits"] += 1
+                    return cached[1]
+                _compatibility_cache_counts["reversed_hits"] += 1
+            else:
+                _compatibility_cache_counts["misses"] += 1
+
+        if cached is not None:
+            # Cached as (chart2, chart1): reuse its orientation-free parts
+            synastry_aspects, house_overlays = self._reverse_synastry(chart1, chart2, cached[1])
+            return self._analyze_compatibility(chart1, chart2, synastry_aspects, house_overlays,
+                                               cached[1]["house_compatibility"])
+
+        result = self._analyze_compatibility(chart1, chart2)
+        with _compatibility_cache_lock:
+            _compatibility_cache[cache_key] = (hash1, result)
+            while len(_compatibility_cache) > COMPATIBILITY_CACHE_SIZE:
+                _compatibility_cache.popitem(last=False)
+        return result
+
+    def _reverse_synastry(self, chart1, chart2, reversed_result):
+        """Synastry aspects and house overlays of (chart1, chart2) from the analysis of (chart2, chart1)
+
+        Aspects have their two planets swapped and are put back in the order
+        calculate_synastry_aspects finds them in: by person 1 planet, person 2 planet
+        and aspect.
+        """
+        planets1 = {planet: index for index, planet in enumerate(chart1["chart_data"]["planets"])}
+        planets2 = {planet: index for index, planet in enumerate(chart2["chart_data"]["planets"])}
+        aspect_order = {aspect: index for index, aspect in enumerate(self.aspects)}
+        synastry_aspects = sorted(
+            (
+                {
+                    "person1_planet": aspect["person2_planet"],
+                    "person2_planet": aspect["person1_planet"],
+                    "aspect": aspect["aspect"],
+                    "orb": aspect["orb"],
+                    "nature": aspect["nature"]
+                }
+                for aspect in reversed_result["synastry_aspects"]
+            ),
+            key=lambda aspect: (planets1[aspect["person1_planet"]], planets2[aspect["person2_planet"]],
+                                aspect_order[aspect["aspect"]])
+        )
+        overlays = reversed_result["house_overlays"]
+        return synastry_aspects, (overlays["person2_in_person1_houses"], overlays["person1_in_person2_houses"])
+
+    def _analyze_compatibility(self, chart1, chart2, synastry_aspects=None, house_overlays=None, house_score=None):
+        """Compute the compatibility analysis, reusing synastry aspects, house overlays and house score when given"""
         # Extract relevant data from charts
         person1_planets = chart1["chart_data"]["planets"]
         person2_planets = chart2["chart_data"]["planets"]
         
         person1_sun = person1_planets["Sun"]["sign"]
         person1_moon = person1_planets["Moon"]["sign"]
-        person1_mercury = person1_planets["Mercury"]["sign"]
         person1_venus = person1_planets["Venus"]["sign"]
         person1_mars = person1_planets["Mars"]["sign"]
-        person1_ascendant = chart1["chart_data"]["ascendant"]["sign"]
         
         person2_sun = person2_planets["Sun"]["sign"]
         person2_moon = person2_planets["Moon"]["sign"]
-        person2_mercury = person2_planets["Mercury"]["sign"]
         person2_venus = person2_planets["Venus"]["sign"]
         person2_mars = person2_planets["Mars"]["sign"]
-        person2_ascendant = chart2["chart_data"]["ascendant"]["sign"]
         
         # Calculate synastry aspects between charts
-        synastry_aspects = self.calculate_synastry_aspects(person1_planets, person2_planets)
+        if synastry_aspects is None:
+            synastry_aspects = self.calculate_synastry_aspects(person1_planets, person2_planets)
+        
+        # Sign-based scores are looked up in the sign-pair tables by sign index
+        signs1 = self._chart_sign_indices(chart1)
+        signs2 = self._chart_sign_indices(chart2)
         
         # Calculate element compatibility
-        element_score = self.calculate_element_compatibility(person1_planets, person2_planets)
+        element_score = self.score_element_compatibility(signs1, signs2)
         
         # Calculate sign compatibility
-        sign_score = self.calculate_sign_compatibility(
-            person1_sun, person1_moon, person1_venus, person1_mars, person1_ascendant,
-            person2_sun, person2_moon, person2_venus, person2_mars, person2_ascendant
-        )
+        sign_score = self.score_sign_compatibility(signs1, signs2)
         
         # Calculate house overlays
-        house_score = self.calculate_house_overlay_compatibility(chart1, chart2)
+        if house_overlays is None:
+            house_overlays = self.calculate_house_overlays(chart1, chart2)
+        if house_score is None:
+            house_score = self.calculate_house_overlay_compatibility(chart1, chart2, house_overlays)
         
         # Calculate aspect compatibility
         aspect_score = self.calculate_aspect_compatibility(synastry_aspects)
         
         # Calculate special planetary relationships
-        special_score = self.calculate_special_relationships(
-            person1_sun, person1_moon, person1_mercury, person1_venus, person1_mars,
-            person2_sun, person2_moon, person2_mercury, person2_venus, person2_mars
-        )
+        special_score = self.score_special_relationships(signs1, signs2)
         
         # Calculate overall compatibility percentage
         overall_score = self.calculate_overall_compatibility(
@@ -1246,11 +1549,81 @@ class AstrologyTool:
             "aspect_compatibility": aspect_score,
             "special_compatibility": special_score,
             "synastry_aspects": synastry_aspects,
+            "house_overlays": {
+                "person1_in_person2_houses": house_overlays[0],
+                "person2_in_person1_houses": house_overlays[1]
+            },
             "interpretation": interpretation
         }
         
         return compatibility_result
 
+    def analyze_group_compatibility(self, charts, expand=()):
+        """Analyze compatibility between every two people of a group
+
+        Each chart's positions and signs are read into arrays once, and every score of
+        analyze_compatibility is computed for all N x N ordered pairs with array
+        operations (scores equal analyze_compatibility's). Full analyses, with aspects,
+        house overlays and interpretation, are only made for the pairs in expand.
+
+        Args:
+            charts: List of charts (from create_birth_chart)
+            expand: Pairs (i, j) of chart indices to analyze in full, person i as person 1
+
+        Returns:
+            Dictionary with "scores": N x N matrices (row i has person i as person 1,
+            None on the diagonal) of overall, element, sign, house, aspect and special
+            compatibility and the number of synastry aspects, and "pairs": the full
+            analyses, keyed "i-j"
+        """
+        count = len(charts)
+        for i, j in expand:
+            if not (0 <= i < count and 0 <= j < count) or i == j:
+                raise ValueError(f"Invalid pair to expand: {i}-{j}")
+
+        planet_names = list(self.planets.values())
+        longitudes = np.array([[chart["chart_data"]["planets"][planet]["longitude"] for planet in planet_names]
+                               for chart in charts], dtype=float).reshape(count, len(planet_names))
+        cusps = np.array([chart_cusps(chart["chart_data"]) for chart in charts], dtype=float).reshape(count, 12)
+        chart_signs = [self._chart_sign_indices(chart) for chart in charts]
+        signs = {point: np.array([indices[point] for indices in chart_signs], dtype=int)
+                 for point in COMPATIBILITY_POINTS}
+
+        # Person 1 and person 2 of every ordered pair
+        first, second = np.meshgrid(np.arange(count), np.arange(count), indexing="ij")
+        signs1 = {name: values[first] for name, values in signs.items()}
+        signs2 = {name: values[second] for name, values in signs.items()}
+
+        element_score = self.score_element_compatibility(signs1, signs2)
+        sign_score = self.score_sign_compatibility(signs1, signs2)
+        house_score = self.calculate_house_overlay_compatibility_batch(
+            longitudes[first.ravel()], cusps[first.ravel()], longitudes[second.ravel()], cusps[second.ravel()]
+        ).reshape(count, count)
+        aspect_score, aspect_count = self.calculate_aspect_compatibility_batch(longitudes)
+        special_score = self.score_special_relationships(signs1, signs2)
+        overall_score = self.calculate_overall_compatibility(
+            element_score, sign_score, house_score, aspect_score, special_score
+        )
+
+        def matrix(values):
+            rows = np.asarray(values).astype(int).tolist()
+            for i in range(count):
+                rows[i][i] = None
+            return rows
+
+        return {
+            "scores": {
+                "overall_compatibility": matrix(overall_score),
+                "element_compatibility": matrix(element_score),
+                "sign_compatibility": matrix(sign_score),
+                "house_compatibility": matrix(house_score),
+                "aspect_compatibility": matrix(aspect_score),
+                "special_compatibility": matrix(special_score),
+                "synastry_aspect_count": matrix(aspect_count)
+            },
+            "pairs": {f"{i}-{j}": self.analyze_compatibility(charts[i], charts[j]) for i, j in expand}
+        }
+
     def calculate_synastry_aspects(self, person1_planets, person2_planets):
         """Calculate aspects between planets of two different charts"""
         synastry_aspects = []
@@ -1286,252 +1659,268 @@ class AstrologyTool:
 
     def calculate_element_compatibility(self, person1_planets, person2_planets):
         """Calculate compatibility based on elements of key planets"""
-        # Extract elements
-        p1_sun_element = self.sign_elements[person1_planets["Sun"]["sign"]]
-        p1_moon_element = self.sign_elements[person1_planets["Moon"]["sign"]]
-        p1_venus_element = self.sign_elements[person1_planets["Venus"]["sign"]]
-        
-        p2_sun_element = self.sign_elements[person2_planets["Sun"]["sign"]]
-        p2_moon_element = self.sign_elements[person2_planets["Moon"]["sign"]]
-        p2_venus_element = self.sign_elements[person2_planets["Venus"]["sign"]]
-        
-        # Calculate element compatibility scores (weighted)
-        sun_sun_score = self.element_compatibility[(p1_sun_element, p2_sun_element)] * 2
-        sun_moon_score = self.element_compatibility[(p1_sun_element, p2_moon_element)] * 1.5
-        moon_sun_score = self.element_compatibility[(p1_moon_element, p2_sun_element)] * 1.5
-        moon_moon_score = self.element_compatibility[(p1_moon_element, p2_moon_element)] * 1.8
-        venus_venus_score = self.element_compatibility[(p1_venus_element, p2_venus_element)] * 1.5
-        
-        # Calculate weighted average (out of 10)
+        signs1 = {planet: SIGN_INDEX[person1_planets[planet]["sign"]] for planet in ("Sun", "Moon", "Venus")}
+        signs2 = {planet: SIGN_INDEX[person2_planets[planet]["sign"]] for planet in ("Sun", "Moon", "Venus")}
+        return self.score_element_compatibility(signs1, signs2)
+
+    def _chart_sign_indices(self, chart):
+        """Sign indices of a chart's COMPATIBILITY_POINTS"""
+        chart_data = chart["chart_data"]
+        signs = {planet: SIGN_INDEX[chart_data["planets"][planet]["sign"]] for planet in COMPATIBILITY_POINTS[:-1]}
+        signs["Ascendant"] = SIGN_INDEX[chart_data["ascendant"]["sign"]]
+        return signs
+
+    def score_element_compatibility(self, signs1, signs2):
+        """Element compatibility from sign indices ({"Sun": ..., "Moon": ..., "Venus": ...})
+
+        The indices can be ints for one pair or arrays of one shape for many pairs.
+        """
+        table = SIGN_ELEMENT_SCORES if _is_batch(signs1) else SIGN_PAIR_LOOKUPS["element"]
+
+        # Calculate element compatibility scores (weighted average out of 10)
         total_weight = 2 + 1.5 + 1.5 + 1.8 + 1.5
-        element_score = (sun_sun_score + sun_moon_score + moon_sun_score + moon_moon_score + venus_venus_score) / total_weight
-        
+        element_score = (table[signs1["Sun"], signs2["Sun"]] * 2
+                         + table[signs1["Sun"], signs2["Moon"]] * 1.5
+                         + table[signs1["Moon"], signs2["Sun"]] * 1.5
+                         + table[signs1["Moon"], signs2["Moon"]] * 1.8
+                         + table[signs1["Venus"], signs2["Venus"]] * 1.5) / total_weight
+
         # Convert to percentage
-        element_percentage = (element_score / 10) * 100
-        
-        return round(element_percentage)
+        return _round_scores((element_score / 10) * 100)
 
     def calculate_sign_compatibility(self, p1_sun, p1_moon, p1_venus, p1_mars, p1_asc, 
                                 p2_sun, p2_moon, p2_venus, p2_mars, p2_asc):
         """Calculate compatibility based on sign relationships"""
-        # Calculate position relationships
-        compatibility_scores = []
-        
-        # Sun sign compatibility (traditional astrology uses polarity and angles)
-        sun_compatibility = self._sign_relationship_score(p1_sun, p2_sun)
-        compatibility_scores.append(sun_compatibility * 2)  # Double weight for Sun signs
-        
-        # Moon sign compatibility
-        moon_compatibility = self._sign_relationship_score(p1_moon, p2_moon)
-        compatibility_scores.append(moon_compatibility * 1.8)  # High weight for emotional harmony
-        
-        # Venus sign compatibility (love style)
-        venus_compatibility = self._sign_relationship_score(p1_venus, p2_venus)
-        compatibility_scores.append(venus_compatibility * 1.5)
-        
-        # Mars compatibility (sexual/energy harmony)
-        mars_compatibility = self._sign_relationship_score(p1_mars, p2_mars)
-        compatibility_scores.append(mars_compatibility * 1.3)
-        
-        # Venus-Mars cross compatibility (sexual attraction)
-        venus_mars_compatibility = self._sign_relationship_score(p1_venus, p2_mars)
-        mars_venus_compatibility = self._sign_relationship_score(p1_mars, p2_venus)
-        compatibility_scores.append(venus_mars_compatibility * 1.4)
-        compatibility_scores.append(mars_venus_compatibility * 1.4)
-        
-        # Sun-Moon cross compatibility (basic harmony)
-        sun_moon_compatibility = self._sign_relationship_score(p1_sun, p2_moon)
-        moon_sun_compatibility = self._sign_relationship_score(p1_moon, p2_sun)
-        compatibility_scores.append(sun_moon_compatibility * 1.7)
-        compatibility_scores.append(moon_sun_compatibility * 1.7)
-        
-        # Ascendant compatibility (how they view each other)
-        asc_compatibility = self._sign_relationship_score(p1_asc, p2_asc)
-        compatibility_scores.append(asc_compatibility)
-        
-        # Calculate weighted average
+        names = ("Sun", "Moon", "Venus", "Mars", "Ascendant")
+        signs1 = {name: SIGN_INDEX[sign] for name, sign in zip(names, (p1_sun, p1_moon, p1_venus, p1_mars, p1_asc))}
+        signs2 = {name: SIGN_INDEX[sign] for name, sign in zip(names, (p2_sun, p2_moon, p2_venus, p2_mars, p2_asc))}
+        return self.score_sign_compatibility(signs1, signs2)
+
+    def score_sign_compatibility(self, signs1, signs2):
+        """Sign compatibility from sign indices ({"Sun": ..., "Ascendant": ...}), ints or arrays of one shape"""
+        table = SIGN_RELATIONSHIP_SCORES if _is_batch(signs1) else SIGN_PAIR_LOOKUPS["relationship"]
+
+        # Sun, Moon, Venus and Mars pairs, Venus-Mars cross pairs (attraction), Sun-Moon
+        # cross pairs (basic harmony) and the Ascendants (how they view each other)
         total_weights = 2 + 1.8 + 1.5 + 1.3 + 1.4 + 1.4 + 1.7 + 1.7 + 1
-        weighted_sum = sum(compatibility_scores)
-        sign_compatibility = (weighted_sum / total_weights) * 10  # Scale to percentage
-        
-        return round(sign_compatibility)
+        weighted_sum = (table[signs1["Sun"], signs2["Sun"]] * 2
+                        + table[signs1["Moon"], signs2["Moon"]] * 1.8
+                        + table[signs1["Venus"], signs2["Venus"]] * 1.5
+                        + table[signs1["Mars"], signs2["Mars"]] * 1.3
+                        + table[signs1["Venus"], signs2["Mars"]] * 1.4
+                        + table[signs1["Mars"], signs2["Venus"]] * 1.4
+                        + table[signs1["Sun"], signs2["Moon"]] * 1.7
+                        + table[signs1["Moon"], signs2["Sun"]] * 1.7
+                        + table[signs1["Ascendant"], signs2["Ascendant"]])
+        return _round_scores((weighted_sum / total_weights) * 10)  # Scale to percentage
 
     def _sign_relationship_score(self, sign1, sign2):
         """Calculate relationship score between two signs (based on traditional astrology)"""
-        # Get positions in zodiac (0-11)
-        sign_positions = {sign: i for i, sign in enumerate(self.signs)}
-        pos1 = sign_positions[sign1]
-        pos2 = sign_positions[sign2]
-        
-        # Calculate number of signs apart
-        distance = (pos2 - pos1) % 12
-        
-        # Assign compatibility score based on aspect pattern
-        if distance == 0:  # Conjunction (same sign)
-            return 0.9  # High compatibility but can be too similar
-        elif distance == 1 or distance == 11:  # Semisextile/Quincunx (1 sign apart)
-            return 0.5  # Awkward adjustment needed
-        elif distance == 2 or distance == 10:  # Sextile/Quincunx (2 signs apart)
-            return 0.7  # Positive opportunity
-        elif distance == 3 or distance == 9:  # Square (3 signs apart)
-            return 0.4  # Challenge but growth
-        elif distance == 4 or distance == 8:  # Trine (4 signs apart)
-            return 0.9  # Harmony and flow
-        elif distance == 5 or distance == 7:  # Quincunx (5 signs apart)
-            return 0.3  # Adjustment needed
-        elif distance == 6:  # Opposition (opposite signs)
-            return 0.6  # Tension but attraction and balance
-        
-        return 0.5  # Default
-
-    def calculate_house_overlay_compatibility(self, chart1, chart2):
-        """Calculate compatibility based on house overlays"""
-        # This is a simplified version of house overlay analysis
-        # In a full implementation, we would check where each person's planets 
-        # fall in the other person's houses
-        
-        # For simplicity, we'll focus on key relationship houses: 1, 5, 7, 8
-        relationship_houses = [1, 5, 7, 8]
+        return float(SIGN_RELATIONSHIP_SCORES[SIGN_INDEX[sign1], SIGN_INDEX[sign2]])
+
+    def calculate_house_overlays(self, chart1, chart2):
+        """Place each person's planets in the other person's houses
+
+        Returns:
+            Tuple of two dictionaries mapping planet names to house numbers: person 1's
+            planets in person 2's houses, and person 2's planets in person 1's houses
+        """
+        planets1 = chart1["chart_data"]["planets"]
+        planets2 = chart2["chart_data"]["planets"]
+
+        houses_1_in_2 = houses_for_longitudes(
+            chart_cusps(chart2["chart_data"]), [data["longitude"] for data in planets1.values()]
+        )
+        houses_2_in_1 = houses_for_longitudes(
+            chart_cusps(chart1["chart_data"]), [data["longitude"] for data in planets2.values()]
+        )
+
+        return (
+            {planet: int(house) for planet, house in zip(planets1, houses_1_in_2)},
+            {planet: int(house) for planet, house in zip(planets2, houses_2_in_1)}
+        )
+
+    def score_house_overlays(self, houses_1_in_2, houses_2_in_1):
+        """Score house overlays given as arrays of house numbers in self.planets order
+
+        Both arrays have shape (..., number of planets), so any number of pairs is
+        scored at once.
+        """
+        # Key relationship houses: 1, 5, 7, 8
+        relationship_houses = np.zeros(13, dtype=bool)
+        relationship_houses[[1, 5, 7, 8]] = True
+
+        # Benefics add to the score, malefics take away from it
+        planet_adjustments = {"Venus": 5, "Jupiter": 5, "Saturn": -2, "Mars": -2}
+        adjustments = np.array([planet_adjustments.get(planet, 0) for planet in self.planets.values()])
+
         house_score = 60  # Base score
-        
-        # Check planets in relationship houses
-        planets_in_houses1 = chart1.get("planets_in_houses", {})
-        planets_in_houses2 = chart2.get("planets_in_houses", {})
-        
-        benefics = ["Venus", "Jupiter"]
-        malefics = ["Saturn", "Mars"]
-        
-        # Score adjustments based on planet placements
-        for house in relationship_houses:
-            # Person 1's planets in Person 2's houses
-            for planet in planets_in_houses1.get(str(house), []):
-                if planet in benefics:
-                    house_score += 5
-                elif planet in malefics:
-                    house_score -= 2
-            
-            # Person 2's planets in Person 1's houses
-            for planet in planets_in_houses2.get(str(house), []):
-                if planet in benefics:
-                    house_score += 5
-                elif planet in malefics:
-                    house_score -= 2
-        
+        house_score = (house_score
+                       + (relationship_houses[houses_1_in_2] * adjustments).sum(axis=-1)
+                       + (relationship_houses[houses_2_in_1] * adjustments).sum(axis=-1))
+
         # Ensure the score stays within 0-100 range
-        return max(0, min(100, house_score))
+        return np.clip(house_score, 0, 100)
+
+    def calculate_house_overlay_compatibility(self, chart1, chart2, house_overlays=None):
+        """Calculate compatibility based on where each person's planets fall in the other's houses"""
+        overlays_1_in_2, overlays_2_in_1 = house_overlays or self.calculate_house_overlays(chart1, chart2)
+        planet_names = list(self.planets.values())
+
+        houses_1_in_2 = np.array([overlays_1_in_2[planet] for planet in planet_names])
+        houses_2_in_1 = np.array([overlays_2_in_1[planet] for planet in planet_names])
+
+        return int(self.score_house_overlays(houses_1_in_2, houses_2_in_1))
+
+    def calculate_house_overlay_compatibility_batch(self, longitudes1, cusps1, longitudes2, cusps2):
+        """Calculate house overlay scores for many chart pairs at once
+
+        Args:
+            longitudes1: Person 1 planet longitudes, shape (n, number of planets) in self.planets order
+            cusps1: Person 1 house cusps, shape (n, 12)
+            longitudes2: Person 2 planet longitudes, shape (n, number of planets)
+            cusps2: Person 2 house cusps, shape (n, 12)
+
+        Returns:
+            Integer array of n house overlay scores
+        """
+        houses_1_in_2 = houses_for_longitudes(cusps2, longitudes1)
+        houses_2_in_1 = houses_for_longitudes(cusps1, longitudes2)
+        return self.score_house_overlays(houses_1_in_2, houses_2_in_1)
 
     def calculate_aspect_compatibility(self, synastry_aspects):
         """Calculate compatibility based on synastry aspects"""
         aspect_score = 50  # Base score
         
         for aspect in synastry_aspects:
-            p1_planet = aspect["person1_planet"]
-            p2_planet = aspect["person2_planet"]
-            aspect_type = aspect["aspect"]
-            
-            # Check if this is a significant relationship aspect
-            planet_pair = f"{p1_planet}-{p2_planet}"
-            reverse_pair = f"{p2_planet}-{p1_planet}"
-            
-            weight = 1.0  # Default weight
-            
-            # Check if this is a key relationship aspect
-            if planet_pair in self.relationship_aspects:
-                weight = self.relationship_aspects[planet_pair] / 10
-            elif reverse_pair in self.relationship_aspects:
-                weight = self.relationship_aspects[reverse_pair] / 10
-            
-            # Adjust score based on aspect type and nature
-            if aspect_type in self.aspect_weights:
-                aspect_value = self.aspect_weights[aspect_type]
-                
-                # Beneficial aspects add to score, challenging aspects subtract
-                if aspect["nature"] == "Harmonious":
-                    aspect_score += aspect_value * weight
-                elif aspect["nature"] == "Challenging":
-                    aspect_score -= aspect_value * weight * 0.5  # Reduce penalty for challenging aspects
-                else:  # Neutral
-                    aspect_score += aspect_value * weight * 0.3
+            aspect_score += self._aspect_score_change(
+                aspect["person1_planet"], aspect["person2_planet"], aspect["aspect"], aspect["nature"]
+            )
         
         # Ensure the score stays within 0-100 range
         return max(0, min(100, round(aspect_score)))
 
+    def _aspect_score_change(self, p1_planet, p2_planet, aspect_type, nature):
+        """Change in the aspect score for one synastry aspect"""
+        # Check if this is a significant relationship aspect
+        planet_pair = f"{p1_planet}-{p2_planet}"
+        reverse_pair = f"{p2_planet}-{p1_planet}"
+        
+        weight = 1.0  # Default weight
+        
+        # Check if this is a key relationship aspect
+        if planet_pair in self.relationship_aspects:
+            weight = self.relationship_aspects[planet_pair] / 10
+        elif reverse_pair in self.relationship_aspects:
+            weight = self.relationship_aspects[reverse_pair] / 10
+        
+        # Adjust score based on aspect type and nature
+        if aspect_type not in self.aspect_weights:
+            return 0.0
+        aspect_value = self.aspect_weights[aspect_type]
+        
+        # Beneficial aspects add to score, challenging aspects subtract
+        if nature == "Harmonious":
+            return aspect_value * weight
+        elif nature == "Challenging":
+            return -(aspect_value * weight * 0.5)  # Reduce penalty for challenging aspects
+        else:  # Neutral
+            return aspect_value * weight * 0.3
+
+    def calculate_aspect_compatibility_batch(self, longitudes):
+        """Calculate synastry aspect scores between every two charts of a group
+
+        The same aspects as calculate_synastry_aspects are found for all pairs at once,
+        a block of person 1 charts at a time, and their score changes are added up in
+        the same order as calculate_aspect_compatibility, so the scores are equal.
+
+        Args:
+            longitudes: Planet longitudes, shape (n, number of planets) in self.planets order
+
+        Returns:
+            Tuple of (n, n) arrays: aspect compatibility (row i has chart i as person 1)
+            and number of synastry aspects
+        """
+        longitudes = np.asarray(longitudes, dtype=float)
+        planet_names = list(self.planets.values())
+        aspect_names = list(self.aspects)
+        aspect_angles = np.array([self.aspects[name]["angle"] for name in aspect_names], dtype=float)
+        aspect_orbs = np.array([self.aspects[name]["orb"] for name in aspect_names], dtype=float)
+        changes = np.array([[[self._aspect_score_change(planet1, planet2, name, self.aspects[name]["nature"])
+                              for name in aspect_names]
+                             for planet2 in planet_names]
+                            for planet1 in planet_names])
+
+        count = len(longitudes)
+        scores = np.zeros((count, count))
+        aspect_counts = np.zeros((count, count), dtype=int)
+        block = max(1, COMPATIBILITY_BATCH_VALUES // max(1, count * changes.size))
+        for start in range(0, count, block):
+            rows = longitudes[start:start + block]
+            # Person 1 planet x person 2 planet angles, folded to 0-180 degrees
+            angle = np.abs(rows[:, None, :, None] - longitudes[None, :, None, :])
+            angle = np.where(angle > 180, 360 - angle, angle)
+            hits = np.abs(angle[..., None] - aspect_angles) <= aspect_orbs
+            contributions = np.where(hits, changes, 0.0).reshape(len(rows), count, -1)
+            # Running sum from the base score of 50 in the scalar loop's order
+            totals = np.cumsum(np.concatenate([np.full((len(rows), count, 1), 50.0), contributions], axis=-1),
+                               axis=-1)
+            scores[start:start + len(rows)] = totals[..., -1]
+            aspect_counts[start:start + len(rows)] = hits.reshape(len(rows), count, -1).sum(axis=-1)
+
+        return np.clip(np.round(scores), 0, 100), aspect_counts
+
     def calculate_special_relationships(self, p1_sun, p1_moon, p1_mercury, p1_venus, p1_mars,
                                     p2_sun, p2_moon, p2_mercury, p2_venus, p2_mars):
         """Calculate compatibility based on special planetary relationships"""
-        special_score = 60  # Base score
-        
-        # Check for elemental matches in key planets
-        sun_element_match = self.sign_elements[p1_sun] == self.sign_elements[p2_sun]
-        moon_element_match = self.sign_elements[p1_moon] == self.sign_elements[p2_moon]
-        venus_element_match = self.sign_elements[p1_venus] == self.sign_elements[p2_venus]
-        mars_element_match = self.sign_elements[p1_mars] == self.sign_elements[p2_mars]
-        
-        # Check for elemental compatibility between important planets
-        sun_venus_compatibility = self._get_element_compatibility_score(p1_sun, p2_venus)
-        moon_venus_compatibility = self._get_element_compatibility_score(p1_moon, p2_venus)
-        venus_mars_compatibility = self._get_element_compatibility_score(p1_venus, p2_mars)
-        
-        # Add scores for matches and compatibility
-        if sun_element_match:
-            special_score += 5
-        if moon_element_match:
-            special_score += 8
-        if venus_element_match:
-            special_score += 6
-        if mars_element_match:
-            special_score += 4
-            
-        # Add scores for cross-compatibility
-        special_score += sun_venus_compatibility * 0.7
-        special_score += moon_venus_compatibility * 0.8
-        special_score += venus_mars_compatibility * 0.9
-        
-        # Check for same sign placements (can be both positive and negative)
-        if p1_sun == p2_sun:
-            special_score += 3
-        if p1_moon == p2_moon:
-            special_score += 5
-        if p1_venus == p2_venus:
-            special_score += 4
-        if p1_mars == p2_mars:
-            special_score += 2
-        
-        # Check for complementary communication styles
-        if self._is_complementary(p1_mercury, p2_mercury):
-            special_score += 6
-        
+        names = ("Sun", "Moon", "Mercury", "Venus", "Mars")
+        signs1 = {name: SIGN_INDEX[sign] for name, sign in zip(names, (p1_sun, p1_moon, p1_mercury, p1_venus, p1_mars))}
+        signs2 = {name: SIGN_INDEX[sign] for name, sign in zip(names, (p2_sun, p2_moon, p2_mercury, p2_venus, p2_mars))}
+        return self.score_special_relationships(signs1, signs2)
+
+    def score_special_relationships(self, signs1, signs2):
+        """Special relationship score from sign indices ({"Sun": ..., "Mars": ...}), ints or arrays of one shape"""
+        if _is_batch(signs1):
+            same_element, element_scores, complementary = SAME_ELEMENT_SIGNS, SIGN_ELEMENT_SCORES, COMPLEMENTARY_SIGNS
+        else:
+            same_element, element_scores, complementary = (
+                SIGN_PAIR_LOOKUPS["same_element"], SIGN_PAIR_LOOKUPS["element"], SIGN_PAIR_LOOKUPS["complementary"]
+            )
+
+        # Base score, plus elemental matches in key planets
+        special_score = (60
+                         + 5 * same_element[signs1["Sun"], signs2["Sun"]]
+                         + 8 * same_element[signs1["Moon"], signs2["Moon"]]
+                         + 6 * same_element[signs1["Venus"], signs2["Venus"]]
+                         + 4 * same_element[signs1["Mars"], signs2["Mars"]])
+
+        # Elemental compatibility between important planets
+        special_score = (special_score
+                         + element_scores[signs1["Sun"], signs2["Venus"]] * 0.7
+                         + element_scores[signs1["Moon"], signs2["Venus"]] * 0.8
+                         + element_scores[signs1["Venus"], signs2["Mars"]] * 0.9)
+
+        # Same sign placements, and complementary communication styles
+        special_score = (special_score
+                         + 3 * (signs1["Sun"] == signs2["Sun"])
+                         + 5 * (signs1["Moon"] == signs2["Moon"])
+                         + 4 * (signs1["Venus"] == signs2["Venus"])
+                         + 2 * (signs1["Mars"] == signs2["Mars"])
+                         + 6 * complementary[signs1["Mercury"], signs2["Mercury"]])
+
         # Ensure the score stays within 0-100 range
-        return max(0, min(100, round(special_score)))
+        return _round_scores(special_score, 0, 100)
 
     def _get_element_compatibility_score(self, sign1, sign2):
         """Get element compatibility score between two signs"""
-        element1 = self.sign_elements[sign1]
-        element2 = self.sign_elements[sign2]
-        
-        return self.element_compatibility[(element1, element2)]
+        return int(SIGN_ELEMENT_SCORES[SIGN_INDEX[sign1], SIGN_INDEX[sign2]])
 
     def _is_complementary(self, sign1, sign2):
         """Check if two signs are complementary (especially for Mercury)"""
-        # Complementary pairs often involve different elements but compatible qualities
-        element1 = self.sign_elements[sign1]
-        element2 = self.sign_elements[sign2]
-        
-        quality1 = self.sign_qualities[sign1]
-        quality2 = self.sign_qualities[sign2]
-        
-        # Different elements
-        if element1 == element2:
-            return False
-        
-        # Compatible qualities
-        quality_compatibility = self.quality_compatibility[(quality1, quality2)]
-        
-        # Return true if quality compatibility is high
-        return quality_compatibility >= 7
+        return bool(COMPLEMENTARY_SIGNS[SIGN_INDEX[sign1], SIGN_INDEX[sign2]])
 
     def calculate_overall_compatibility(self, element_score, sign_score, house_score, aspect_score, special_score):
-        """Calculate overall compatibility percentage"""
+        """Calculate overall compatibility percentage (the scores may also be arrays of many pairs)"""
         # Weight the different components
         weights = {
             'element': 0.15,
@@ -1550,6 +1939,8 @@ class AstrologyTool:
             special_score * weights['special']
         )
         
+        if isinstance(overall_score, np.ndarray):
+            return np.round(overall_score)
         return round(overall_score)
 
     def interpret_compatibility(self, p1_sun, p1_moon, p1_venus, p1_mars,
@@ -1589,35 +1980,7 @@ class AstrologyTool:
 
     def _interpret_sign_pair(self, sign1, sign2):
         """Generate interpretation for a pair of signs"""
-        # Get elements and qualities
-        element1 = self.sign_elements[sign1]
-        element2 = self.sign_elements[sign2]
-        
-        quality1 = self.sign_qualities[sign1]
-        quality2 = self.sign_qualities[sign2]
-        
-        # Calculate elemental compatibility
-        elem_score = self.element_compatibility[(element1, element2)]
-        quality_score = self.quality_compatibility[(quality1, quality2)]
-        
-        # Generate interpretation based on scores
-        if elem_score >= 8:
-            element_text = "strong natural harmony"
-        elif elem_score >= 6:
-            element_text = "good compatibility"
-        elif elem_score >= 4:
-            element_text = "moderate interaction"
-        else:
-            element_text = "potential challenges"
-        
-        if quality_score >= 7:
-            quality_text = "complementary approaches"
-        elif quality_score >= 5:
-            quality_text = "workable dynamics"
-        else:
-            quality_text = "potential friction in approaches"
-        
-        return f"{element_text} with {quality_text}"
+        return SIGN_PAIR_TEXTS[SIGN_INDEX[sign1]][SIGN_INDEX[sign2]]
 
     def _interpret_key_aspects(self, synastry_aspects):
         """Interpret the most significant aspects in the synastry"""
@@ -1969,3 +2332,58 @@ def generate_astrological_profile():
     else:
         print("Invalid option selected.")
 
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Astrological birth charts (interactive without a command)")
+    commands = parser.add_subparsers(dest="command")
+    batch_parser = commands.add_parser("batch", help="Generate birth charts for every record of a CSV or NDJSON file")
+    batch_parser.add_argument("input", help="CSV (birth_date, birth_time, birth_place, gender, id) or NDJSON file")
+    batch_parser.add_argument("-o", "--output", required=True, help="NDJSON output file, one line per record")
+    batch_parser.add_argument("--workers", type=int, default=None,
+                              help="Chart worker processes (default: CPU count; 0 builds charts in this process)")
+    batch_parser.add_argument("--unordered", action="store_true", help="Write records as they finish, not in input order")
+    batch_parser.add_argument("--resume", action="store_true", help="Skip records already in the output file and append")
+    batch_parser.add_argument("--chunk-size", type=int, default=200, help="Records per worker task")
+    batch_parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from the file extension)")
+    export_parser = commands.add_parser("export", help="Convert the NDJSON output of batch to Parquet for analytics")
+    export_parser.add_argument("input", help="NDJSON file written by the batch command")
+    export_parser.add_argument("-o", "--output", required=True,
+                               help="Directory for charts.parquet and aspects.parquet")
+    export_parser.add_argument("--row-group-size", type=int, default=50000, help="Charts per Parquet row group")
+    stats_parser = commands.add_parser("stats", help="Sign, house or aspect counts over an exported chart store")
+    stats_parser.add_argument("store", help="Directory written by the export command")
+    stats_parser.add_argument("query", choices=["signs", "houses", "aspects"])
+    stats_parser.add_argument("planets", nargs="*", help="Planet (signs, houses) or planet pair (aspects; all if omitted)")
+    stats_parser.add_argument("--by", help="Group key: a chart column, birth_decade or country")
+    stats_parser.add_argument("--workers", type=int, default=None,
+                              help="Worker processes (default: CPU count; 0 counts in this process)")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        import chart_stats
+        stats = chart_stats.ChartStats(args.store, workers=args.workers)
+        if args.query == "aspects":
+            result = stats.aspect_frequency(*args.planets[:2], by=args.by)
+        elif len(args.planets) != 1:
+            parser.error(f"{args.query} needs exactly one planet")
+        elif args.query == "signs":
+            result = stats.sign_distribution(args.planets[0], by=args.by)
+        else:
+            result = stats.house_occupancy(args.planets[0], by=args.by)
+        print(json.dumps(result, indent=2))
+    elif args.command == "export":
+        import chart_export
+        counts = chart_export.export_ndjson(args.input, args.output, args.row_group_size)
+        print(f"Exported {counts['charts']} charts and {counts['aspects']} aspects "
+              f"({counts['skipped']} error lines skipped) to {args.output}")
+    elif args.command == "batch":
+        import chart_batch
+        try:
+            chart_batch.run_batch(args.input, args.output, workers=args.workers, ordered=not args.unordered,
+                                  resume=args.resume, chunk_size=args.chunk_size, input_format=args.format)
+        except KeyboardInterrupt:
+            raise SystemExit(130)
+    else:
+        generate_astrological_profile()
@@ -0,0 +1,188 @@
+import threading
+import numpy as np
+import pytz
+
+
+# Julian day of the Unix epoch (1970-01-01 00:00 UT)
+UNIX_EPOCH_JD = 2440587.5
+SECONDS_PER_DAY = 86400.0
+
+# What to do with local times that occur twice (clocks set back) or never (clocks set forward):
+#   "standard" - use the standard-time offset, like pytz localize(is_dst=False),
+#                which is what calculate_julian_day does for a single record
+#   "dst"      - use the daylight-saving offset, like localize(is_dst=True)
+#   "raise"    - raise ValueError, like localize(is_dst=None)
+#   "nan"      - return NaN for those records
+DST_POLICIES = ("standard", "dst", "raise", "nan")
+
+# UTC-offset transition tables per timezone, built on first use (one per zone name)
+_transition_tables = {}
+_transition_tables_lock = threading.Lock()
+
+
+def transition_table(timezone_str):
+    """Get the UTC-offset transition table of a timezone
+
+    Returns:
+        Tuple (utc_starts, offsets, dst) of arrays: period i starts at utc_starts[i]
+        (seconds since the epoch, UT) and has UTC offset offsets[i] (seconds);
+        dst[i] tells whether it is daylight-saving time. Fixed-offset zones have
+        a single period.
+    """
+    with _transition_tables_lock:
+        table = _transition_tables.get(timezone_str)
+    if table is not None:
+        return table
+
+    timezone = pytz.timezone(timezone_str)
+    transition_times = getattr(timezone, "_utc_transition_times", None)
+    if transition_times:
+        utc_starts = np.array(transition_times, dtype="datetime64[s]").astype(np.int64)
+        utc_starts[0] = np.iinfo(np.int64).min // 2  # the first period has no start
+        offsets = np.array([info[0].total_seconds() for info in timezone._transition_info], dtype=np.int64)
+        dst = np.array([bool(info[1]) for info in timezone._transition_info])
+    else:
+        utc_starts = np.array([np.iinfo(np.int64).min // 2], dtype=np.int64)
+        offsets = np.array([timezone.utcoffset(None).total_seconds()], dtype=np.int64)
+        dst = np.array([False])
+
+    table = (utc_starts, offsets, dst)
+    for array in table:
+        array.flags.writeable = False
+    with _transition_tables_lock:
+        _transition_tables[timezone_str] = table
+    return table
+
+
+def local_seconds(dates, times):
+    """Convert local calendar dates and times to seconds since 1970-01-01 00:00 (no timezone)
+
+    Args:
+        dates: (year, month, day) rows, shape (n, 3)
+        times: (hour, minute, second) rows, shape (n, 3)
+
+    Returns:
+        Integer array of shape (n,); raises ValueError if a row is not a valid date or time
+    """
+    dates = np.asarray(dates, dtype=np.int64).reshape(-1, 3)
+    times = np.asarray(times, dtype=np.int64).reshape(-1, 3)
+    if len(dates) != len(times):
+        raise ValueError(f"Got {len(dates)} dates but {len(times)} times")
+    year, month, day = dates.T
+    hour, minute, second = times.T
+
+    months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    invalid = ((month < 1) | (month > 12) | (day < 1) | (day > days_in_month) |
+               (hour < 0) | (hour > 23) | (minute < 0) | (minute > 59) | (second < 0) | (second > 59))
+    if invalid.any():
+        index = int(np.argmax(invalid))
+        raise ValueError(f"Invalid date or time in record {index}: {tuple(dates[index].tolist())} {tuple(times[index].tolist())}")
+
+    days = months.astype("datetime64[D]").astype(np.int64) + (day - 1)
+    return days * 86400 + hour * 3600 + minute * 60 + second
+
+
+def _resolve(candidates_earlier, candidates_later, dst, offsets, policy, kind, records):
+    """Pick between two candidate periods for ambiguous or nonexistent local times
+
+    Returns the chosen period index per row (-1 for "nan").
+    """
+    if policy == "raise":
+        raise ValueError(f"{len(records)} {kind} local times, the first in record {records[0]}")
+    if policy == "nan":
+        return np.full(len(records), -1)
+
+    want_dst = policy == "dst"
+    if kind == "nonexistent":
+        # pytz shifts the time by a few hours to one side of the gap and uses that offset
+        return candidates_later if want_dst else candidates_earlier
+
+    # Ambiguous: the period whose DST flag matches; if both or neither match (a zone
+    # changed its standard offset), the earlier instant for "dst", the later for "standard"
+    earlier_matches = dst[candidates_earlier] == want_dst
+    later_matches = dst[candidates_later] == want_dst
+    earlier_utc_is_first = offsets[candidates_earlier] >= offsets[candidates_later]
+    fallback = np.where(earlier_utc_is_first == want_dst, candidates_earlier, candidates_later)
+    return np.where(earlier_matches & ~later_matches, candidates_earlier,
+                    np.where(later_matches & ~earlier_matches, candidates_later, fallback))
+
+
+def utc_seconds(seconds, timezone_str, ambiguous="standard", nonexistent="standard", records=None):
+    """Convert local times in one timezone (seconds from local_seconds) to UT seconds
+
+    Each time is placed in the transition table with a binary search (np.searchsorted),
+    so the cost per record is a few array operations rather than a pytz call.
+    records optionally numbers the times for error messages.
+
+    Returns:
+        Float array of UT seconds since the epoch (NaN where the policy says "nan")
+    """
+    for kind, policy in (("ambiguous", ambiguous), ("nonexistent", nonexistent)):
+        if policy not in DST_POLICIES:
+            raise ValueError(f"Unknown {kind} time policy: {policy} (expected one of {', '.join(DST_POLICIES)})")
+
+    utc_starts, offsets, dst = transition_table(timezone_str)
+    seconds = np.asarray(seconds, dtype=np.int64)
+    records = np.arange(len(seconds)) if records is None else np.asarray(records)
+
+    # Local wall-clock start and end of each period
+    local_starts = utc_starts + offsets
+    local_ends = np.append(utc_starts[1:] + offsets[:-1], np.iinfo(np.int64).max // 2)
+
+    # Latest period starting (in local time) at or before each time
+    period = np.maximum(np.searchsorted(local_starts, seconds, side="right") - 1, 0)
+
+    # Nonexistent: past the local end of that period, before the next one starts (clocks set forward)
+    nonexistent_rows = np.flatnonzero((seconds >= local_ends[period]) & (period + 1 < len(offsets)))
+    # Ambiguous: still inside the previous period as well (clocks set back)
+    previous = np.maximum(period - 1, 0)
+    ambiguous_rows = np.flatnonzero((period > 0) & (seconds < local_ends[previous]))
+
+    chosen = period.copy()
+    if len(nonexistent_rows):
+        chosen[nonexistent_rows] = _resolve(period[nonexistent_rows], period[nonexistent_rows] + 1, dst, offsets,
+                                            nonexistent, "nonexistent", records[nonexistent_rows])
+    if len(ambiguous_rows):
+        chosen[ambiguous_rows] = _resolve(previous[ambiguous_rows], period[ambiguous_rows], dst, offsets,
+                                          ambiguous, "ambiguous", records[ambiguous_rows])
+
+    result = (seconds - offsets[chosen]).astype(float)
+    result[chosen < 0] = np.nan
+    return result
+
+
+def local_times_to_julian_days(dates, times, timezones, ambiguous="standard", nonexistent="standard"):
+    """Convert many local dates and times to Julian days (UT) at once
+
+    Vectorized equivalent of AstrologyTool.local_time_to_julian_day: records are
+    grouped by timezone, each group is converted with that zone's transition table,
+    and Julian days are computed arithmetically (proleptic Gregorian calendar, as
+    swe.julday). Results agree with swe.julday to floating-point precision.
+
+    Args:
+        dates: (year, month, day) rows, shape (n, 3)
+        times: (hour, minute, second) rows, shape (n, 3)
+        timezones: One timezone name for all records, or one name per record
+        ambiguous: Policy for local times that occur twice (see DST_POLICIES)
+        nonexistent: Policy for local times skipped by a clock change (see DST_POLICIES)
+
+    Returns:
+        Float array of Julian days with shape (n,)
+    """
+    seconds = local_seconds(dates, times)
+    if isinstance(timezones, str):
+        return UNIX_EPOCH_JD + utc_seconds(seconds, timezones, ambiguous, nonexistent) / SECONDS_PER_DAY
+
+    timezones = np.asarray(timezones)
+    if timezones.shape != seconds.shape:
+        raise ValueError(f"Got {len(timezones)} timezones for {len(seconds)} records")
+
+    utc = np.empty(len(seconds))
+    zone_names, zone_of_record = np.unique(timezones, return_inverse=True)
+    order = np.argsort(zone_of_record, kind="stable")
+    bounds = np.searchsorted(zone_of_record[order], np.arange(len(zone_names) + 1))
+    for zone, timezone_str in enumerate(zone_names):
+        rows = order[bounds[zone]:bounds[zone + 1]]
+        utc[rows] = utc_seconds(seconds[rows], str(timezone_str), ambiguous, nonexistent, records=rows)
+    return UNIX_EPOCH_JD + utc / SECONDS_PER_DAY
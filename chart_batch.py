@@ -0,0 +1,327 @@
+import csv
+import datetime
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from astrology_tool import AstrologyTool
+from batch_time import local_times_to_julian_days
+from geocoding import BATCH
+
+
+# Records sent to a worker process at a time
+CHUNK_SIZE = 200
+
+# Chunks in flight per worker; bounds memory however large the input file is
+CHUNKS_PER_WORKER = 2
+
+# Bytes read at a time when looking for the end of the last complete output line on resume
+RESUME_BLOCK_SIZE = 64 * 1024
+
+# Seconds between progress reports on stderr
+REPORT_SECONDS = 5.0
+
+# Chart builder of a worker process, created once per process by _init_worker
+_worker_tool = None
+
+
+class BirthRecord:
+    def __init__(self, number, record_id=None, birth_date=None, birth_time=None, birth_place=None, gender="Other",
+                 error=None):
+        """One input row; error is set when the row could not be parsed"""
+        self.number = number
+        self.id = record_id
+        self.birth_date = birth_date
+        self.birth_time = birth_time
+        self.birth_place = birth_place
+        self.gender = gender
+        self.error = error
+
+
+def parse_date(value):
+    """Parse a birth date given as "YYYY-MM-DD" or [year, month, day]"""
+    if isinstance(value, str):
+        value = value.strip().split("-")
+    year, month, day = (int(part) for part in value)
+    datetime.date(year, month, day)
+    return year, month, day
+
+
+def parse_time(value):
+    """Parse a birth time given as "HH:MM[:SS]" or [hour, minute(, second)]"""
+    if isinstance(value, str):
+        value = value.strip().split(":")
+    parts = [int(part) for part in value]
+    if len(parts) == 2:
+        parts.append(0)
+    hour, minute, second = parts
+    datetime.time(hour, minute, second)
+    return hour, minute, second
+
+
+def read_records(path, input_format=None):
+    """Stream the birth records of a CSV or NDJSON file
+
+    CSV files need birth_date, birth_time and birth_place columns, and may have gender
+    and id columns. NDJSON lines are objects with the same fields, as in the
+    /birth-chart request body. Records are numbered from 0 in file order.
+    """
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (line for line in f if line.strip())
+
+        for number, row in enumerate(rows):
+            try:
+                if input_format != "csv":
+                    row = json.loads(row)
+                birth_place = (row.get("birth_place") or "").strip()
+                if not birth_place:
+                    raise ValueError("Missing birth_place")
+                yield BirthRecord(number, row.get("id"), parse_date(row["birth_date"]), parse_time(row["birth_time"]),
+                                  birth_place, row.get("gender") or "Other")
+            except (KeyError, TypeError, ValueError) as e:
+                message = f"Missing field {e}" if isinstance(e, KeyError) else f"Invalid record: {e}"
+                yield BirthRecord(number, row.get("id") if isinstance(row, dict) else None, error=message)
+
+
+def completed_records(path):
+    """Get the numbers of the records already in an output file, for resuming
+
+    A partly written last line (from an interrupted run) is cut off.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        # Find the end of the last complete line from the back, a block at a time
+        size = end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - RESUME_BLOCK_SIZE)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            f.truncate(end)
+
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                done.add(json.loads(line)["record"])
+    return done
+
+
+def resolve_places(tool, places, places_path, resume, report):
+    """Geocode and find the timezone of every distinct birth place once
+
+    Coordinates are also written to places_path as they arrive; with resume, places
+    already found there (by an interrupted run) are not geocoded again.
+
+    Returns:
+        Dictionary mapping each place to (latitude, longitude, timezone) or to an error message
+    """
+    known = {}
+    if resume and os.path.exists(places_path):
+        with open(places_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # partly written last line
+                known[entry["place"]] = (entry["latitude"], entry["longitude"])
+
+    coordinates = {place: known[place] for place in places if place in known}
+    missing = [place for place in places if place not in known]
+    finished = [len(coordinates)]
+    with open(places_path, "a" if resume else "w", encoding="utf-8") as places_file:
+        def save(place, result):
+            if not isinstance(result, Exception):
+                places_file.write(json.dumps({"place": place, "latitude": result[0], "longitude": result[1]}) + "\n")
+                places_file.flush()
+            finished[0] += 1
+            report(f"Geocoded {finished[0]}/{len(places)} places")
+
+        coordinates.update(tool.geocoding.geocode_many(missing, BATCH, progress=save))
+
+    resolved = {}
+    timezones = {}
+    for place, result in coordinates.items():
+        if isinstance(result, Exception):
+            resolved[place] = f"Error getting coordinates: {result}"
+            continue
+        try:
+            if result not in timezones:
+                timezones[result] = tool.get_timezone(*result)
+            resolved[place] = (result[0], result[1], timezones[result])
+        except Exception as e:
+            resolved[place] = str(e)
+    return resolved
+
+
+def _init_worker():
+    """Create the chart builder of a worker process (its progress messages are discarded)"""
+    global _worker_tool
+    # Ctrl-C is handled by the parent, which stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout = open(os.devnull, "w")
+    _worker_tool = AstrologyTool()
+
+
+def _build_charts(tasks):
+    """Build the charts of one chunk and return their output lines and the number of errors
+
+    Each task is (record, id, error) for a record that already failed, or
+    (record, id, birth_date, birth_time, birth_place, gender, latitude, longitude, jd, timezone).
+    """
+    lines = []
+    errors = 0
+    for task in tasks:
+        number, record_id = task[0], task[1]
+        output = {"record": number, "id": record_id}
+        if len(task) == 3:
+            output["error"] = task[2]
+        else:
+            try:
+                output["chart"] = _worker_tool.build_birth_chart(*task[2:])
+            except Exception as e:
+                output["error"] = str(e)
+        errors += "error" in output
+        lines.append(json.dumps(output) + "\n")
+    return lines, errors
+
+
+def prepare_chunk(records, places):
+    """Turn parsed records into chart tasks, converting their local times to Julian days in one step"""
+    tasks = [None] * len(records)
+    valid = []
+    for index, record in enumerate(records):
+        place = None if record.error else places.get(record.birth_place)
+        if record.error or isinstance(place, str):
+            tasks[index] = (record.number, record.id, record.error or place)
+        else:
+            valid.append(index)
+
+    if valid:
+        jds = local_times_to_julian_days(
+            [records[index].birth_date for index in valid],
+            [records[index].birth_time for index in valid],
+            [places[records[index].birth_place][2] for index in valid]
+        )
+        for index, jd in zip(valid, jds):
+            record = records[index]
+            latitude, longitude, timezone = places[record.birth_place]
+            tasks[index] = (record.number, record.id, record.birth_date, record.birth_time, record.birth_place,
+                            record.gender, latitude, longitude, float(jd), timezone)
+    return tasks
+
+
+def run_batch(input_path, output_path, workers=None, ordered=True, resume=False, chunk_size=CHUNK_SIZE,
+              input_format=None, report_seconds=REPORT_SECONDS):
+    """Generate birth charts for every record of a CSV or NDJSON file
+
+    Every distinct birth place is geocoded (at the geocoder's batch rate) and given a
+    timezone once; then charts are built in a process pool, a chunk of records at a
+    time, with a bounded number of chunks in flight. Each record becomes one NDJSON
+    line {"record", "id", "chart"} or {"record", "id", "error"}, in input order unless
+    ordered is False. With resume, records already in the output file are skipped,
+    new lines are appended, and places geocoded before (kept in <output>.places) are
+    not looked up again.
+
+    Returns:
+        Dictionary with the numbers of records written, errors, skipped records and seconds taken
+    """
+    started = time.monotonic()
+    last_report = [0.0]
+
+    def report(message, force=False):
+        now = time.monotonic()
+        if force or now - last_report[0] >= report_seconds:
+            last_report[0] = now
+            print(f"[{now - started:7.1f}s] {message}", file=sys.stderr, flush=True)
+
+    tool = AstrologyTool()
+    done = completed_records(output_path) if resume else set()
+    if done:
+        report(f"Resuming: {len(done)} records already written", force=True)
+
+    # First pass: distinct birth places of the records still to do
+    places = {record.birth_place for record in read_records(input_path, input_format)
+              if record.error is None and record.number not in done}
+    report(f"{len(places)} distinct birth places", force=True)
+    places = resolve_places(tool, places, output_path + ".places", resume, report)
+
+    # Second pass: build the charts
+    workers = os.cpu_count() if workers is None else workers
+    global _worker_tool
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    else:
+        pool = None
+        _worker_tool = tool
+    max_in_flight = max(1, workers) * CHUNKS_PER_WORKER
+
+    stats = {"written": 0, "errors": 0, "skipped": len(done)}
+    in_flight = deque()
+    charts_started = time.monotonic()
+
+    def write(result):
+        lines, errors = result
+        out.writelines(lines)
+        out.flush()
+        stats["written"] += len(lines)
+        stats["errors"] += errors
+        rate = stats["written"] / max(time.monotonic() - charts_started, 1e-9)
+        report(f"{stats['written']} charts written ({rate:.0f}/s), {stats['errors']} errors")
+
+    def drain(limit):
+        while len(in_flight) > limit:
+            if ordered:
+                write(in_flight.popleft().result())
+            else:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.remove(future)
+                    write(future.result())
+
+    def chunks():
+        chunk = []
+        for record in read_records(input_path, input_format):
+            if record.number in done:
+                continue
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        try:
+            for chunk in chunks():
+                tasks = prepare_chunk(chunk, places)
+                if pool is None:
+                    write(_build_charts(tasks))
+                    continue
+                in_flight.append(pool.submit(_build_charts, tasks))
+                drain(max_in_flight - 1)
+            drain(0)
+        except KeyboardInterrupt:
+            report("Interrupted; run again with --resume to continue", force=True)
+            raise
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    stats["seconds"] = round(time.monotonic() - started, 2)
+    rate = stats["written"] / max(time.monotonic() - charts_started, 1e-9)
+    report(f"Done: {stats['written']} records written ({rate:.0f} charts/s), {stats['errors']} errors, "
+           f"{stats['skipped']} skipped, {stats['seconds']}s", force=True)
+    return stats
@@ -0,0 +1,193 @@
+import json
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from astrology_tool import PLANETS, SIGNS, birth_coordinates
+from house_lookup import chart_cusps, houses_for_longitudes
+
+
+# Charts per Parquet row group; the writer holds at most one row group in memory
+ROW_GROUP_SIZE = 50000
+
+PLANET_NAMES = tuple(PLANETS.values())
+
+# Sign columns hold indices into SIGNS, which are stored in the file metadata
+CHART_SCHEMA = pa.schema(
+    [
+        ("record", pa.int64()),
+        ("id", pa.string()),
+        ("birth_year", pa.int16()),
+        ("birth_month", pa.int8()),
+        ("birth_day", pa.int8()),
+        ("birth_time", pa.string()),
+        ("place", pa.dictionary(pa.int32(), pa.string())),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("timezone", pa.dictionary(pa.int32(), pa.string())),
+        ("julian_day", pa.float64()),
+        ("ascendant", pa.float64()),
+        ("ascendant_sign", pa.int8()),
+        ("midheaven", pa.float64()),
+        ("midheaven_sign", pa.int8()),
+    ]
+    + [(f"house_{number}", pa.float64()) for number in range(1, 13)]
+    + [
+        (f"{planet.lower()}_{field}", field_type)
+        for planet in PLANET_NAMES
+        for field, field_type in (("longitude", pa.float64()), ("sign", pa.int8()), ("house", pa.int8()),
+                                  ("speed", pa.float64()))
+    ],
+    metadata={"signs": json.dumps(SIGNS), "planets": json.dumps(PLANET_NAMES)}
+)
+
+ASPECT_SCHEMA = pa.schema([
+    ("record", pa.int64()),
+    ("planet1", pa.dictionary(pa.int8(), pa.string())),
+    ("planet2", pa.dictionary(pa.int8(), pa.string())),
+    ("aspect", pa.dictionary(pa.int8(), pa.string())),
+    ("orb", pa.float64()),
+    ("nature", pa.dictionary(pa.int8(), pa.string())),
+])
+
+
+def sign_indices(longitudes):
+    """Sign index (0 = Aries) of ecliptic longitudes, as in build_birth_chart"""
+    return (np.asarray(longitudes) // 30).astype(np.int8) % 12
+
+
+class ChartParquetWriter:
+    def __init__(self, directory, row_group_size=ROW_GROUP_SIZE, compression="zstd"):
+        """Columnar export of birth charts to <directory>/charts.parquet and aspects.parquet
+
+        charts.parquet has one row per chart, with one column per planet longitude,
+        sign index, house and speed; aspects.parquet has one row per aspect (long
+        format) with the chart's record number. Charts are buffered in NumPy arrays
+        and written one row group at a time, so memory stays constant however many
+        charts are exported.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.row_group_size = row_group_size
+        self.charts_writer = pq.ParquetWriter(os.path.join(directory, "charts.parquet"), CHART_SCHEMA,
+                                              compression=compression)
+        self.aspects_writer = pq.ParquetWriter(os.path.join(directory, "aspects.parquet"), ASPECT_SCHEMA,
+                                               compression=compression)
+        self.rows = 0
+        self.charts_written = 0
+        self.aspects_written = 0
+        self._new_buffers()
+
+    def _new_buffers(self):
+        size = self.row_group_size
+        planets = len(PLANET_NAMES)
+        self.numbers = np.zeros((size, 4), dtype=np.int64)  # record, year, month, day
+        self.angles = np.zeros((size, 5))                   # latitude, longitude, julian day, ascendant, midheaven
+        self.cusps = np.zeros((size, 12))
+        self.planet_longitudes = np.zeros((size, planets))
+        self.planet_speeds = np.zeros((size, planets))
+        self.strings = {"id": [], "birth_time": [], "place": [], "timezone": []}
+        self.aspects = {"record": [], "planet1": [], "planet2": [], "aspect": [], "orb": [], "nature": []}
+
+    def write(self, record, chart, record_id=None):
+        """Add one chart (as returned by create_birth_chart) under its record number"""
+        birth_info = chart["birth_info"]
+        chart_data = chart["chart_data"]
+        day, month, year = (int(part) for part in birth_info["date"].split("/"))
+        latitude, longitude = birth_coordinates(chart)
+
+        row = self.rows
+        self.numbers[row] = (record, year, month, day)
+        self.angles[row] = (latitude, longitude, chart_data["julian_day"], chart_data["ascendant"]["degree"],
+                            chart_data["midheaven"]["degree"])
+        self.cusps[row] = chart_cusps(chart_data)
+        planets = chart_data["planets"]
+        self.planet_longitudes[row] = [planets[name]["longitude"] for name in PLANET_NAMES]
+        self.planet_speeds[row] = [planets[name]["speed"] for name in PLANET_NAMES]
+        self.strings["id"].append(None if record_id is None else str(record_id))
+        self.strings["birth_time"].append(birth_info["time"])
+        self.strings["place"].append(birth_info["place"])
+        self.strings["timezone"].append(birth_info["timezone"])
+
+        for aspect in chart_data["aspects"]:
+            self.aspects["record"].append(record)
+            for field in ("planet1", "planet2", "aspect", "orb", "nature"):
+                self.aspects[field].append(aspect[field])
+
+        self.rows += 1
+        if self.rows == self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered charts and their aspects as one row group of each file"""
+        count = self.rows
+        if not count:
+            return
+        numbers, angles = self.numbers[:count], self.angles[:count]
+        longitudes = self.planet_longitudes[:count]
+        houses = houses_for_longitudes(self.cusps[:count], longitudes)
+
+        columns = {
+            "record": numbers[:, 0],
+            "id": self.strings["id"],
+            "birth_year": numbers[:, 1].astype(np.int16),
+            "birth_month": numbers[:, 2].astype(np.int8),
+            "birth_day": numbers[:, 3].astype(np.int8),
+            "birth_time": self.strings["birth_time"],
+            "place": self.strings["place"],
+            "latitude": angles[:, 0],
+            "longitude": angles[:, 1],
+            "timezone": self.strings["timezone"],
+            "julian_day": angles[:, 2],
+            "ascendant": angles[:, 3],
+            "ascendant_sign": sign_indices(angles[:, 3]),
+            "midheaven": angles[:, 4],
+            "midheaven_sign": sign_indices(angles[:, 4]),
+        }
+        for number in range(12):
+            columns[f"house_{number + 1}"] = self.cusps[:count, number]
+        for index, planet in enumerate(PLANET_NAMES):
+            prefix = planet.lower()
+            columns[f"{prefix}_longitude"] = longitudes[:, index]
+            columns[f"{prefix}_sign"] = sign_indices(longitudes[:, index])
+            columns[f"{prefix}_house"] = houses[:, index].astype(np.int8)
+            columns[f"{prefix}_speed"] = self.planet_speeds[:count, index]
+
+        self.charts_writer.write_table(pa.Table.from_pydict(columns, schema=CHART_SCHEMA))
+        self.aspects_writer.write_table(pa.Table.from_pydict(self.aspects, schema=ASPECT_SCHEMA))
+        self.charts_written += count
+        self.aspects_written += len(self.aspects["record"])
+        self.rows = 0
+        self.strings = {name: [] for name in self.strings}
+        self.aspects = {name: [] for name in self.aspects}
+
+    def close(self):
+        self.flush()
+        self.charts_writer.close()
+        self.aspects_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_ndjson(ndjson_path, directory, row_group_size=ROW_GROUP_SIZE):
+    """Convert the NDJSON output of the batch command to Parquet, streaming
+
+    Error lines are skipped.
+
+    Returns:
+        Dictionary with the numbers of charts and aspects written and error lines skipped
+    """
+    skipped = 0
+    with ChartParquetWriter(directory, row_group_size) as writer, open(ndjson_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            output = json.loads(line)
+            if "chart" not in output:
+                skipped += 1
+                continue
+            writer.write(output["record"], output["chart"], output.get("id"))
+    return {"charts": writer.charts_written, "aspects": writer.aspects_written, "skipped": skipped}
@@ -0,0 +1,225 @@
+import json
+import threading
+import numpy as np
+import pyarrow.parquet as pq
+from astrology_tool import PLANETS
+
+
+PLANET_NAMES = tuple(PLANETS.values())
+ANGLE_NAMES = ("Ascendant", "Midheaven")
+POINT_NAMES = PLANET_NAMES + ANGLE_NAMES
+
+# Weight of each point in the similarity. Personal points count most; the slow outer
+# planets are shared by everyone born within a few years, so they count little.
+DEFAULT_WEIGHTS = {
+    "Sun": 3.0, "Moon": 3.0, "Ascendant": 3.0,
+    "Mercury": 2.0, "Venus": 2.0, "Mars": 2.0, "Midheaven": 1.0,
+    "Jupiter": 1.0, "Saturn": 1.0, "Uranus": 0.5, "Neptune": 0.5, "Pluto": 0.5
+}
+
+# Query x chart scores computed at a time; bounds the search's memory whatever the corpus size
+BLOCK_SCORES = 2 ** 22
+
+# Rows allocated when an empty index gets its first charts; capacity doubles after that
+INITIAL_CAPACITY = 1024
+
+
+def chart_points(chart):
+    """Longitudes of a chart's points in POINT_NAMES order, chart as returned by create_birth_chart"""
+    chart_data = chart["chart_data"]
+    planets = chart_data["planets"]
+    return ([planets[name]["longitude"] for name in PLANET_NAMES]
+            + [chart_data["ascendant"]["degree"], chart_data["midheaven"]["degree"]])
+
+
+class ChartSimilarityIndex:
+    def __init__(self, weights=None):
+        """Nearest-neighbour index of birth charts by the positions of their points
+
+        Each point's longitude becomes (cos, sin) scaled by the square root of its
+        weight, so the dot product of two embeddings is the weighted sum of the cosines
+        of the differences between their points. Longitudes wrap correctly (359 degrees
+        is next to 1 degree), and the squared Euclidean distance is 2 * (total weight -
+        dot product), so nearest neighbours are the highest dot products. Queries are a
+        blocked brute-force search with NumPy matrix products. Charts can be added at
+        any time; searches running meanwhile see the charts present when they started
+        (and a replaced chart in either version).
+
+        Args:
+            weights: Weight per point name (POINT_NAMES), default DEFAULT_WEIGHTS; points
+                with weight 0 are left out
+        """
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown = set(weights) - set(POINT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown points: {', '.join(sorted(unknown))}")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Weights must not be negative")
+        self.weights = {name: float(weights.get(name, 0.0)) for name in POINT_NAMES}
+        self.points = [index for index, name in enumerate(POINT_NAMES) if self.weights[name] > 0]
+        if not self.points:
+            raise ValueError("At least one point needs a positive weight")
+        self.scale = np.sqrt([self.weights[POINT_NAMES[index]] for index in self.points])
+        self.total_weight = float(np.sum(self.scale ** 2))
+
+        self.ids = []
+        self.positions = {}
+        self.vectors = np.zeros((0, 2 * len(self.points)), dtype=np.float32)
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def embed(self, longitudes):
+        """Embed point longitudes, shape (n, len(POINT_NAMES)) in degrees, as (n, 2 * points) vectors"""
+        longitudes = np.asarray(longitudes, dtype=float)
+        if longitudes.ndim != 2 or longitudes.shape[1] != len(POINT_NAMES):
+            raise ValueError(f"Expected longitudes of shape (n, {len(POINT_NAMES)}), got {longitudes.shape}")
+        radians = np.radians(longitudes[:, self.points])
+        return np.hstack([np.cos(radians) * self.scale, np.sin(radians) * self.scale]).astype(np.float32)
+
+    def add(self, ids, longitudes):
+        """Add charts by id and point longitudes (see embed); an id already in the index is replaced"""
+        vectors = self.embed(longitudes)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} charts")
+
+        with self.lock:
+            for user_id, vector in zip(ids, vectors):
+                position = self.positions.get(user_id)
+                if position is not None:
+                    self.vectors[position] = vector
+                    continue
+                if self.size == len(self.vectors):
+                    # Running searches keep the old array, which is never written below their size
+                    grown = np.zeros((max(2 * self.size, INITIAL_CAPACITY), self.vectors.shape[1]), dtype=np.float32)
+                    grown[:self.size] = self.vectors[:self.size]
+                    self.vectors = grown
+                self.positions[user_id] = self.size
+                self.ids.append(user_id)
+                self.vectors[self.size] = vector
+                self.size += 1
+
+    def add_charts(self, charts):
+        """Add (id, chart) pairs, charts as returned by create_birth_chart"""
+        charts = list(charts)
+        self.add([user_id for user_id, _ in charts], [chart_points(chart) for _, chart in charts])
+
+    def search(self, longitudes, k=10, exclude=None):
+        """Find the k most similar charts to each query
+
+        Args:
+            longitudes: Point longitudes of the queries, shape (m, len(POINT_NAMES))
+            k: Neighbours per query
+            exclude: Optional id per query (or None) to leave out, e.g. the querying user
+
+        Returns:
+            Tuple (ids, similarities): lists of m lists of up to k ids, most similar first,
+            and their similarity (the weighted mean cosine of the point differences, 1 for
+            identical charts)
+        """
+        return self._search(self.embed(longitudes), k, exclude)
+
+    def _search(self, queries, k, exclude=None):
+        """Blocked k-NN search for embedded queries"""
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        with self.lock:
+            size, vectors, ids = self.size, self.vectors, self.ids
+            excluded = [self.positions.get(user_id, -1) if user_id is not None else -1
+                        for user_id in (exclude or [None] * len(queries))]
+        k = min(k, size)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_positions = np.zeros((len(queries), 0), dtype=np.int64)
+        rows = np.arange(len(queries))[:, None]
+
+        block_size = max(BLOCK_SCORES // max(len(queries), 1), k)
+        for start in range(0, size, block_size):
+            block = vectors[start:min(start + block_size, size)]
+            scores = queries @ block.T
+            for row, position in enumerate(excluded):
+                if start <= position < start + len(block):
+                    scores[row, position - start] = -np.inf
+
+            # Keep the k best of this block and the best so far
+            scores = np.hstack([best_scores, scores])
+            positions = np.hstack([best_positions, np.broadcast_to(np.arange(start, start + len(block)),
+                                                                   (len(queries), len(block)))])
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores, positions = scores[rows, keep], positions[rows, keep]
+            best_scores, best_positions = scores, positions
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores, best_positions = best_scores[rows, order], best_positions[rows, order]
+        similarities = np.minimum(best_scores.astype(float) / self.total_weight, 1.0)
+        result_ids, result_similarities = [], []
+        for query_scores, query_positions, query_similarities in zip(best_scores, best_positions, similarities):
+            found = np.isfinite(query_scores)
+            result_ids.append([ids[position] for position in query_positions[found].tolist()])
+            result_similarities.append(query_similarities[found].tolist())
+        return result_ids, result_similarities
+
+    def similar_charts(self, chart, k=10):
+        """The k charts most similar to a chart as returned by create_birth_chart, as [{"id", "similarity"}]"""
+        ids, similarities = self.search([chart_points(chart)], k)
+        return [{"id": user_id, "similarity": round(similarity, 4)} for user_id, similarity in zip(ids[0], similarities[0])]
+
+    def neighbors_of(self, user_id, k=10):
+        """The k charts most similar to a chart in the index, leaving out the chart itself"""
+        with self.lock:
+            position = self.positions.get(user_id)
+            if position is None:
+                raise ValueError(f"Unknown chart id: {user_id}")
+            vector = self.vectors[position:position + 1].copy()
+        ids, similarities = self._search(vector, k, exclude=[user_id])
+        return [{"id": other, "similarity": round(similarity, 4)} for other, similarity in zip(ids[0], similarities[0])]
+
+    def save(self, path):
+        """Write the index to a .npz file"""
+        with self.lock:
+            ids = list(self.ids)
+            vectors = self.vectors[:self.size].copy()
+        # np.array turns mixed ids into strings, so the types are checked first
+        if not (all(isinstance(user_id, str) for user_id in ids)
+                or all(isinstance(user_id, (int, np.integer)) and not isinstance(user_id, bool) for user_id in ids)):
+            raise ValueError("Chart ids must all be strings or all be integers to be saved")
+        ids = np.array(ids, dtype=str if ids and isinstance(ids[0], str) else np.int64)
+        np.savez(path, ids=ids, vectors=vectors, weights=np.array(json.dumps(self.weights)))
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(json.loads(str(data["weights"])))
+            vectors = data["vectors"]
+            if vectors.shape[1] != 2 * len(index.points):
+                raise ValueError(f"Index file {path} does not match its weights")
+            index.ids = data["ids"].tolist()
+        index.vectors = vectors.astype(np.float32)
+        index.size = len(index.ids)
+        index.positions = {user_id: position for position, user_id in enumerate(index.ids)}
+        return index
+
+    @classmethod
+    def from_parquet(cls, directory, id_column="id", weights=None):
+        """Build an index from a chart store written by ChartParquetWriter
+
+        Every chart needs its own id; input records without one have a null "id", so
+        such stores are indexed by input record number with id_column="record".
+        """
+        columns = [f"{name.lower()}_longitude" for name in PLANET_NAMES] + ["ascendant", "midheaven"]
+        index = cls(weights)
+        charts = 0
+        for batch in pq.ParquetFile(f"{directory}/charts.parquet").iter_batches(columns=[id_column] + columns):
+            ids = batch.column(id_column).to_pylist()
+            if None in ids:
+                raise ValueError(f"Charts without an {id_column} in {directory}; index them by id_column=\"record\"")
+            longitudes = np.column_stack([batch.column(column).to_numpy() for column in columns])
+            index.add(ids, longitudes)
+            charts += len(ids)
+            # add replaces a chart whose id is already in the index, so a duplicate leaves size behind
+            if index.size != charts:
+                raise ValueError(f"Duplicate chart ids in the {id_column} column of {directory}")
+        return index
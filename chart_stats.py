@@ -0,0 +1,217 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from astrology_tool import ASPECTS, SIGNS
+from chart_export import PLANET_NAMES
+
+
+# Finished query results, keyed by query signature (store files, query kind and parameters)
+QUERY_CACHE_SIZE = 256
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+ASPECT_NAMES = tuple(ASPECTS.keys())
+HOUSE_NUMBERS = tuple(range(1, 13))
+
+# Group keys computed from stored columns; any other chart column can be grouped on directly
+DERIVED_KEYS = ("birth_decade", "country")
+
+
+def _group_codes(table, by):
+    """Group code per chart row for a group key
+
+    Dictionary-encoded columns are grouped on their dictionary indices, and "country"
+    (the last comma-separated part of the birth place) is derived from the place
+    dictionary, so only distinct values are handled in Python.
+
+    Returns:
+        Tuple (labels, codes): the group labels and an integer array of indices into them
+    """
+    if by is None:
+        return ["all"], np.zeros(table.num_rows, dtype=np.int64)
+
+    if by == "birth_decade":
+        decades = table.column("birth_year").to_numpy().astype(np.int64) // 10 * 10
+        labels, codes = np.unique(decades, return_inverse=True)
+        return [f"{decade}s" for decade in labels.tolist()], codes
+
+    column = table.column("place" if by == "country" else by)
+    if pa.types.is_dictionary(column.type):
+        column = column.unify_dictionaries().combine_chunks()
+        values = column.dictionary.to_pylist()
+        indices = column.indices.to_numpy(zero_copy_only=False)
+        if by == "country":
+            values = [value.rsplit(",", 1)[-1].strip() for value in values]
+        labels, value_codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        return labels.tolist(), value_codes[indices]
+
+    labels, codes = np.unique(column.to_numpy(zero_copy_only=False), return_inverse=True)
+    return labels.tolist(), codes
+
+
+def _group_columns(by):
+    if by is None:
+        return []
+    if by == "birth_decade":
+        return ["birth_year"]
+    if by == "country":
+        return ["place"]
+    return [by]
+
+
+def _count_chart_row_groups(charts_path, row_groups, column, categories, by):
+    """Count a per-chart category column (sign index or house) by group over some row groups"""
+    table = pq.ParquetFile(charts_path).read_row_groups(row_groups, columns=[column] + _group_columns(by))
+    labels, codes = _group_codes(table, by)
+    values = table.column(column).to_numpy().astype(np.int64)
+    if column.endswith("_house"):
+        values = values - 1
+    counts = np.bincount(codes * categories + values, minlength=len(labels) * categories)
+    charts = np.bincount(codes, minlength=len(labels))
+    return labels, counts.reshape(len(labels), categories), charts
+
+
+def _name_codes(column, names):
+    """Index into names of each value of a (dictionary-encoded) string column, -1 if not in names"""
+    column = column.unify_dictionaries().combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    lookup = np.array([names.index(value) if value in names else -1 for value in column.dictionary.to_pylist()],
+                      dtype=np.int64)
+    return lookup[column.indices.to_numpy(zero_copy_only=False)]
+
+
+def _count_aspect_row_groups(charts_path, aspects_path, row_groups, planets, by):
+    """Count aspect types between a pair of planets (or all pairs) by group over some aspect row groups"""
+    charts = pq.read_table(charts_path, columns=["record"] + _group_columns(by))
+    labels, codes = _group_codes(charts, by)
+    records = charts.column("record").to_numpy()
+    order = np.argsort(records, kind="stable")
+
+    aspects = pq.ParquetFile(aspects_path).read_row_groups(row_groups)
+    mask = np.ones(aspects.num_rows, dtype=bool)
+    if planets:
+        first, second = (PLANET_NAMES.index(planet) for planet in planets)
+        planet1 = _name_codes(aspects.column("planet1"), PLANET_NAMES)
+        planet2 = _name_codes(aspects.column("planet2"), PLANET_NAMES)
+        mask = ((planet1 == first) & (planet2 == second)) | ((planet1 == second) & (planet2 == first))
+    aspect_codes = _name_codes(aspects.column("aspect"), ASPECT_NAMES)[mask]
+
+    # Group of each aspect's chart, found by record number
+    positions = np.searchsorted(records[order], aspects.column("record").to_numpy()[mask])
+    group_codes = codes[order[positions]]
+
+    categories = len(ASPECT_NAMES)
+    counts = np.bincount(group_codes * categories + aspect_codes, minlength=len(labels) * categories)
+    return labels, counts.reshape(len(labels), categories), None
+
+
+class ChartStats:
+    def __init__(self, directory, workers=None):
+        """Aggregation engine over a chart store written by ChartParquetWriter
+
+        Queries count sign, house or aspect categories per group (any chart column, or
+        birth_decade or country) with np.bincount over integer-coded columns. Row
+        groups are split across worker processes and their counts summed. Results are
+        cached per query signature, which includes the store files' size and modification
+        time, so a rewritten store is queried afresh. Cached results are shared and must
+        be treated as read-only.
+        """
+        self.directory = os.path.abspath(directory)
+        self.charts_path = os.path.join(self.directory, "charts.parquet")
+        self.aspects_path = os.path.join(self.directory, "aspects.parquet")
+        # Like the batch command, 0 (or 1) workers counts in this process
+        self.workers = max(1, os.cpu_count() if workers is None else workers)
+
+    def sign_distribution(self, planet, by=None):
+        """Charts per sign of a planet (or "Ascendant" / "Midheaven"), by group"""
+        column = f"{planet.lower()}_sign"
+        return self._query("sign_distribution", planet, by, column=column, categories=SIGNS)
+
+    def house_occupancy(self, planet, by=None):
+        """Charts per house of a planet, by group"""
+        column = f"{planet.lower()}_house"
+        return self._query("house_occupancy", planet, by, column=column, categories=HOUSE_NUMBERS)
+
+    def aspect_frequency(self, planet1=None, planet2=None, by=None):
+        """Aspects per aspect type between two planets (or among all planets), by group"""
+        planets = (planet1, planet2) if planet1 and planet2 else None
+        if (planet1 or planet2) and not planets:
+            raise ValueError("Give both planets of the pair, or neither for all aspects")
+        for planet in planets or ():
+            if planet not in PLANET_NAMES:
+                raise ValueError(f"Unknown planet: {planet}")
+        return self._query("aspect_frequency", planets, by, categories=ASPECT_NAMES)
+
+    def _signature(self, kind, subject, by):
+        files = tuple((os.stat(path).st_size, os.stat(path).st_mtime_ns)
+                      for path in (self.charts_path, self.aspects_path))
+        return (self.directory, files, kind, subject, by)
+
+    def _query(self, kind, subject, by, column=None, categories=()):
+        """Run a counting query (or return its cached result)"""
+        signature = self._signature(kind, subject, by)
+        with _query_cache_lock:
+            result = _query_cache.get(signature)
+            if result is not None:
+                _query_cache.move_to_end(signature)
+                return result
+
+        schema = pq.read_schema(self.charts_path)
+        if column and column not in schema.names:
+            raise ValueError(f"Unknown planet or point: {subject}")
+        if by is not None and by not in DERIVED_KEYS and by not in schema.names:
+            raise ValueError(f"Unknown group key: {by}")
+
+        if column:
+            path, count = self.charts_path, _count_chart_row_groups
+            arguments = (column, len(categories), by)
+        else:
+            path, count = self.aspects_path, _count_aspect_row_groups
+            arguments = (subject, by)
+        row_groups = list(range(pq.ParquetFile(path).num_row_groups))
+        parts = [row_groups[start::self.workers] for start in range(self.workers)]
+        parts = [part for part in parts if part]
+
+        if self.workers > 1 and len(parts) > 1:
+            with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+                futures = [pool.submit(count, *self._paths(column), part, *arguments) for part in parts]
+                partials = [future.result() for future in futures]
+        else:
+            partials = [count(*self._paths(column), part, *arguments) for part in parts]
+
+        # Labels differ between partial results, so add them up by label
+        groups = {}
+        for labels, counts, charts in partials:
+            for index, label in enumerate(labels):
+                group = groups.setdefault(label, {"charts": 0, "counts": np.zeros(len(categories), dtype=np.int64)})
+                group["counts"] += counts[index]
+                if charts is not None:
+                    group["charts"] += int(charts[index])
+        if not column:
+            # Charts per group are counted once, not per aspect row group
+            labels, codes = _group_codes(pq.read_table(self.charts_path, columns=_group_columns(by) or ["record"]), by)
+            for label, charts in zip(labels, np.bincount(codes, minlength=len(labels)).tolist()):
+                groups.setdefault(label, {"charts": 0, "counts": np.zeros(len(categories), dtype=np.int64)})
+                groups[label]["charts"] = charts
+
+        result = {
+            "query": {"kind": kind, "subject": subject, "by": by},
+            "categories": list(categories),
+            "groups": {
+                label: {"charts": group["charts"], "counts": dict(zip(categories, group["counts"].tolist()))}
+                for label, group in sorted(groups.items(), key=lambda item: str(item[0]))
+            }
+        }
+        with _query_cache_lock:
+            _query_cache[signature] = result
+            while len(_query_cache) > QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+        return result
+
+    def _paths(self, column):
+        return (self.charts_path,) if column else (self.charts_path, self.aspects_path)
@@ -0,0 +1,71 @@
+import os
+import threading
+import swisseph as swe
+
+
+# The Swiss Ephemeris C library keeps process-wide state (ephemeris path, open
+# ephemeris files and its internal position caches), so calls from concurrent
+# request threads are serialized through one lock. Pure calendar functions such
+# as swe.julday and swe.revjul touch no shared state and are called directly.
+_swe_lock = threading.RLock()
+_ephemeris_path = None
+
+
+def init_ephemeris(path=None):
+    """Set the ephemeris path once per process (None uses the built-in default)
+
+    Later calls with the same path are no-ops; changing the path of a process that
+    is already serving requests is refused.
+    """
+    global _ephemeris_path
+    with _swe_lock:
+        if _ephemeris_path is not None:
+            if _ephemeris_path != (path or ""):
+                raise ValueError(f"Ephemeris path already set to {_ephemeris_path!r}")
+            return
+        if path:
+            swe.set_ephe_path(path)
+        else:
+            swe.set_ephe_path()
+        _ephemeris_path = path or ""
+
+
+def calc_ut(jd, planet_id, flags=swe.FLG_SWIEPH | swe.FLG_SPEED):
+    """Thread-safe swe.calc_ut"""
+    with _swe_lock:
+        return swe.calc_ut(jd, planet_id, flags)
+
+
+def houses(jd, latitude, longitude, house_system=b"P"):
+    """Thread-safe swe.houses"""
+    with _swe_lock:
+        return swe.houses(jd, latitude, longitude, house_system)
+
+
+def houses_armc(armc, latitude, obliquity, house_system=b"P"):
+    """Thread-safe swe.houses_armc"""
+    with _swe_lock:
+        return swe.houses_armc(armc, latitude, obliquity, house_system)
+
+
+def sidtime(jd):
+    """Thread-safe swe.sidtime"""
+    with _swe_lock:
+        return swe.sidtime(jd)
+
+
+def _reset_after_fork():
+    """Give a forked worker its own lock and its own ephemeris file handles"""
+    global _swe_lock
+    _swe_lock = threading.RLock()
+    if _ephemeris_path is not None:
+        swe.close()
+        if _ephemeris_path:
+            swe.set_ephe_path(_ephemeris_path)
+        else:
+            swe.set_ephe_path()
+
+
+# Preforked servers and process pools fork after the parent has used the ephemeris;
+# a child must not share the parent's open file offsets or inherit a held lock
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,187 @@
+import bisect
+import threading
+from collections import OrderedDict
+import swisseph as swe
+import ephemeris
+from transit_search import (
+    SAMPLE_STEP_DAYS, TransitSearch, julian_day_to_datetime, refine_root, wrap_degrees
+)
+
+
+# Planets whose stations are reported (the Sun and Moon never station)
+STATION_PLANETS = ["Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+
+# Moon-Sun elongations that define the lunations
+LUNATION_PHASES = {
+    0: "New Moon",
+    90: "First Quarter",
+    180: "Full Moon",
+    270: "Last Quarter"
+}
+
+# The Moon gains about 12 degrees a day on the Sun, so daily samples bracket every lunation
+LUNATION_STEP_DAYS = 1.0
+
+# Computed years shared by every calendar in the process: {year: (times, events)}. Years
+# come from request dates, so only the most recently used ones are kept.
+CALENDAR_CACHE_YEARS = 16
+_calendar_years = OrderedDict()
+_calendar_lock = threading.Lock()
+
+
+class EventCalendar:
+    def __init__(self, tool):
+        self.tool = tool
+
+    def _events_for_year(self, year):
+        """Get the sorted event index for a calendar year, computing it on first use"""
+        with _calendar_lock:
+            index = _calendar_years.get(year)
+            if index is not None:
+                _calendar_years.move_to_end(year)
+                return index
+
+        index = self._compute_year(year)
+
+        with _calendar_lock:
+            index = _calendar_years.setdefault(year, index)
+            _calendar_years.move_to_end(year)
+            while len(_calendar_years) > CALENDAR_CACHE_YEARS:
+                _calendar_years.popitem(last=False)
+            return index
+
+    def _compute_year(self, year):
+        """Compute stations, sign ingresses and lunations for a calendar year"""
+        start_jd = swe.julday(year, 1, 1, 0.0)
+        end_jd = swe.julday(year + 1, 1, 1, 0.0)
+        search = TransitSearch(self.tool)
+        events = []
+
+        for planet_id, planet_name in self.tool.planets.items():
+            step = SAMPLE_STEP_DAYS.get(planet_name, 1.0)
+            segments = search.sample_segments(planet_id, start_jd, end_jd, step)
+            events.extend(self._ingresses(search, planet_id, planet_name, segments))
+            if planet_name in STATION_PLANETS:
+                events.extend(self._stations(planet_name, segments))
+
+        events.extend(self._lunations(search, start_jd, end_jd))
+
+        events = [event for event in events if start_jd <= event["julian_day"] < end_jd]
+        events.sort(key=lambda event: event["julian_day"])
+        times = [event["julian_day"] for event in events]
+
+        print(f"Event calendar computed for {year}: {len(events)} events ({search.ephemeris_calls} ephemeris calls)")
+        return times, events
+
+    def _stations(self, planet_name, segments):
+        """Find stations as the boundaries where the direction of motion changes"""
+        stations = []
+        for previous, segment in zip(segments, segments[1:]):
+            was_retrograde = previous[2] + previous[5] < 0
+            is_retrograde = segment[2] + segment[5] < 0
+            if was_retrograde != is_retrograde:
+                jd = segment[0]
+                stations.append(self._event(
+                    "station", planet_name, jd,
+                    direction="retrograde" if is_retrograde else "direct",
+                    sign=self.tool.signs[int(segment[1] // 30) % 12]
+                ))
+        return stations
+
+    def _ingresses(self, search, planet_id, planet_name, segments):
+        """Find sign ingresses inside segments of one-directional motion"""
+        ingresses = []
+        for t_a, lon_a, speed_a, t_b, lon_b, speed_b in segments:
+            sign_a = int(lon_a // 30) % 12
+            sign_b = int(lon_b // 30) % 12
+            if sign_a == sign_b:
+                continue
+
+            retrograde = speed_a + speed_b < 0
+            # Direct motion crosses the start of the new sign, retrograde motion the start of the old one
+            boundary = (sign_a * 30) if retrograde else (sign_b * 30)
+            jd = refine_root(
+                lambda t: search.separation(t, planet_id, boundary),
+                t_a, t_b, wrap_degrees(lon_a - boundary), wrap_degrees(lon_b - boundary)
+            )
+            ingresses.append(self._event(
+                "ingress", planet_name, jd, sign=self.tool.signs[sign_b], retrograde=retrograde
+            ))
+        return ingresses
+
+    def _lunations(self, search, start_jd, end_jd):
+        """Find new moons, full moons and quarters by root-finding on the Moon-Sun elongation"""
+        def elongation(t):
+            moon_lon, moon_speed = search.position(t, swe.MOON)
+            sun_lon, sun_speed = search.position(t, swe.SUN)
+            return (moon_lon - sun_lon) % 360, moon_speed - sun_speed
+
+        def phase_offset(t, angle):
+            value, speed = elongation(t)
+            return wrap_degrees(value - angle), speed
+
+        lunations = []
+        t_a = start_jd
+        e_a, _ = elongation(t_a)
+        while t_a < end_jd:
+            t_b = t_a + LUNATION_STEP_DAYS
+            e_b, _ = elongation(t_b)
+
+            for angle, phase in LUNATION_PHASES.items():
+                f_a = wrap_degrees(e_a - angle)
+                f_b = wrap_degrees(e_b - angle)
+                if f_a < 0 <= f_b and f_b - f_a < 180:
+                    jd = refine_root(
+                        lambda t, angle=angle: phase_offset(t, angle), t_a, t_b, f_a, f_b
+                    )
+                    moon_lon, _ = search.position(jd, swe.MOON)
+                    lunations.append(self._event(
+                        "lunation", "Moon", jd, phase=phase, sign=self.tool.signs[int(moon_lon // 30) % 12]
+                    ))
+
+            t_a, e_a = t_b, e_b
+        return lunations
+
+    def _event(self, event_type, planet, jd, **details):
+        """Build an event record"""
+        event = {
+            "type": event_type,
+            "planet": planet,
+            "julian_day": jd,
+            "time": julian_day_to_datetime(jd).isoformat()
+        }
+        event.update(details)
+        return event
+
+    def events_between(self, start_jd, end_jd, event_types=None, planets=None):
+        """Get all events with start_jd <= time < end_jd, optionally filtered by type and planet"""
+        first_year = swe.revjul(start_jd)[0]
+        # The end is exclusive, so a range ending at midnight on January 1st stays in the previous year
+        last_year = swe.revjul(max(start_jd, end_jd - 1e-6))[0]
+
+        events = []
+        for year in range(first_year, last_year + 1):
+            times, year_events = self._events_for_year(year)
+            low = bisect.bisect_left(times, start_jd)
+            high = bisect.bisect_left(times, end_jd)
+            events.extend(year_events[low:high])
+
+        return [
+            event for event in events
+            if (event_types is None or event["type"] in event_types)
+            and (planets is None or event["planet"] in planets)
+        ]
+
+    def retrograde_planets_between(self, start_jd, end_jd, planets=None):
+        """List the planets that are retrograde at any time between two Julian days"""
+        planets = planets or STATION_PLANETS
+        stationing = {event["planet"] for event in self.events_between(start_jd, end_jd, ["station"], planets)}
+
+        retrograde = []
+        for planet_id, planet_name in self.tool.planets.items():
+            if planet_name not in planets:
+                continue
+            result, _ = ephemeris.calc_ut(start_jd, planet_id, swe.FLG_SWIEPH | swe.FLG_SPEED)
+            if result[3] < 0 or planet_name in stationing:
+                retrograde.append(planet_name)
+        return retrograde
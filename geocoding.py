@@ -0,0 +1,475 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, as_completed, wait
+from geopy.exc import GeocoderRateLimited, GeocoderServiceError, GeocoderTimedOut, GeocoderUnavailable
+
+
+# Nominatim-compatible geocoding service (its /search endpoint is queried), and an
+# optional second provider that slow lookups are hedged to
+GEOCODER_URL = os.environ.get("GEOCODER_URL", "https://nominatim.openstreetmap.org")
+GEOCODER_SECONDARY_URL = os.environ.get("GEOCODER_SECONDARY_URL")
+GEOCODER_SECONDARY_RATE = float(os.environ.get("GEOCODER_SECONDARY_RATE", 1.0))
+
+# Time budget of one interactive lookup, and how long the primary provider gets
+# before the same lookup is also sent to the secondary one
+GEOCODE_DEADLINE_SECONDS = float(os.environ.get("GEOCODE_DEADLINE_SECONDS", 5.0))
+HEDGE_DELAY_SECONDS = float(os.environ.get("GEOCODE_HEDGE_DELAY_SECONDS", 0.5))
+
+# A provider that failed this share of its recent requests is skipped for the cool-down period
+BREAKER_WINDOW = 20
+BREAKER_FAILURE_RATIO = 0.5
+BREAKER_RESET_SECONDS = 30.0
+
+# Request rate allowed by the geocoder's usage policy (Nominatim: 1 request per second)
+GEOCODER_RATE = float(os.environ.get("GEOCODER_RATE", 1.0))
+GEOCODER_BURST = int(os.environ.get("GEOCODER_BURST", 1))
+
+# Threads sending requests; more than one only helps when the rate allows several
+# requests per round trip
+GEOCODER_WORKERS = int(os.environ.get("GEOCODER_WORKERS", 2))
+
+# Retries of transient failures, with full-jitter exponential backoff between them
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Priorities: interactive requests are sent before any queued batch lookups
+INTERACTIVE = 0
+BATCH = 1
+
+# Resolved birth places, shared by every geocoding path in the process
+GEOCODE_CACHE_SIZE = 4096
+_geocode_cache = OrderedDict()
+_geocode_cache_lock = threading.Lock()
+
+# Places whose lookup on the ASGI path just failed. The route that runs next reports
+# the failure instead of spending another time budget on the same place.
+FAILED_LOOKUP_SECONDS = 5.0
+_failed_lookups = OrderedDict()
+
+
+def cached_coordinates(location):
+    """Get cached (latitude, longitude) for a place name, or None"""
+    with _geocode_cache_lock:
+        coordinates = _geocode_cache.get(location)
+        if coordinates is not None:
+            _geocode_cache.move_to_end(location)
+        return coordinates
+
+
+def cache_coordinates(location, latitude, longitude):
+    """Remember the coordinates of a place name"""
+    with _geocode_cache_lock:
+        _geocode_cache[location] = (latitude, longitude)
+        _geocode_cache.move_to_end(location)
+        while len(_geocode_cache) > GEOCODE_CACHE_SIZE:
+            _geocode_cache.popitem(last=False)
+
+
+def remember_failure(location, error):
+    """Remember that a lookup of a place just failed (see recent_failure)"""
+    with _geocode_cache_lock:
+        _failed_lookups[location] = (time.monotonic(), error)
+        _failed_lookups.move_to_end(location)
+        while len(_failed_lookups) > GEOCODE_CACHE_SIZE:
+            _failed_lookups.popitem(last=False)
+
+
+def recent_failure(location):
+    """Get the error of a lookup of a place that failed in the last FAILED_LOOKUP_SECONDS, or None"""
+    with _geocode_cache_lock:
+        failure = _failed_lookups.get(location)
+        if failure is None:
+            return None
+        if time.monotonic() - failure[0] > FAILED_LOOKUP_SECONDS:
+            del _failed_lookups[location]
+            return None
+        return failure[1]
+
+
+def is_retryable(error):
+    """Whether a geocoder error is transient (rate limiting, timeouts, server errors)"""
+    if isinstance(error, (GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable)):
+        return True
+    # Plain GeocoderServiceError is an unexpected server response; its subclasses
+    # (bad query, authentication, quota) will fail the same way again
+    return type(error) is GeocoderServiceError
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        """Token bucket shared by every thread (and event loop) sending geocoder requests"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return the number of seconds to wait before using it"""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        """Give back a reserved token that was not used"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def pause(self, seconds):
+        """Hand out no tokens for the given time (the server asked us to back off)"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+# One bucket per process for the configured geocoder. With several server processes,
+# each one gets its share of the rate (see gunicorn.conf.py).
+geocoder_bucket = TokenBucket(GEOCODER_RATE, GEOCODER_BURST)
+secondary_geocoder_bucket = TokenBucket(GEOCODER_SECONDARY_RATE, GEOCODER_BURST)
+
+
+def _reset_after_fork():
+    """A forked child must not inherit a bucket lock held by another thread"""
+    geocoder_bucket.lock = threading.Lock()
+    secondary_geocoder_bucket.lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class CircuitBreaker:
+    def __init__(self, window=BREAKER_WINDOW, failure_ratio=BREAKER_FAILURE_RATIO,
+                 reset_seconds=BREAKER_RESET_SECONDS):
+        """Circuit breaker for one geocoding provider
+
+        Closed while the provider answers. When at least failure_ratio of the last
+        window requests failed it opens and no requests are sent for reset_seconds;
+        then a single trial request is let through (half-open), which closes the
+        breaker again or reopens it.
+        """
+        self.failure_ratio = failure_ratio
+        self.reset_seconds = reset_seconds
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return "open"
+            return "half-open"
+
+    def available(self):
+        """Whether lookups may be routed to the provider (it is not in its cool-down period)"""
+        return self.state != "open"
+
+    def retry_at(self):
+        """Monotonic time at which an open breaker lets a trial request through"""
+        with self.lock:
+            return (self.opened_at or 0.0) + self.reset_seconds
+
+    def allow(self):
+        """Whether a request may be sent now (takes the trial slot when half-open)"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self.trial:
+                return False
+            self.trial = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                self.outcomes.clear()
+            self.outcomes.append(True)
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self.lock:
+            self.outcomes.append(False)
+            self.trial = False
+            if self.opened_at is not None:
+                self.opened_at = time.monotonic()
+                return
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) == self.outcomes.maxlen and failures >= self.failure_ratio * len(self.outcomes):
+                self.opened_at = time.monotonic()
+
+
+class _Lookup:
+    def __init__(self, place, priority):
+        self.place = place
+        self.priority = priority
+        self.attempts = 0
+        self.version = 0
+        self.queued = False    # waiting in the ready heap (not in flight or waiting to retry)
+        self.finished = False
+        self.future = Future()
+
+
+class GeocodingScheduler:
+    def __init__(self, geocode, bucket=None, breaker=None, workers=GEOCODER_WORKERS, max_attempts=MAX_ATTEMPTS,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS):
+        """Queue of place lookups sent to a rate-limited geocoder
+
+        Pending place names are deduplicated, requests are paced by a token bucket,
+        transient failures are retried with jittered exponential backoff (without
+        holding up other lookups), and interactive lookups jump ahead of batch ones.
+        Results go into the process-wide geocode cache. While the provider's circuit
+        breaker is open, queued lookups wait instead of being sent.
+
+        Args:
+            geocode: Function taking a place name and returning an object with
+                latitude and longitude, or None when the place is unknown
+                (for example Nominatim(...).geocode)
+        """
+        self.geocode = geocode
+        self.bucket = bucket or geocoder_bucket
+        self.breaker = breaker or CircuitBreaker()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.condition = threading.Condition()
+        self.ready = []      # heap of (priority, sequence, version, lookup)
+        self.delayed = []    # heap of (not_before, sequence, version, lookup), waiting to retry
+        self.pending = {}    # place -> _Lookup, until its future is resolved
+        self.sequence = itertools.count()
+        self.worker_pid = None
+        self.start_lock = threading.Lock()
+
+        self.requests = 0
+        self.retries = 0
+
+    def _ensure_workers(self):
+        """Start the worker threads on first use, and again in a forked child
+
+        Threads do not survive a fork, so a child starts with an empty queue of its own.
+        """
+        if self.worker_pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.worker_pid != os.getpid():
+                self._start_workers()
+
+    def _start_workers(self):
+        if self.worker_pid is not None:
+            self.condition = threading.Condition()
+            self.ready, self.delayed, self.pending = [], [], {}
+        self.worker_pid = os.getpid()
+        for _ in range(self.workers):
+            threading.Thread(target=self._work, daemon=True, name="geocoder").start()
+
+    def _push(self, lookup, not_before=None):
+        lookup.version += 1
+        lookup.queued = not_before is None
+        if not_before is None:
+            heapq.heappush(self.ready, (lookup.priority, next(self.sequence), lookup.version, lookup))
+        else:
+            heapq.heappush(self.delayed, (not_before, next(self.sequence), lookup.version, lookup))
+        self.condition.notify()
+
+    def submit(self, place, priority=BATCH):
+        """Queue a lookup and return a Future for its (latitude, longitude)"""
+        coordinates = cached_coordinates(place)
+        if coordinates is not None:
+            future = Future()
+            future.set_result(coordinates)
+            return future
+
+        self._ensure_workers()
+        with self.condition:
+            lookup = self.pending.get(place)
+            if lookup is None:
+                lookup = _Lookup(place, priority)
+                self.pending[place] = lookup
+                self._push(lookup)
+            elif priority < lookup.priority:
+                # Already pending as a batch lookup: move it up if it is still waiting in the
+                # queue. A lookup in flight is not sent again, and a scheduled retry keeps its
+                # delay; both use the new priority if they are queued again.
+                lookup.priority = priority
+                if lookup.queued:
+                    self._push(lookup)
+            return lookup.future
+
+    def get(self, place, priority=INTERACTIVE, timeout=GEOCODE_DEADLINE_SECONDS):
+        """Look up one place, waiting for the result"""
+        return self.submit(place, priority).result(timeout)
+
+    def geocode_many(self, places, priority=BATCH, progress=None):
+        """Look up many places, each distinct name once, in the minimum time the rate allows
+
+        Args:
+            places: Place names, duplicates allowed
+            progress: Optional function called as progress(place, result) as each lookup finishes
+
+        Returns:
+            Dictionary mapping each distinct place to (latitude, longitude) or to the
+            exception that made its lookup fail
+        """
+        futures = {self.submit(place, priority): place for place in dict.fromkeys(places)}
+        results = {}
+        for future in as_completed(futures):
+            place = futures[future]
+            error = future.exception()
+            results[place] = error if error is not None else future.result()
+            if progress:
+                progress(place, results[place])
+        return results
+
+    def _next_lookup(self):
+        """Block until a lookup is due, highest priority first"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, _, version, lookup = heapq.heappop(self.delayed)
+                    if version == lookup.version:
+                        self._push(lookup)
+
+                while self.ready:
+                    _, _, version, lookup = heapq.heappop(self.ready)
+                    if version == lookup.version:
+                        lookup.version += 1  # invalidate any other queued entries
+                        lookup.queued = False
+                        return lookup
+
+                timeout = self.delayed[0][0] - now if self.delayed else None
+                self.condition.wait(timeout)
+
+    def _finish(self, lookup, result=None, error=None):
+        """Resolve a lookup's future, once; later calls for the same lookup do nothing"""
+        with self.condition:
+            if lookup.finished:
+                return
+            lookup.finished = True
+            self.pending.pop(lookup.place, None)
+        if lookup.future.done():
+            return
+        if error is not None:
+            lookup.future.set_exception(error)
+        else:
+            lookup.future.set_result(result)
+
+    def _work(self):
+        while True:
+            lookup = self._next_lookup()
+
+            if not self.breaker.allow():
+                with self.condition:
+                    self._push(lookup, max(self.breaker.retry_at(), time.monotonic() + 0.1))
+                continue
+
+            delay = self.bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                self.requests += 1
+                location = self.geocode(lookup.place)
+            except Exception as e:
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                lookup.attempts += 1
+                if not is_retryable(e) or lookup.attempts >= self.max_attempts:
+                    self._finish(lookup, error=e)
+                    continue
+
+                retry_after = getattr(e, "retry_after", None) or 0
+                if retry_after:
+                    # The limit applies to us as a client, so every lookup waits
+                    self.bucket.pause(retry_after)
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** lookup.attempts))
+                self.retries += 1
+                with self.condition:
+                    self._push(lookup, time.monotonic() + max(backoff, retry_after))
+                continue
+
+            self.breaker.record_success()
+            if location is None:
+                self._finish(lookup, error=ValueError(f"Could not find coordinates for location: {lookup.place}"))
+            else:
+                cache_coordinates(lookup.place, location.latitude, location.longitude)
+                self._finish(lookup, (location.latitude, location.longitude))
+
+
+class HedgedGeocoder:
+    def __init__(self, providers, hedge_delay=HEDGE_DELAY_SECONDS, deadline=GEOCODE_DEADLINE_SECONDS):
+        """Deadline-bound lookups over one or more geocoding providers
+
+        The lookup goes to the first provider whose circuit breaker is not open. If no
+        answer has come after hedge_delay (or the provider gave up on the place), it is
+        also sent to the next provider, and the first answer wins. When every provider
+        is unavailable the lookup fails at once instead of waiting.
+
+        Args:
+            providers: GeocodingScheduler per provider, in order of preference
+        """
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+        self.hedged = 0
+
+    def get(self, place, priority=INTERACTIVE, deadline=None):
+        """Look up one place within the time budget
+
+        Returns:
+            (latitude, longitude); raises GeocoderTimedOut when the budget runs out,
+            GeocoderUnavailable when no provider is available, or the lookup's error
+        """
+        coordinates = cached_coordinates(place)
+        if coordinates is not None:
+            return coordinates
+
+        deadline = self.deadline if deadline is None else deadline
+        end = time.monotonic() + deadline
+        candidates = [provider for provider in self.providers if provider.breaker.available()]
+        pending = set()
+        errors = []
+        next_launch = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if candidates and (not pending or now >= next_launch):
+                if pending:
+                    self.hedged += 1
+                pending.add(candidates.pop(0).submit(place, priority))
+                next_launch = now + self.hedge_delay
+            if not pending:
+                if errors:
+                    raise errors[0]
+                raise GeocoderUnavailable("No geocoding provider is available")
+            if now >= end:
+                raise GeocoderTimedOut(f"No geocoder answered within {deadline:g} s")
+
+            timeout = min(end, next_launch) - now if candidates else end - now
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                if not is_retryable(error):
+                    raise error
+                errors.append(error)
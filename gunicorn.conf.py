@@ -0,0 +1,51 @@
+# Production server configuration:
+#
+#     gunicorn -c gunicorn.conf.py main:app
+#
+# The app (AstrologyTool, the horoscope generator and the warmed caches) is loaded
+# once in the master and the workers are forked from it, so they start warm and
+# share the reference tables copy-on-write. Settings come from the environment.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Worker processes and threads per worker; requests are mostly waiting on geocoding,
+# so each worker runs several threads
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+worker_class = "gthread"
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+# Seconds a request may run, and seconds workers get to finish in-flight requests on shutdown
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then so a slow leak cannot grow without bound
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Warm the caches in the master before any worker is forked (with preload_app)"""
+    if preload_app:
+        import main
+        main.warm_up()
+
+
+def post_fork(server, worker):
+    """Give each worker its share of the geocoders' rate limits, which apply to the host"""
+    import geocoding
+    geocoding.geocoder_bucket.rate = geocoding.GEOCODER_RATE / server.cfg.workers
+    geocoding.secondary_geocoder_bucket.rate = geocoding.GEOCODER_SECONDARY_RATE / server.cfg.workers
+
+
+def post_worker_init(worker):
+    """Warm a worker that did not inherit the caches (preload disabled); a no-op otherwise"""
+    import main
+    main.warm_up()
@@ -1,191 +1,254 @@
 from datetime import datetime
 import random
 import json
+from types import MappingProxyType
+
+
+def _read_only(table):
+    if isinstance(table, dict):
+        return MappingProxyType({key: _read_only(value) for key, value in table.items()})
+    if isinstance(table, list):
+        return tuple(_read_only(value) for value in table)
+    return table
+
+
+ZODIAC = _read_only({
+    'Aries': {
+        'traits': ['Bold', 'Courageous', 'Competitive', 'Impulsive', 'Independent'],
+        'ruling_planet': 'Mars',
+        'element': 'Fire',
+        'quality': 'Cardinal',
+        'house': 1,
+        'dates': [(3, 21), (4, 19)]
+    },
+    'Taurus': {
+        'traits': ['Grounded', 'Reliable', 'Patient', 'Sensual', 'Stubborn'],
+        'ruling_planet': 'Venus',
+        'element': 'Earth',
+        'quality': 'Fixed',
+        'house': 2,
+        'dates': [(4, 20), (5, 20)]
+    },
+    'Gemini': {
+        'traits': ['Curious', 'Adaptable', 'Communicative', 'Versatile', 'Restless'],
+        'ruling_planet': 'Mercury',
+        'element': 'Air',
+        'quality': 'Mutable',
+        'house': 3,
+        'dates': [(5, 21), (6, 20)]
+    },
+    'Cancer': {
+        'traits': ['Intuitive', 'Nurturing', 'Protective', 'Emotional', 'Loyal'],
+        'ruling_planet': 'Moon',
+        'element': 'Water',
+        'quality': 'Cardinal',
+        'house': 4,
+        'dates': [(6, 21), (7, 22)]
+    },
+    'Leo': {
+        'traits': ['Confident', 'Creative', 'Generous', 'Dramatic', 'Proud'],
+        'ruling_planet': 'Sun',
+        'element': 'Fire',
+        'quality': 'Fixed',
+        'house': 5,
+        'dates': [(7, 23), (8, 22)]
+    },
+    'Virgo': {
+        'traits': ['Practical', 'Analytical', 'Meticulous', 'Helpful', 'Critical'],
+        'ruling_planet': 'Mercury',
+        'element': 'Earth',
+        'quality': 'Mutable',
+        'house': 6,
+        'dates': [(8, 23), (9, 22)]
+    },
+    'Libra': {
+        'traits': ['Diplomatic', 'Social', 'Aesthetic', 'Balanced', 'Indecisive'],
+        'ruling_planet': 'Venus',
+        'element': 'Air',
+        'quality': 'Cardinal',
+        'house': 7,
+        'dates': [(9, 23), (10, 22)]
+    },
+    'Scorpio': {
+        'traits': ['Passionate', 'Resourceful', 'Intuitive', 'Mysterious', 'Intense'],
+        'ruling_planet': 'Pluto',
+        'element': 'Water',
+        'quality': 'Fixed',
+        'house': 8,
+        'dates': [(10, 23), (11, 21)]
+    },
+    'Sagittarius': {
+        'traits': ['Optimistic', 'Adventurous', 'Philosophical', 'Direct', 'Restless'],
+        'ruling_planet': 'Jupiter',
+        'element': 'Fire',
+        'quality': 'Mutable',
+        'house': 9,
+        'dates': [(11, 22), (12, 21)]
+    },
+    'Capricorn': {
+        'traits': ['Disciplined', 'Tenacious', 'Independent', 'Practical', 'Ambitious'],
+        'ruling_planet': 'Saturn',
+        'element': 'Earth',
+        'quality': 'Cardinal',
+        'house': 10,
+        'dates': [(12, 22), (1, 19)]
+    },
+    'Aquarius': {
+        'traits': ['Innovative', 'Original', 'Visionary', 'Independent', 'Detached'],
+        'ruling_planet': 'Uranus',
+        'element': 'Air',
+        'quality': 'Fixed',
+        'house': 11,
+        'dates': [(1, 20), (2, 18)]
+    },
+    'Pisces': {
+        'traits': ['Empathetic', 'Imaginative', 'Gentle', 'Intuitive', 'Dreamy'],
+        'ruling_planet': 'Neptune',
+        'element': 'Water',
+        'quality': 'Mutable',
+        'house': 12,
+        'dates': [(2, 19), (3, 20)]
+    }
+})
+
+PLANETS = _read_only({
+    'Sun': {'themes': ['identity', 'vitality', 'purpose', 'ego', 'leadership'], 'cycle_days': 365.25},
+    'Moon': {'themes': ['emotions', 'intuition', 'habits', 'security', 'nurturing'], 'cycle_days': 29.5},
+    'Mercury': {'themes': ['communication', 'thinking', 'learning', 'travel', 'technology'], 'cycle_days': 88},
+    'Venus': {'themes': ['love', 'beauty', 'relationships', 'values', 'harmony'], 'cycle_days': 225},
+    'Mars': {'themes': ['action', 'energy', 'conflict', 'passion', 'courage'], 'cycle_days': 687},
+    'Jupiter': {'themes': ['expansion', 'wisdom', 'luck', 'philosophy', 'growth'], 'cycle_days': 4333},
+    'Saturn': {'themes': ['discipline', 'restrictions', 'lessons', 'responsibility', 'structure'], 'cycle_days': 10759},
+    'Uranus': {'themes': ['innovation', 'rebellion', 'sudden change', 'freedom', 'technology'], 'cycle_days': 30687},
+    'Neptune': {'themes': ['spirituality', 'illusion', 'creativity', 'compassion', 'dreams'], 'cycle_days': 60190},
+    'Pluto': {'themes': ['transformation', 'power', 'rebirth', 'intensity', 'hidden truths'], 'cycle_days': 90560}
+})
+
+HOUSES = _read_only({
+    1: {'themes': ['self', 'appearance', 'first impressions', 'new beginnings']},
+    2: {'themes': ['money', 'possessions', 'values', 'self-worth']},
+    3: {'themes': ['communication', 'siblings', 'short trips', 'learning']},
+    4: {'themes': ['home', 'family', 'roots', 'emotional foundation']},
+    5: {'themes': ['creativity', 'romance', 'children', 'fun', 'self-expression']},
+    6: {'themes': ['work', 'health', 'daily routine', 'service']},
+    7: {'themes': ['partnerships', 'marriage', 'open enemies', 'cooperation']},
+    8: {'themes': ['transformation', 'shared resources', 'intimacy', 'mystery']},
+    9: {'themes': ['philosophy', 'higher learning', 'travel', 'spiritual growth']},
+    10: {'themes': ['career', 'reputation', 'authority', 'public image']},
+    11: {'themes': ['friendships', 'groups', 'hopes', 'social networks']},
+    12: {'themes': ['spirituality', 'hidden enemies', 'subconscious', 'sacrifice']}
+})
+
+ASPECTS = _read_only({
+    'conjunction': {'angle': 0, 'orb': 8, 'nature': 'neutral', 'strength': 'very strong'},
+    'sextile': {'angle': 60, 'orb': 6, 'nature': 'harmonious', 'strength': 'moderate'},
+    'square': {'angle': 90, 'orb': 8, 'nature': 'challenging', 'strength': 'strong'},
+    'trine': {'angle': 120, 'orb': 8, 'nature': 'harmonious', 'strength': 'strong'},
+    'opposition': {'angle': 180, 'orb': 8, 'nature': 'challenging', 'strength': 'very strong'}
+})
+
+DAILY_INFLUENCES = _read_only({
+    'Sun': {
+        'Fire': "Solar energy ignites your fire sign passion—lead with confidence.",
+        'Earth': "The Sun illuminates practical matters—focus on tangible achievements.",
+        'Air': "Solar radiance enhances communication—share your ideas boldly.",
+        'Water': "The Sun's warmth nurtures your emotional depth—trust your feelings."
+    },
+    'Moon': {
+        'Fire': "Lunar energy may dampen your fire—channel emotions into creative action.",
+        'Earth': "The Moon supports your grounded nature—trust your instincts about security.",
+        'Air': "Lunar influence brings emotional depth to your thoughts—listen to your heart.",
+        'Water': "The Moon amplifies your intuitive powers—go with the flow of your feelings."
+    },
+    'Mercury': {
+        'Fire': "Mercury speeds up your thinking—act on your bright ideas quickly.",
+        'Earth': "Mercury brings clarity to practical plans—organize your thoughts methodically.",
+        'Air': "Mercury enhances your natural communication gifts—network and connect.",
+        'Water': "Mercury stirs your emotional intelligence—express your feelings clearly."
+    },
+    'Venus': {
+        'Fire': "Venus softens your fiery nature—approach conflicts with charm.",
+        'Earth': "Venus highlights beauty and comfort—indulge in life's pleasures.",
+        'Air': "Venus enhances your social magnetism—relationships flourish.",
+        'Water': "Venus deepens emotional connections—open your heart to love."
+    },
+    'Mars': {
+        'Fire': "Mars amplifies your natural drive—channel this energy constructively.",
+        'Earth': "Mars pushes for action in practical matters—tackle your to-do list.",
+        'Air': "Mars energizes your communication—speak up and be heard.",
+        'Water': "Mars stirs deep emotions—find healthy outlets for intensity."
+    },
+    'Jupiter': {
+        'Fire': "Jupiter expands your optimistic nature—take calculated risks.",
+        'Earth': "Jupiter brings growth to practical ventures—invest in your future.",
+        'Air': "Jupiter broadens your intellectual horizons—learn something new.",
+        'Water': "Jupiter enhances your compassion—extend kindness to others."
+    },
+    'Saturn': {
+        'Fire': "Saturn teaches patience—slow down and plan carefully.",
+        'Earth': "Saturn supports your disciplined nature—build solid foundations.",
+        'Air': "Saturn brings structure to your ideas—commit to your plans.",
+        'Water': "Saturn encourages emotional maturity—face your feelings honestly."
+    }
+})
+
+WEEKDAY_RULERS = _read_only({
+    0: 'Moon',
+    1: 'Mars',
+    2: 'Mercury',
+    3: 'Jupiter',
+    4: 'Venus',
+    5: 'Saturn',
+    6: 'Sun'
+})
+
+SECONDARY_INFLUENCES = _read_only({
+    'New Moon': 'Saturn',
+    'Waxing Crescent': 'Jupiter',
+    'Full Moon': 'Moon',
+    'Waning Crescent': 'Neptune'
+})
+
+LUNAR_INFLUENCES = _read_only({
+    'New Moon': "New beginnings and fresh starts are highlighted—plant seeds for future growth.",
+    'Waxing Crescent': "Building momentum and growing energy support your current projects.",
+    'Full Moon': "Emotional intensity and culmination energy reach their peak—embrace transformation.",
+    'Waning Crescent': "Release and letting go create space for renewal—clear away what no longer serves."
+})
+
+ELEMENT_ADVICE = _read_only({
+    'Fire': "Channel your passionate energy into focused action—your enthusiasm is contagious.",
+    'Earth': "Ground yourself in practical matters and steady progress—stability brings success.",
+    'Air': "Communicate your ideas clearly and connect with others—collaboration is key.",
+    'Water': "Trust your intuition and honor your emotional needs—feelings guide you wisely."
+})
+
+QUALITY_ADVICE = _read_only({
+    'Cardinal': "Take initiative and lead by example—your natural leadership shines.",
+    'Fixed': "Stay committed to your goals and maintain steady progress—persistence pays off.",
+    'Mutable': "Adapt to changing circumstances with flexibility—versatility is your strength."
+})
+
+ELEMENT_COLORS = _read_only({
+    'Fire': ['Red', 'Orange', 'Gold', 'Crimson', 'Coral'],
+    'Earth': ['Green', 'Brown', 'Beige', 'Olive', 'Tan'],
+    'Air': ['Yellow', 'Silver', 'Light Blue', 'Lavender', 'White'],
+    'Water': ['Blue', 'Purple', 'Turquoise', 'Navy', 'Aqua']
+})
+
+SIGNS = tuple(ZODIAC.keys())
+
 
 class ProfessionalHoroscopeGenerator:
     def __init__(self, latitude=40.7128, longitude=-74.0060):
         self.latitude = latitude
         self.longitude = longitude
 
-        self.ZODIAC = {
-            'Aries': {
-                'traits': ['Bold', 'Courageous', 'Competitive', 'Impulsive', 'Independent'],
-                'ruling_planet': 'Mars',
-                'element': 'Fire',
-                'quality': 'Cardinal',
-                'house': 1,
-                'dates': [(3, 21), (4, 19)]
-            },
-            'Taurus': {
-                'traits': ['Grounded', 'Reliable', 'Patient', 'Sensual', 'Stubborn'],
-                'ruling_planet': 'Venus',
-                'element': 'Earth',
-                'quality': 'Fixed',
-                'house': 2,
-                'dates': [(4, 20), (5, 20)]
-            },
-            'Gemini': {
-                'traits': ['Curious', 'Adaptable', 'Communicative', 'Versatile', 'Restless'],
-                'ruling_planet': 'Mercury',
-                'element': 'Air',
-                'quality': 'Mutable',
-                'house': 3,
-                'dates': [(5, 21), (6, 20)]
-            },
-            'Cancer': {
-                'traits': ['Intuitive', 'Nurturing', 'Protective', 'Emotional', 'Loyal'],
-                'ruling_planet': 'Moon',
-                'element': 'Water',
-                'quality': 'Cardinal',
-                'house': 4,
-                'dates': [(6, 21), (7, 22)]
-            },
-            'Leo': {
-                'traits': ['Confident', 'Creative', 'Generous', 'Dramatic', 'Proud'],
-                'ruling_planet': 'Sun',
-                'element': 'Fire',
-                'quality': 'Fixed',
-                'house': 5,
-                'dates': [(7, 23), (8, 22)]
-            },
-            'Virgo': {
-                'traits': ['Practical', 'Analytical', 'Meticulous', 'Helpful', 'Critical'],
-                'ruling_planet': 'Mercury',
-                'element': 'Earth',
-                'quality': 'Mutable',
-                'house': 6,
-                'dates': [(8, 23), (9, 22)]
-            },
-            'Libra': {
-                'traits': ['Diplomatic', 'Social', 'Aesthetic', 'Balanced', 'Indecisive'],
-                'ruling_planet': 'Venus',
-                'element': 'Air',
-                'quality': 'Cardinal',
-                'house': 7,
-                'dates': [(9, 23), (10, 22)]
-            },
-            'Scorpio': {
-                'traits': ['Passionate', 'Resourceful', 'Intuitive', 'Mysterious', 'Intense'],
-                'ruling_planet': 'Pluto',
-                'element': 'Water',
-                'quality': 'Fixed',
-                'house': 8,
-                'dates': [(10, 23), (11, 21)]
-            },
-            'Sagittarius': {
-                'traits': ['Optimistic', 'Adventurous', 'Philosophical', 'Direct', 'Restless'],
-                'ruling_planet': 'Jupiter',
-                'element': 'Fire',
-                'quality': 'Mutable',
-                'house': 9,
-                'dates': [(11, 22), (12, 21)]
-            },
-            'Capricorn': {
-                'traits': ['Disciplined', 'Tenacious', 'Independent', 'Practical', 'Ambitious'],
-                'ruling_planet': 'Saturn',
-                'element': 'Earth',
-                'quality': 'Cardinal',
-                'house': 10,
-                'dates': [(12, 22), (1, 19)]
-            },
-            'Aquarius': {
-                'traits': ['Innovative', 'Original', 'Visionary', 'Independent', 'Detached'],
-                'ruling_planet': 'Uranus',
-                'element': 'Air',
-                'quality': 'Fixed',
-                'house': 11,
-                'dates': [(1, 20), (2, 18)]
-            },
-            'Pisces': {
-                'traits': ['Empathetic', 'Imaginative', 'Gentle', 'Intuitive', 'Dreamy'],
-                'ruling_planet': 'Neptune',
-                'element': 'Water',
-                'quality': 'Mutable',
-                'house': 12,
-                'dates': [(2, 19), (3, 20)]
-            }
-        }
-
-        self.PLANETS = {
-            'Sun': {'themes': ['identity', 'vitality', 'purpose', 'ego', 'leadership'], 'cycle_days': 365.25},
-            'Moon': {'themes': ['emotions', 'intuition', 'habits', 'security', 'nurturing'], 'cycle_days': 29.5},
-            'Mercury': {'themes': ['communication', 'thinking', 'learning', 'travel', 'technology'], 'cycle_days': 88},
-            'Venus': {'themes': ['love', 'beauty', 'relationships', 'values', 'harmony'], 'cycle_days': 225},
-            'Mars': {'themes': ['action', 'energy', 'conflict', 'passion', 'courage'], 'cycle_days': 687},
-            'Jupiter': {'themes': ['expansion', 'wisdom', 'luck', 'philosophy', 'growth'], 'cycle_days': 4333},
-            'Saturn': {'themes': ['discipline', 'restrictions', 'lessons', 'responsibility', 'structure'], 'cycle_days': 10759},
-            'Uranus': {'themes': ['innovation', 'rebellion', 'sudden change', 'freedom', 'technology'], 'cycle_days': 30687},
-            'Neptune': {'themes': ['spirituality', 'illusion', 'creativity', 'compassion', 'dreams'], 'cycle_days': 60190},
-            'Pluto': {'themes': ['transformation', 'power', 'rebirth', 'intensity', 'hidden truths'], 'cycle_days': 90560}
-        }
-
-        self.HOUSES = {
-            1: {'themes': ['self', 'appearance', 'first impressions', 'new beginnings']},
-            2: {'themes': ['money', 'possessions', 'values', 'self-worth']},
-            3: {'themes': ['communication', 'siblings', 'short trips', 'learning']},
-            4: {'themes': ['home', 'family', 'roots', 'emotional foundation']},
-            5: {'themes': ['creativity', 'romance', 'children', 'fun', 'self-expression']},
-            6: {'themes': ['work', 'health', 'daily routine', 'service']},
-            7: {'themes': ['partnerships', 'marriage', 'open enemies', 'cooperation']},
-            8: {'themes': ['transformation', 'shared resources', 'intimacy', 'mystery']},
-            9: {'themes': ['philosophy', 'higher learning', 'travel', 'spiritual growth']},
-            10: {'themes': ['career', 'reputation', 'authority', 'public image']},
-            11: {'themes': ['friendships', 'groups', 'hopes', 'social networks']},
-            12: {'themes': ['spirituality', 'hidden enemies', 'subconscious', 'sacrifice']}
-        }
-
-        self.ASPECTS = {
-            'conjunction': {'angle': 0, 'orb': 8, 'nature': 'neutral', 'strength': 'very strong'},
-            'sextile': {'angle': 60, 'orb': 6, 'nature': 'harmonious', 'strength': 'moderate'},
-            'square': {'angle': 90, 'orb': 8, 'nature': 'challenging', 'strength': 'strong'},
-            'trine': {'angle': 120, 'orb': 8, 'nature': 'harmonious', 'strength': 'strong'},
-            'opposition': {'angle': 180, 'orb': 8, 'nature': 'challenging', 'strength': 'very strong'}
-        }
-
-        self.DAILY_INFLUENCES = {
-            'Sun': {
-                'Fire': "Solar energy ignites your fire sign passion—lead with confidence.",
-                'Earth': "The Sun illuminates practical matters—focus on tangible achievements.",
-                'Air': "Solar radiance enhances communication—share your ideas boldly.",
-                'Water': "The Sun's warmth nurtures your emotional depth—trust your feelings."
-            },
-            'Moon': {
-                'Fire': "Lunar energy may dampen your fire—channel emotions into creative action.",
-                'Earth': "The Moon supports your grounded nature—trust your instincts about security.",
-                'Air': "Lunar influence brings emotional depth to your thoughts—listen to your heart.",
-                'Water': "The Moon amplifies your intuitive powers—go with the flow of your feelings."
-            },
-            'Mercury': {
-                'Fire': "Mercury speeds up your thinking—act on your bright ideas quickly.",
-                'Earth': "Mercury brings clarity to practical plans—organize your thoughts methodically.",
-                'Air': "Mercury enhances your natural communication gifts—network and connect.",
-                'Water': "Mercury stirs your emotional intelligence—express your feelings clearly."
-            },
-            'Venus': {
-                'Fire': "Venus softens your fiery nature—approach conflicts with charm.",
-                'Earth': "Venus highlights beauty and comfort—indulge in life's pleasures.",
-                'Air': "Venus enhances your social magnetism—relationships flourish.",
-                'Water': "Venus deepens emotional connections—open your heart to love."
-            },
-            'Mars': {
-                'Fire': "Mars amplifies your natural drive—channel this energy constructively.",
-                'Earth': "Mars pushes for action in practical matters—tackle your to-do list.",
-                'Air': "Mars energizes your communication—speak up and be heard.",
-                'Water': "Mars stirs deep emotions—find healthy outlets for intensity."
-            },
-            'Jupiter': {
-                'Fire': "Jupiter expands your optimistic nature—take calculated risks.",
-                'Earth': "Jupiter brings growth to practical ventures—invest in your future.",
-                'Air': "Jupiter broadens your intellectual horizons—learn something new.",
-                'Water': "Jupiter enhances your compassion—extend kindness to others."
-            },
-            'Saturn': {
-                'Fire': "Saturn teaches patience—slow down and plan carefully.",
-                'Earth': "Saturn supports your disciplined nature—build solid foundations.",
-                'Air': "Saturn brings structure to your ideas—commit to your plans.",
-                'Water': "Saturn encourages emotional maturity—face your feelings honestly."
-            }
-        }
+        self.ZODIAC = ZODIAC
+        self.PLANETS = PLANETS
+        self.HOUSES = HOUSES
+        self.ASPECTS = ASPECTS
+        self.DAILY_INFLUENCES = DAILY_INFLUENCES
 
     def calculate_planetary_position(self, planet, date):
         reference_date = datetime(2000, 1, 1)
@@ -216,8 +279,7 @@ class ProfessionalHoroscopeGenerator:
 
     def get_sign_from_position(self, position):
         sign_index = int(position // 30)
-        signs = list(self.ZODIAC.keys())
-        return signs[sign_index % 12]
+        return SIGNS[sign_index % 12]
 
     def calculate_daily_aspects(self, date):
         aspects = []
@@ -255,27 +317,10 @@ class ProfessionalHoroscopeGenerator:
     def get_daily_planetary_emphasis(self, date):
         day_of_year = date.timetuple().tm_yday
 
-        weekday_rulers = {
-            0: 'Moon',
-            1: 'Mars',
-            2: 'Mercury',
-            3: 'Jupiter',
-            4: 'Venus',
-            5: 'Saturn',
-            6: 'Sun'
-        }
-
-        primary_planet = weekday_rulers[date.weekday()]
+        primary_planet = WEEKDAY_RULERS[date.weekday()]
 
         lunar_phase = self.calculate_lunar_phase(date)
-        secondary_influences = {
-            'New Moon': 'Saturn',
-            'Waxing Crescent': 'Jupiter',
-            'Full Moon': 'Moon',
-            'Waning Crescent': 'Neptune'
-        }
-
-        secondary_planet = secondary_influences.get(lunar_phase, 'Mercury')
+        secondary_planet = SECONDARY_INFLUENCES.get(lunar_phase, 'Mercury')
 
         return primary_planet, secondary_planet
 
@@ -299,15 +344,8 @@ class ProfessionalHoroscopeGenerator:
         elif ruling_planet == secondary_planet:
             interpretations.append(f"Your ruling planet {ruling_planet} provides supportive energy for personal growth.")
 
-        lunar_influences = {
-            'New Moon': "New beginnings and fresh starts are highlighted—plant seeds for future growth.",
-            'Waxing Crescent': "Building momentum and growing energy support your current projects.",
-            'Full Moon': "Emotional intensity and culmination energy reach their peak—embrace transformation.",
-            'Waning Crescent': "Release and letting go create space for renewal—clear away what no longer serves."
-        }
-
-        if lunar_phase in lunar_influences:
-            interpretations.append(lunar_influences[lunar_phase])
+        if lunar_phase in LUNAR_INFLUENCES:
+            interpretations.append(LUNAR_INFLUENCES[lunar_phase])
 
         if aspects:
             harmonious_aspects = [a for a in aspects if a['nature'] == 'harmonious']
@@ -319,24 +357,11 @@ class ProfessionalHoroscopeGenerator:
             if challenging_aspects:
                 interpretations.append("Dynamic planetary tensions create opportunities for growth through challenge.")
 
-        element_advice = {
-            'Fire': "Channel your passionate energy into focused action—your enthusiasm is contagious.",
-            'Earth': "Ground yourself in practical matters and steady progress—stability brings success.",
-            'Air': "Communicate your ideas clearly and connect with others—collaboration is key.",
-            'Water': "Trust your intuition and honor your emotional needs—feelings guide you wisely."
-        }
-
-        if sign_data['element'] in element_advice:
-            interpretations.append(element_advice[sign_data['element']])
+        if sign_data['element'] in ELEMENT_ADVICE:
+            interpretations.append(ELEMENT_ADVICE[sign_data['element']])
 
-        quality_advice = {
-            'Cardinal': "Take initiative and lead by example—your natural leadership shines.",
-            'Fixed': "Stay committed to your goals and maintain steady progress—persistence pays off.",
-            'Mutable': "Adapt to changing circumstances with flexibility—versatility is your strength."
-        }
-
-        if sign_data['quality'] in quality_advice:
-            interpretations.append(quality_advice[sign_data['quality']])
+        if sign_data['quality'] in QUALITY_ADVICE:
+            interpretations.append(QUALITY_ADVICE[sign_data['quality']])
 
         if len(interpretations) >= 3:
             main_theme = interpretations[0]
@@ -372,15 +397,8 @@ class ProfessionalHoroscopeGenerator:
         return json.dumps(daily_horoscopes, indent=4)
 
     def get_lucky_color(self, sign, date):
-        element_colors = {
-            'Fire': ['Red', 'Orange', 'Gold', 'Crimson', 'Coral'],
-            'Earth': ['Green', 'Brown', 'Beige', 'Olive', 'Tan'],
-            'Air': ['Yellow', 'Silver', 'Light Blue', 'Lavender', 'White'],
-            'Water': ['Blue', 'Purple', 'Turquoise', 'Navy', 'Aqua']
-        }
-
         element = self.ZODIAC[sign]['element']
-        colors = element_colors[element]
+        colors = ELEMENT_COLORS[element]
 
         color_index = (date.day + date.month) % len(colors)
         return colors[color_index]
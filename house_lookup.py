@@ -0,0 +1,57 @@
+import bisect
+import numpy as np
+
+
+def chart_cusps(chart_data):
+    """Get the 12 house cusps from chart_data["houses"] (keys may be ints or, after JSON, strings)"""
+    houses = chart_data["houses"]
+    return [cusp for _, cusp in sorted(houses.items(), key=lambda item: int(item[0]))]
+
+
+def house_of(cusps, longitude):
+    """Get the house number (1-12) that contains an ecliptic longitude
+
+    Cusps are rotated so the Ascendant (first cusp) sits at 0 degrees, which turns
+    them into a sorted list without a wrap-around at 0 Aries, and the longitude is
+    placed with a binary search.
+    """
+    ascendant = cusps[0]
+    offsets = [(cusp - ascendant) % 360 for cusp in cusps[:12]]
+    offset = (longitude - ascendant) % 360
+    if offset >= 360:  # A tiny negative difference rounds up to 360
+        offset = 0.0
+    return bisect.bisect_right(offsets, offset)
+
+
+def houses_for_longitudes(cusps, longitudes):
+    """Get house numbers (1-12) for many longitudes, for one chart or many charts at once
+
+    Args:
+        cusps: House cusps, shape (12,) for one chart or (n, 12) for n charts
+        longitudes: Ecliptic longitudes, any shape for one chart or (n, k) for n charts
+
+    Returns:
+        Integer array of house numbers with the same shape as longitudes
+    """
+    cusps = np.asarray(cusps, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+
+    if cusps.ndim == 1:
+        offsets = np.mod(cusps[:12] - cusps[0], 360)
+        points = np.mod(longitudes - cusps[0], 360)
+        points = np.where(points >= 360, 0.0, points)
+        return np.searchsorted(offsets, points, side="right")
+
+    # Rotate every chart's cusps to start at its Ascendant, then shift chart i by
+    # 360 * i so all charts form one sorted array for a single searchsorted call
+    count = cusps.shape[0]
+    longitudes = longitudes.reshape(count, -1)
+    shift = 360.0 * np.arange(count)[:, None]
+
+    offsets = np.mod(cusps[:, :12] - cusps[:, :1], 360)
+    points = np.mod(longitudes - cusps[:, :1], 360)
+    points = np.where(points >= 360, 0.0, points)
+
+    positions = np.searchsorted((offsets + shift).ravel(), (points + shift).ravel(), side="right")
+    houses = positions.reshape(longitudes.shape) - 12 * np.arange(count)[:, None]
+    return houses
@@ -62,11 +62,19 @@
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from astrology_tool import AstrologyTool
+from astrology_tool import AstrologyTool, compatibility_cache_stats
+from geocoding import cached_coordinates
 from horoscope_generator import ProfessionalHoroscopeGenerator
+from transit_search import TransitSearch
+from astrocartography import ANGLES, Astrocartography
+from rectification import IncrementalChart, get_session, window_sample_count
+from relationship_charts import RELATIONSHIP_CHARTS, RelationshipCharts, relationship_chart_cache_stats
 from datetime import datetime
 import os
 import json
+import threading
+import time
+import swisseph as swe
 
 app = Flask(__name__)
 CORS(app, origins=["https://teal-brioche-d37e12.netlify.app"])
@@ -74,6 +82,60 @@ CORS(app, origins=["https://teal-brioche-d37e12.netlify.app"])
 tool = AstrologyTool()
 horoscope_generator = ProfessionalHoroscopeGenerator()
 
+# Limits of /compatibility/group: people per group and pairs analyzed in full
+MAX_GROUP_SIZE = 100
+MAX_GROUP_EXPAND = 20
+
+# Birth places of a group request that are not in the geocode cache yet. They are looked
+# up one after another at the geocoder's rate (1/s), each within GEOCODE_DEADLINE_SECONDS,
+# so this many stay well inside the gunicorn request timeout. On the ASGI path the places
+# are resolved before the route runs and are all cached by then.
+MAX_GROUP_NEW_PLACES = 8
+
+# Largest orb (degrees) of an /astrocartography grid; wider ones list most of the grid
+MAX_GRID_ORB = 10.0
+
+# Warm-up state reported by /readyz
+_warmup = {"ready": False}
+_warmup_lock = threading.Lock()
+
+def warm_up():
+    """Load the ephemeris and fill the shared caches before serving traffic
+
+    Computes a chart, this week's prediction (transit table and event calendar)
+    and today's horoscopes. Safe to call repeatedly; only the first call does work.
+    Under gunicorn with preload_app this runs in the master before workers fork.
+    """
+    with _warmup_lock:
+        if _warmup["ready"]:
+            return _warmup
+
+        started = time.time()
+        now = datetime.now()
+        birth_date = (now.year, now.month, now.day)
+        jd = tool.local_time_to_julian_day(birth_date, (12, 0, 0), "UTC")
+        chart = tool.build_birth_chart(birth_date, (12, 0, 0), "Greenwich", "Other", 51.4779, 0.0, jd, "UTC")
+        tool.generate_weekly_prediction(chart, now)
+        horoscope_generator.generate_daily_horoscopes(now)
+
+        _warmup.update({
+            "ready": True,
+            "warmed_at": now.isoformat(timespec="seconds"),
+            "warmup_seconds": round(time.time() - started, 3)
+        })
+        print(f"Warm-up finished in {_warmup['warmup_seconds']} s.")
+        return _warmup
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    if not _warmup["ready"]:
+        return jsonify({"ready": False, "pid": os.getpid()}), 503
+    return jsonify(dict(_warmup, pid=os.getpid()))
+
 @app.route('/birth-chart', methods=['POST'])
 def birth_chart():
     data = request.get_json()
@@ -90,6 +152,57 @@ def birth_chart():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/birth-chart/rectify', methods=['POST'])
+def rectify_birth_chart():
+    data = request.get_json()
+
+    try:
+        birth_date = tuple(data['birth_date'])
+        birth_time = tuple(data['birth_time'])
+        birth_place = data['birth_place']
+        gender = data.get('gender', 'Other')
+
+        # Diffs are against the session's previous chart, so every client needs its own session
+        session_id = data.get('session_id')
+        if not isinstance(session_id, str) or not session_id:
+            return jsonify({"error": "session_id (a non-empty string) is required"}), 400
+
+        # The place is geocoded once per session; moving the time only recomputes angles and houses
+        session = get_session(tool, (session_id, birth_place, gender), birth_place, gender)
+        chart, diff = session.update(birth_date, birth_time)
+        return jsonify({"chart": chart, "diff": diff})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/birth-chart/unknown-time', methods=['POST'])
+def unknown_time_birth_chart():
+    data = request.get_json()
+
+    try:
+        birth_date = tuple(data['birth_date'])
+        birth_place = data['birth_place']
+        gender = data.get('gender', 'Other')
+        window_start = tuple(data.get('window_start', (0, 0, 0)))
+        window_end = tuple(data.get('window_end', (23, 59, 59)))
+        step_minutes = float(data.get('step_minutes', 1.0))
+        try:
+            window_sample_count(window_start, window_end, step_minutes)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Sampling keeps no per-client state, so a session only saves geocoding when one is given
+        session_id = data.get('session_id')
+        if session_id:
+            session = get_session(tool, (session_id, birth_place, gender), birth_place, gender)
+        else:
+            session = IncrementalChart(tool, birth_place, gender)
+        result = session.sample_window(birth_date, window_start, window_end, step_minutes)
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/compatibility', methods=['POST'])
 def compatibility():
     data = request.get_json()
@@ -109,6 +222,188 @@ def compatibility():
         chart2 = tool.create_birth_chart(birth_date2, birth_time2, birth_place2, gender2)
 
         result = tool.analyze_compatibility(chart1, chart2)
+
+        # Optional composite and/or Davison charts, from the two charts already computed
+        kinds = data.get('relationship_charts')
+        if kinds:
+            if "error" in chart1 or "error" in chart2:
+                return jsonify({"error": chart1.get("error") or chart2.get("error")}), 500
+            if kinds is True:
+                kinds = RELATIONSHIP_CHARTS
+            elif isinstance(kinds, str):
+                kinds = (kinds,)
+            try:
+                charts = RelationshipCharts(tool).charts(chart1, chart2, kinds)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            # The analysis is cached and shared, so it is copied rather than modified
+            result = dict(result, relationship_charts=charts)
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/compatibility/group', methods=['POST'])
+def group_compatibility():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "The request body must be a JSON object"}), 400
+
+    people = data.get('people') or []
+    if not isinstance(people, list) or not 2 <= len(people) <= MAX_GROUP_SIZE:
+        return jsonify({"error": f"people must list between 2 and {MAX_GROUP_SIZE} people"}), 400
+    if not all(isinstance(person, dict) for person in people):
+        return jsonify({"error": "Each person must be an object with birth_date, birth_time and birth_place"}), 400
+
+    expand = data.get('expand', [])
+    try:
+        if not isinstance(expand, list):
+            raise TypeError("expand is not a list")
+        expand = [(int(i), int(j)) for i, j in expand]
+    except (TypeError, ValueError):
+        return jsonify({"error": "expand must be a list of [i, j] index pairs"}), 400
+    if len(expand) > MAX_GROUP_EXPAND:
+        return jsonify({"error": f"At most {MAX_GROUP_EXPAND} pairs can be expanded"}), 400
+
+    new_places = {person.get('birth_place') for person in people}
+    new_places = [place for place in new_places if isinstance(place, str) and cached_coordinates(place) is None]
+    if len(new_places) > MAX_GROUP_NEW_PLACES:
+        return jsonify({"error": f"At most {MAX_GROUP_NEW_PLACES} birth places that have not been looked up "
+                                 f"before can be in one request ({len(new_places)} given)"}), 400
+
+    try:
+        # Each person's chart is computed once, however many pairs it is in
+        charts = []
+        for index, person in enumerate(people):
+            chart = tool.create_birth_chart(
+                tuple(person['birth_date']), tuple(person['birth_time']), person['birth_place'],
+                person.get('gender', 'Other')
+            )
+            if "error" in chart:
+                return jsonify({"error": f"Person {index}: {chart['error']}"}), 500
+            charts.append(chart)
+
+        result = tool.analyze_group_compatibility(charts, expand)
+        result["people"] = [person.get('name', str(index)) for index, person in enumerate(people)]
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/compatibility/cache-stats', methods=['GET'])
+def compatibility_cache():
+    # Counts are per worker process; relationship charts have a cache of their own
+    return jsonify(dict(compatibility_cache_stats(), relationship_charts=relationship_chart_cache_stats(),
+                        pid=os.getpid()))
+
+@app.route('/prediction/weekly', methods=['POST'])
+def weekly_prediction():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "The request body must be a JSON object"}), 400
+
+    try:
+        start_date = datetime.strptime(data['start_date'], "%Y-%m-%d") if data.get('start_date') else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    try:
+        birth_date = tuple(data['birth_date'])
+        birth_time = tuple(data['birth_time'])
+        birth_place = data['birth_place']
+        gender = data.get('gender', 'Other')
+
+        chart = tool.create_birth_chart(birth_date, birth_time, birth_place, gender)
+        if "error" in chart:
+            return jsonify(chart), 500
+
+        start_date = start_date or datetime.now()
+        prediction = tool.generate_weekly_prediction(chart, start_date)
+        return jsonify({
+            "week_start": start_date.strftime("%Y-%m-%d"),
+            "prediction": prediction
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/transits/exact', methods=['POST'])
+def exact_transits():
+    data = request.get_json()
+
+    try:
+        try:
+            start_date = datetime.strptime(data['start_date'], "%Y-%m-%d") if data.get('start_date') else datetime.now()
+        except ValueError:
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+        try:
+            days = int(data.get('days', 365))
+        except (TypeError, ValueError):
+            return jsonify({"error": "days must be an integer"}), 400
+        if not 1 <= days <= 366:
+            return jsonify({"error": "days must be between 1 and 366"}), 400
+
+        birth_date = tuple(data['birth_date'])
+        birth_time = tuple(data['birth_time'])
+        birth_place = data['birth_place']
+        gender = data.get('gender', 'Other')
+
+        chart = tool.create_birth_chart(birth_date, birth_time, birth_place, gender)
+        if "error" in chart:
+            return jsonify(chart), 500
+
+        start_jd = swe.julday(start_date.year, start_date.month, start_date.day, 0.0)
+        transits = TransitSearch(tool).find_transits(
+            chart["chart_data"]["planets"], start_jd, start_jd + days, data.get('transit_planets')
+        )
+        return jsonify({"start_date": start_date.strftime("%Y-%m-%d"), "days": days, "transits": transits})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/astrocartography', methods=['POST'])
+def astrocartography():
+    data = request.get_json()
+
+    try:
+        birth_date = tuple(data['birth_date'])
+        birth_time = tuple(data['birth_time'])
+        birth_place = data['birth_place']
+        gender = data.get('gender', 'Other')
+
+        chart = tool.create_birth_chart(birth_date, birth_time, birth_place, gender)
+        if "error" in chart:
+            return jsonify(chart), 500
+
+        jd = chart["chart_data"]["julian_day"]
+        mapper = Astrocartography(tool)
+        result = {"lines": mapper.angle_lines(jd)}
+
+        # Optional grid of the cells where each planet is within orb of an angle
+        if data.get('grid_resolution'):
+            try:
+                resolution = float(data['grid_resolution'])
+                orb = float(data.get('orb', 2.0))
+            except (TypeError, ValueError):
+                return jsonify({"error": "grid_resolution and orb must be numbers"}), 400
+            if not resolution >= 0.5:
+                return jsonify({"error": "grid_resolution must be at least 0.5 degrees"}), 400
+            if not 0 < orb <= MAX_GRID_ORB:
+                return jsonify({"error": f"orb must be more than 0 and at most {MAX_GRID_ORB:g} degrees"}), 400
+
+            grid = mapper.angularity_grid(jd, resolution, orb)
+            cells = {}
+            for i, planet in enumerate(grid["planets"]):
+                lat_idx, lon_idx = (grid["angles"][i] >= 0).nonzero()
+                cells[planet] = [
+                    [float(grid["latitudes"][a]), float(grid["longitudes"][b]), ANGLES[grid["angles"][i, a, b]]]
+                    for a, b in zip(lat_idx, lon_idx)
+                ]
+            result["angular_cells"] = cells
+
         return jsonify(result)
 
     except Exception as e:
@@ -136,5 +431,7 @@ def daily_horoscope():
     return jsonify(all_horoscopes)
 
 if __name__ == '__main__':
+    # Development server; production runs under gunicorn -c gunicorn.conf.py main:app
+    warm_up()
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=True)
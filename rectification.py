@@ -0,0 +1,274 @@
+import datetime
+import threading
+from collections import OrderedDict
+import numpy as np
+import pytz
+import swisseph as swe
+import ephemeris
+from house_lookup import chart_cusps, houses_for_longitudes
+
+
+# Planet longitudes are extrapolated from the base positions with their daily speed
+# within this many days of the base time. Over half a day the Moon's error stays
+# within a few hundredths of a degree; further away the ephemeris is called again.
+MAX_INTERPOLATION_DAYS = 0.5
+
+# Sidereal time advances 360.9856 degrees per day of UT
+SIDEREAL_DEGREES_PER_DAY = 360.98564736629
+
+# Most samples in one birth time window (a day at one-minute steps); each costs a
+# houses_armc call under the process-wide ephemeris lock
+MAX_WINDOW_SAMPLES = 1440
+
+# Rectification sessions kept per process
+MAX_SESSIONS = 256
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def ascendant_and_midheaven(armc, latitude, obliquity):
+    """Ascendant and Midheaven longitudes in degrees for arrays of sidereal time (RAMC in degrees)"""
+    ramc = np.radians(armc)
+    eps = np.radians(obliquity)
+    phi = np.radians(latitude)
+
+    ascendant = np.degrees(np.arctan2(
+        np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(phi) * np.sin(eps))
+    )) % 360
+    midheaven = np.degrees(np.arctan2(np.sin(ramc), np.cos(ramc) * np.cos(eps))) % 360
+    return ascendant, midheaven
+
+
+def window_sample_count(start_time, end_time, step_minutes):
+    """Number of samples in a birth time window, checking the window and the step"""
+    start_minutes = start_time[0] * 60 + start_time[1] + start_time[2] / 60.0
+    end_minutes = end_time[0] * 60 + end_time[1] + end_time[2] / 60.0
+    if end_minutes <= start_minutes:
+        raise ValueError("The end of the birth time window must be after its start")
+    if not step_minutes > 0:
+        raise ValueError("step_minutes must be positive")
+    samples = int(np.ceil((end_minutes + 1e-9 - start_minutes) / step_minutes))
+    if samples > MAX_WINDOW_SAMPLES:
+        raise ValueError(f"The birth time window has {samples} samples, at most {MAX_WINDOW_SAMPLES} are allowed; "
+                         f"use a larger step_minutes")
+    return samples
+
+
+def sign_distribution(signs, names):
+    """Fraction of samples in each sign, for the signs that occur"""
+    counts = np.bincount(signs, minlength=12)
+    return {names[i]: round(float(counts[i]) / len(signs), 4) for i in range(12) if counts[i]}
+
+
+def chart_diff(previous, current):
+    """Describe what changed between two birth charts of the same person and place"""
+    previous_data = previous["chart_data"]
+    current_data = current["chart_data"]
+
+    sign_changes = {}
+    for name in ["ascendant", "midheaven"]:
+        if previous_data[name]["sign"] != current_data[name]["sign"]:
+            sign_changes[name.capitalize()] = [previous_data[name]["sign"], current_data[name]["sign"]]
+    for planet, data in current_data["planets"].items():
+        if previous_data["planets"][planet]["sign"] != data["sign"]:
+            sign_changes[planet] = [previous_data["planets"][planet]["sign"], data["sign"]]
+
+    # House placement of every planet before and after
+    planet_names = list(current_data["planets"].keys())
+    previous_houses = houses_for_longitudes(
+        chart_cusps(previous_data), [previous_data["planets"][planet]["longitude"] for planet in planet_names]
+    )
+    current_houses = houses_for_longitudes(
+        chart_cusps(current_data), [current_data["planets"][planet]["longitude"] for planet in planet_names]
+    )
+    house_changes = {
+        planet: [int(before), int(after)]
+        for planet, before, after in zip(planet_names, previous_houses, current_houses)
+        if before != after
+    }
+
+    def aspect_keys(chart_data):
+        return {(a["planet1"], a["planet2"], a["aspect"]) for a in chart_data["aspects"]}
+
+    previous_aspects = aspect_keys(previous_data)
+    current_aspects = aspect_keys(current_data)
+
+    return {
+        "time": [previous["birth_info"]["time"], current["birth_info"]["time"]],
+        "ascendant": current_data["ascendant"],
+        "midheaven": current_data["midheaven"],
+        "houses": current_data["houses"],
+        "sign_changes": sign_changes,
+        "house_changes": house_changes,
+        "aspects_added": [
+            {"planet1": p1, "planet2": p2, "aspect": aspect}
+            for p1, p2, aspect in sorted(current_aspects - previous_aspects)
+        ],
+        "aspects_removed": [
+            {"planet1": p1, "planet2": p2, "aspect": aspect}
+            for p1, p2, aspect in sorted(previous_aspects - current_aspects)
+        ],
+        "interpretation_changed": previous["interpretation"] != current["interpretation"]
+    }
+
+
+class IncrementalChart:
+    def __init__(self, tool, birth_place, gender):
+        """Resolve a birth place once so charts for different birth times can be rebuilt cheaply"""
+        self.tool = tool
+        self.birth_place = birth_place
+        self.gender = gender
+        self.latitude, self.longitude = tool.get_coordinates(birth_place)
+        self.timezone = tool.get_timezone(self.latitude, self.longitude)
+
+        self.base_jd = None
+        self.base_planets = None
+        self.chart = None
+        self.lock = threading.Lock()
+
+    def _planet_positions(self, jd):
+        """Planet positions at a Julian day, extrapolated from the base positions when close enough"""
+        if self.base_jd is None or abs(jd - self.base_jd) > MAX_INTERPOLATION_DAYS:
+            self.base_jd = jd
+            self.base_planets = self.tool.calculate_planet_positions(jd)
+            return self.base_planets
+
+        elapsed = jd - self.base_jd
+        planet_positions = {}
+        for planet, data in self.base_planets.items():
+            longitude = (data["longitude"] + data["speed"] * elapsed) % 360
+            planet_positions[planet] = {
+                "longitude": longitude,
+                "sign": self.tool.signs[int(longitude / 30)],
+                "degree": longitude % 30,
+                "speed": data["speed"]
+            }
+        return planet_positions
+
+    def update(self, birth_date, birth_time):
+        """Rebuild the chart for a new birth date/time, recomputing only the angles and houses
+
+        Returns:
+            Tuple (chart, diff) where diff describes the changes from the previous chart
+            of this session, or is None for the first chart
+        """
+        with self.lock:
+            jd = self.tool.local_time_to_julian_day(tuple(birth_date), tuple(birth_time), self.timezone)
+            chart = self.tool.build_birth_chart(
+                birth_date, birth_time, self.birth_place, self.gender,
+                self.latitude, self.longitude, jd, self.timezone,
+                planet_positions=self._planet_positions(jd)
+            )
+
+            diff = chart_diff(self.chart, chart) if self.chart is not None else None
+            self.chart = chart
+            return chart, diff
+
+    def sample_window(self, birth_date, start_time=(0, 0, 0), end_time=(23, 59, 59), step_minutes=1.0):
+        """Sample a window of possible birth times and summarize the chart factors that depend on it
+
+        Angles are computed for every sample at once from the sidereal time, the Moon
+        is interpolated from hourly ephemeris positions, and Placidus cusps (for the
+        Moon's house) come from one houses_armc call per sample.
+
+        Returns:
+            Dictionary with the probability of each Ascendant, Midheaven and Moon sign
+            and Moon house (assuming every time in the window is equally likely), and the
+            times at which the Ascendant changes sign
+        """
+        window_sample_count(start_time, end_time, step_minutes)
+        start_jd = self.tool.local_time_to_julian_day(tuple(birth_date), tuple(start_time), self.timezone)
+        end_jd = self.tool.local_time_to_julian_day(tuple(birth_date), tuple(end_time), self.timezone)
+
+        start_minutes = start_time[0] * 60 + start_time[1] + start_time[2] / 60.0
+        end_minutes = end_time[0] * 60 + end_time[1] + end_time[2] / 60.0
+
+        local_minutes = np.arange(start_minutes, end_minutes + 1e-9, step_minutes)
+
+        if abs((end_jd - start_jd) * 1440 - (end_minutes - start_minutes)) < 1e-3:
+            # No UTC offset change inside the window: Julian days are a linear function of local time
+            jds = start_jd + (local_minutes - start_minutes) / 1440.0
+        else:
+            # The window crosses a daylight saving transition: convert each sample and
+            # drop the local times skipped when the clocks go forward
+            timezone = pytz.timezone(self.timezone)
+            midnight = datetime.datetime(*birth_date)
+            kept_minutes = []
+            jds = []
+            for minutes in local_minutes:
+                local_datetime = midnight + datetime.timedelta(minutes=float(minutes))
+                try:
+                    timezone.localize(local_datetime, is_dst=None)
+                except pytz.NonExistentTimeError:
+                    continue
+                except pytz.AmbiguousTimeError:
+                    pass
+                kept_minutes.append(minutes)
+                jds.append(self.tool.local_time_to_julian_day(
+                    tuple(birth_date), (local_datetime.hour, local_datetime.minute, local_datetime.second), self.timezone
+                ))
+            local_minutes = np.array(kept_minutes)
+            jds = np.array(jds)
+
+        # Local sidereal time (RAMC) and obliquity, advancing linearly from the first sample
+        armc = (ephemeris.sidtime(jds[0]) * 15.0 + self.longitude + SIDEREAL_DEGREES_PER_DAY * (jds - jds[0])) % 360
+        obliquity = ephemeris.calc_ut(jds[0], swe.ECL_NUT)[0][0]
+        ascendants, midheavens = ascendant_and_midheaven(armc, self.latitude, obliquity)
+
+        # Moon longitudes interpolated from hourly positions
+        hours = np.arange(jds[0], jds[-1] + 1 / 24.0, 1 / 24.0)
+        hourly_moon = np.unwrap(np.radians([ephemeris.calc_ut(jd, swe.MOON)[0][0] for jd in hours]))
+        moon = np.degrees(np.interp(jds, hours, hourly_moon)) % 360
+
+        # Placidus cusps for every sample, then the Moon's house in each
+        cusps = np.array([ephemeris.houses_armc(a, self.latitude, obliquity)[0][:12] for a in armc])
+        moon_houses = houses_for_longitudes(cusps, moon[:, None])[:, 0]
+
+        ascendant_signs = (ascendants // 30).astype(int) % 12
+        midheaven_signs = (midheavens // 30).astype(int) % 12
+        moon_signs = (moon // 30).astype(int) % 12
+
+        # Times where the Ascendant enters a new sign, interpolated between samples
+        ascendant_changes = []
+        for i in np.nonzero(np.diff(ascendant_signs))[0]:
+            boundary = ascendant_signs[i + 1] * 30
+            travelled = (ascendants[i + 1] - ascendants[i]) % 360
+            fraction = ((boundary - ascendants[i]) % 360) / travelled if travelled else 0.0
+            minutes = local_minutes[i] + fraction * (local_minutes[i + 1] - local_minutes[i])
+            ascendant_changes.append({
+                "time": f"{int(minutes // 60):02d}:{int(minutes % 60):02d}:{int(minutes * 60 % 60):02d}",
+                "from": self.tool.signs[ascendant_signs[i]],
+                "to": self.tool.signs[ascendant_signs[i + 1]]
+            })
+
+        print(f"Birth time window sampled: {len(jds)} samples.")
+        return {
+            "samples": len(jds),
+            "step_minutes": step_minutes,
+            "ascendant_signs": sign_distribution(ascendant_signs, self.tool.signs),
+            "ascendant_changes": ascendant_changes,
+            "midheaven_signs": sign_distribution(midheaven_signs, self.tool.signs),
+            "moon_signs": sign_distribution(moon_signs, self.tool.signs),
+            "moon_range": {"start": float(moon[0]), "end": float(moon[-1])},
+            "moon_houses": {
+                int(house): round(float(count) / len(jds), 4)
+                for house, count in zip(*np.unique(moon_houses, return_counts=True))
+            }
+        }
+
+
+def get_session(tool, session_key, birth_place, gender):
+    """Get the rectification session for a key, resolving the birth place only when it is new"""
+    with _sessions_lock:
+        session = _sessions.get(session_key)
+        if session is not None:
+            _sessions.move_to_end(session_key)
+            return session
+
+    session = IncrementalChart(tool, birth_place, gender)
+
+    with _sessions_lock:
+        session = _sessions.setdefault(session_key, session)
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    return session
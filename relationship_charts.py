@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import swisseph as swe
+import ephemeris
+from astrology_tool import SIGNS, birth_coordinates, chart_hash
+from transit_search import julian_day_to_datetime
+
+
+RELATIONSHIP_CHARTS = ("composite", "davison")
+
+# Relationship charts, keyed by the two natal charts in sorted order and the kind of
+# chart; hit and miss counts for the metrics. Kept apart from the compatibility cache,
+# so its entries and hit rate only reflect compatibility analyses.
+RELATIONSHIP_CHART_CACHE_SIZE = 1024
+_relationship_chart_cache = OrderedDict()
+_relationship_chart_cache_lock = threading.Lock()
+_relationship_chart_cache_counts = {"hits": 0, "misses": 0}
+
+
+def relationship_chart_cache_stats():
+    """Hit and miss counts, hit rate and size of this process's relationship chart cache"""
+    with _relationship_chart_cache_lock:
+        counts = dict(_relationship_chart_cache_counts)
+        size = len(_relationship_chart_cache)
+    lookups = counts["hits"] + counts["misses"]
+    hit_rate = counts["hits"] / lookups if lookups else 0.0
+    return dict(counts, lookups=lookups, hit_rate=round(hit_rate, 4), size=size,
+                max_size=RELATIONSHIP_CHART_CACHE_SIZE)
+
+
+def circular_midpoints(longitudes1, longitudes2):
+    """Midpoints on the shorter arc between two arrays of ecliptic longitudes, in [0, 360)
+
+    The midpoint is taken from the smaller and the larger longitude of each pair, so
+    it does not depend on their order; for two exactly opposite points it lies 90
+    degrees past the smaller one.
+    """
+    longitudes1 = np.mod(np.asarray(longitudes1, dtype=float), 360.0)
+    longitudes2 = np.mod(np.asarray(longitudes2, dtype=float), 360.0)
+    low = np.minimum(longitudes1, longitudes2)
+    arc = np.maximum(longitudes1, longitudes2) - low
+    return np.mod(low + arc / 2 + np.where(arc > 180.0, 180.0, 0.0), 360.0)
+
+
+def geographic_midpoint(latitude1, longitude1, latitude2, longitude2):
+    """Davison midpoint of two places: the mean latitude and the midpoint of the longitudes on the shorter arc"""
+    longitude = (float(circular_midpoints(longitude1, longitude2)) + 180.0) % 360.0 - 180.0
+    return (latitude1 + latitude2) / 2, longitude
+
+
+def midheaven_armc(midheaven, obliquity):
+    """Sidereal time (RAMC) in degrees at which a longitude culminates, the inverse of the Midheaven formula"""
+    mc = np.radians(midheaven)
+    return float(np.degrees(np.arctan2(np.sin(mc) * np.cos(np.radians(obliquity)), np.cos(mc))) % 360)
+
+
+class RelationshipCharts:
+    def __init__(self, tool):
+        """Composite and Davison charts of two natal charts
+
+        The composite chart puts every planet at the midpoint of the two natal positions;
+        its houses are derived from the composite Midheaven at the mean latitude. The
+        Davison chart is an ordinary chart cast for the midpoint in time and place.
+        """
+        self.tool = tool
+
+    def charts(self, chart1, chart2, kinds=RELATIONSHIP_CHARTS):
+        """Get relationship charts of two natal charts (from create_birth_chart)
+
+        Results are cached per pair of natal charts in either order; they are shared and
+        must be treated as read-only.
+
+        Returns:
+            Dictionary mapping each kind ("composite", "davison") to its chart
+        """
+        for kind in kinds:
+            if kind not in RELATIONSHIP_CHARTS:
+                raise ValueError(f"Unknown relationship chart: {kind}")
+
+        # Natal positions, moment and place identify each input chart. Both kinds are
+        # symmetric in the two charts, so (A, B) and (B, A) share entries.
+        pair = tuple(sorted(
+            (chart_hash(chart), chart["chart_data"]["julian_day"], birth_coordinates(chart))
+            for chart in (chart1, chart2)
+        ))
+        result = {}
+        for kind in kinds:
+            cache_key = pair + (kind,)
+            with _relationship_chart_cache_lock:
+                chart = _relationship_chart_cache.get(cache_key)
+                if chart is not None:
+                    _relationship_chart_cache.move_to_end(cache_key)
+                    _relationship_chart_cache_counts["hits"] += 1
+                else:
+                    _relationship_chart_cache_counts["misses"] += 1
+            if chart is None:
+                chart = self.composite(chart1, chart2) if kind == "composite" else self.davison(chart1, chart2)
+                with _relationship_chart_cache_lock:
+                    _relationship_chart_cache[cache_key] = chart
+                    while len(_relationship_chart_cache) > RELATIONSHIP_CHART_CACHE_SIZE:
+                        _relationship_chart_cache.popitem(last=False)
+            result[kind] = chart
+        return result
+
+    def composite(self, chart1, chart2):
+        """Composite (midpoint) chart of two natal charts"""
+        chart_data1, chart_data2 = chart1["chart_data"], chart2["chart_data"]
+        planets1, planets2 = chart_data1["planets"], chart_data2["planets"]
+        names = list(planets1)
+
+        # Planets and the Midheaven in one step
+        midpoints = circular_midpoints(
+            [planets1[name]["longitude"] for name in names] + [chart_data1["midheaven"]["degree"]],
+            [planets2[name]["longitude"] for name in names] + [chart_data2["midheaven"]["degree"]]
+        ).tolist()
+        planet_positions = {}
+        for name, longitude in zip(names, midpoints):
+            planet_positions[name] = {
+                "longitude": longitude,
+                "sign": SIGNS[int(longitude / 30)],
+                "degree": longitude % 30,
+                "speed": (planets1[name]["speed"] + planets2[name]["speed"]) / 2
+            }
+
+        # Houses for the composite Midheaven at the mean latitude and midpoint time's obliquity
+        jd = (chart_data1["julian_day"] + chart_data2["julian_day"]) / 2
+        latitude = (birth_coordinates(chart1)[0] + birth_coordinates(chart2)[0]) / 2
+        obliquity = ephemeris.calc_ut(jd, swe.ECL_NUT)[0][0]
+        houses, angles = ephemeris.houses_armc(midheaven_armc(midpoints[-1], obliquity), latitude, obliquity)
+
+        return {
+            "method": "midpoint",
+            "chart_data": self._chart_data(jd, houses, angles[0], angles[1], planet_positions)
+        }
+
+    def davison(self, chart1, chart2):
+        """Davison chart of two natal charts, cast for the midpoint in time and place"""
+        jd = (chart1["chart_data"]["julian_day"] + chart2["chart_data"]["julian_day"]) / 2
+        latitude, longitude = geographic_midpoint(*birth_coordinates(chart1), *birth_coordinates(chart2))
+
+        houses, ascendant, midheaven = self.tool.calculate_houses(jd, latitude, longitude)
+        planet_positions = self.tool.calculate_planet_positions(jd)
+
+        moment = julian_day_to_datetime(jd)
+        return {
+            "birth_info": {
+                "date": f"{moment.day}/{moment.month}/{moment.year}",
+                "time": moment.strftime("%H:%M:%S"),
+                "coordinates": f"{latitude:.4f}, {longitude:.4f}",
+                "latitude": latitude,
+                "longitude": longitude,
+                "timezone": "UTC"
+            },
+            "chart_data": self._chart_data(jd, houses, ascendant, midheaven, planet_positions)
+        }
+
+    def _chart_data(self, jd, houses, ascendant, midheaven, planet_positions):
+        """Chart data in the layout of create_birth_chart's chart_data"""
+        return {
+            "julian_day": jd,
+            "ascendant": {"degree": ascendant, "sign": SIGNS[int(ascendant / 30)]},
+            "midheaven": {"degree": midheaven, "sign": SIGNS[int(midheaven / 30)]},
+            "houses": {i + 1: houses[i] for i in range(12)},
+            "planets": planet_positions,
+            "aspects": self.tool.calculate_aspects(planet_positions)
+        }
@@ -0,0 +1,113 @@
+# Microbenchmark of chart building without geocoding or timezone I/O:
+#
+#     python scripts/bench_birth_chart.py
+#     python scripts/bench_birth_chart.py --baseline 53391c3^
+#
+# The place and timezone lookups are replaced by fixed values, so the timings cover
+# only the ephemeris, house, aspect and interpretation work. With --baseline the same
+# benchmark also runs on a git revision (extracted to a temporary directory) and both
+# are printed side by side. Each timing is the best of several repeats.
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BIRTH_PLACE = "Paris, France"
+COORDINATES = (48.8566, 2.3522)
+TIMEZONE = "Europe/Paris"
+
+REPEATS = 5
+
+
+def run_benchmarks(number):
+    """Time the benchmarks in the tree on sys.path and return {name: seconds per call}"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        from astrology_tool import AstrologyTool
+        from horoscope_generator import ProfessionalHoroscopeGenerator
+
+        tool = AstrologyTool()
+        tool.get_coordinates = lambda location: COORDINATES
+        tool.get_timezone = lambda latitude, longitude: TIMEZONE
+        generator = ProfessionalHoroscopeGenerator()
+        date = datetime.datetime(2026, 10, 19)
+
+        minutes = iter(range(10 ** 9))
+
+        def create_birth_chart():
+            # A new birth time on every call, so nothing can be served from a cache
+            minute = next(minutes) % 1440
+            tool.create_birth_chart((1990, 6, 28), (minute // 60, minute % 60, 0), BIRTH_PLACE, "Female")
+
+        def interpretations():
+            for sign in tool.signs:
+                tool.interpret_sun_sign(sign, "Female")
+                tool.interpret_moon_sign(sign)
+                tool.interpret_ascendant(sign)
+                tool.interpret_mercury(sign)
+
+        benchmarks = [
+            ("create_birth_chart", create_birth_chart, number),
+            ("48 interpret_* calls", interpretations, number),
+            ("ProfessionalHoroscopeGenerator()", ProfessionalHoroscopeGenerator, 10 * number),
+            ("get_lucky_color", lambda: generator.get_lucky_color("Leo", date), 100 * number),
+        ]
+        return {
+            name: min(timeit.repeat(function, number=calls, repeat=REPEATS)) / calls
+            for name, function, calls in benchmarks
+        }
+
+
+def run_in_tree(tree, number):
+    """Run the benchmark in a subprocess importing the modules of another tree"""
+    env = dict(os.environ, PYTHONPATH=tree)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--json", "--number", str(number)],
+        env=env, cwd=tree, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def extract_revision(revision, directory):
+    """Write the files of a git revision to a directory"""
+    archive = subprocess.run(["git", "-C", REPO_DIR, "archive", "--format=tar", revision],
+                             check=True, capture_output=True).stdout
+    with tempfile.TemporaryFile() as f:
+        f.write(archive)
+        f.seek(0)
+        with tarfile.open(fileobj=f) as tar:
+            tar.extractall(directory, filter="data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chart building without geocoding or timezone I/O")
+    parser.add_argument("--baseline", help="Git revision to compare with (e.g. 53391c3^)")
+    parser.add_argument("--number", type=int, default=500, help="Calls per repeat (default 500)")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.json:
+        print(json.dumps(run_benchmarks(args.number)))
+        return
+
+    results = {"current": run_in_tree(REPO_DIR, args.number)}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            extract_revision(args.baseline, directory)
+            results = {args.baseline: run_in_tree(directory, args.number), **results}
+
+    columns = list(results)
+    print(f"{'':34}" + "".join(f"{column:>14}" for column in columns))
+    for name in results["current"]:
+        print(f"{name:34}" + "".join(f"{results[column][name] * 1e6:>11.1f} us" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
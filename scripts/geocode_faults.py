@@ -0,0 +1,149 @@
+# Geocoding latency under provider faults, on the blocking and the ASGI path:
+#
+#     python scripts/geocode_faults.py
+#     python scripts/geocode_faults.py --lookups 200 --paths async
+#
+# Starts fault-injecting stand-in geocoders (scripts/standin_geocoder.py) in this
+# process: a flaky primary and secondary provider (30-80 ms latency, 3 s stalls on 5%
+# of requests, 503s on 2%) and one that is down. Each scenario then runs in a fresh
+# subprocess configured through the environment, like a server would be, looks up
+# distinct places from several concurrent clients and reports p50/p99 latency and
+# the lookups that failed.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from standin_geocoder import StandinGeocoder
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLAKY = {"latency": 0.03, "jitter": 0.05, "stall_probability": 0.05, "stall_seconds": 3.0, "error_probability": 0.02}
+
+# Scenario name -> (primary, secondary or None); servers are "flaky", "flaky2" and "down"
+SCENARIOS = {
+    "primary only": ("flaky", None),
+    "hedged": ("flaky", "flaky2"),
+    "primary down + secondary": ("down", "flaky2"),
+    "primary down, no secondary": ("down", None),
+}
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    return {"p50": percentile(0.50), "p99": percentile(0.99), "max": latencies[-1] * 1000}
+
+
+def blocking_lookups(places, concurrency):
+    """Latency and success of AstrologyTool.get_coordinates for each place"""
+    from astrology_tool import AstrologyTool
+    tool = AstrologyTool()
+
+    def one(place):
+        start = time.monotonic()
+        try:
+            tool.get_coordinates(place)
+            return time.monotonic() - start, True
+        except Exception:
+            return time.monotonic() - start, False
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(one, places))
+
+
+def async_lookups(places, concurrency):
+    """Latency and success of the ASGI path's AsyncGeocoder for each place"""
+    from asgi import AsyncGeocoder
+
+    async def run():
+        geocoder = AsyncGeocoder()
+        clients = asyncio.Semaphore(concurrency)
+
+        async def one(place):
+            async with clients:
+                start = time.monotonic()
+                try:
+                    await geocoder.get_coordinates(place)
+                    return time.monotonic() - start, True
+                except Exception:
+                    return time.monotonic() - start, False
+
+        try:
+            return await asyncio.gather(*(one(place) for place in places))
+        finally:
+            await geocoder.aclose()
+
+    return asyncio.run(run())
+
+
+def run_child(path, lookups, concurrency, tag):
+    sys.path.insert(0, REPO_DIR)
+    places = [f"City {tag} {i}" for i in range(lookups)]
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results = (async_lookups if path == "async" else blocking_lookups)(places, concurrency)
+        finally:
+            sys.stdout = stdout
+    result = percentiles([latency for latency, _ in results])
+    result["failed"] = sum(not ok for _, ok in results)
+    print(json.dumps(result))
+
+
+def run_scenario(path, primary, secondary, lookups, concurrency, hedge_delay, tag):
+    env = dict(
+        os.environ, GEOCODER_URL=primary, GEOCODE_HEDGE_DELAY_SECONDS=str(hedge_delay),
+        # The stand-ins have no usage policy, so the client-side rate limit is lifted
+        GEOCODER_RATE="1000", GEOCODER_SECONDARY_RATE="1000", GEOCODER_BURST="8", GEOCODER_WORKERS="8"
+    )
+    env.pop("GEOCODER_SECONDARY_URL", None)
+    if secondary:
+        env["GEOCODER_SECONDARY_URL"] = secondary
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", path, "--lookups", str(lookups),
+         "--concurrency", str(concurrency), "--tag", tag],
+        cwd=REPO_DIR, env=env, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocoding latency under provider faults")
+    parser.add_argument("--paths", nargs="+", choices=["blocking", "async"], default=["blocking", "async"])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--lookups", type=int, default=400, help="Distinct places per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    parser.add_argument("--child", choices=["blocking", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--tag", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.lookups, args.concurrency, args.tag)
+        return
+
+    servers = {
+        "flaky": StandinGeocoder(seed=1, **FLAKY).start(),
+        "flaky2": StandinGeocoder(seed=2, **FLAKY).start(),
+        "down": StandinGeocoder(down=True).start(),
+    }
+    try:
+        print(f"{args.lookups} distinct places, {args.concurrency} concurrent clients, hedge delay {args.hedge_delay:g} s")
+        for path in args.paths:
+            for i, name in enumerate(args.scenarios):
+                primary, secondary = SCENARIOS[name]
+                result = run_scenario(path, servers[primary].url, secondary and servers[secondary].url, args.lookups,
+                                      args.concurrency, args.hedge_delay, f"{path} {i}")
+                print(f"  {path:8} {name:28} p50 {result['p50']:6.0f} ms  p99 {result['p99']:6.0f} ms  "
+                      f"max {result['max']:6.0f} ms  failed {result['failed']}", flush=True)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Load test of the serving configurations against a local stand-in geocoder:
+#
+#     python scripts/loadtest.py
+#     python scripts/loadtest.py --servers gunicorn asgi --latency 0.2 --unique-places --concurrency 200
+#
+# Each server configuration is started as a subprocess pointed at a stand-in geocoder
+# (scripts/standin_geocoder.py, run in this process), warmed up until /readyz answers,
+# and sent POST /birth-chart requests from a pool of client threads. Prints throughput
+# and latency percentiles per configuration. The client shares the machine with the
+# server, so on few cores the numbers are only comparable with each other.
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from standin_geocoder import StandinGeocoder
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "dev": [sys.executable, "-c", "import os, main; main.warm_up(); "
+                                  "main.app.run(port=int(os.environ['PORT']), threaded=True)"],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:app", "--port", "{port}", "--log-level", "warning",
+             "--backlog", "4096"],
+}
+
+PLACES = ["Paris, France", "New York, USA", "London, UK", "Tokyo, Japan"]
+
+READY_TIMEOUT_SECONDS = 120
+
+
+def request_body(i, unique_places):
+    """A birth chart request; with unique_places every request needs its own geocoder lookup"""
+    place = f"Place {i}" if unique_places else PLACES[i % len(PLACES)]
+    return json.dumps({
+        "birth_date": [1950 + i % 60, 1 + i % 12, 1 + i % 28],
+        "birth_time": [i % 24, (7 * i) % 60, 0],
+        "birth_place": place,
+        "gender": "Other"
+    })
+
+
+def http_request(port, method, path, body=None, timeout=120):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        connection.request(method, path, body, {"Content-Type": "application/json"} if body else {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def wait_ready(port, process):
+    end = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < end:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            if http_request(port, "GET", "/readyz", timeout=5)[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError("Server did not become ready")
+
+
+def run_load(port, total, concurrency, unique_places, offset):
+    """Send total requests with concurrency client threads
+
+    Returns:
+        Dictionary with the throughput, latency percentiles in ms and the failed requests
+    """
+    def one(i):
+        start = time.perf_counter()
+        try:
+            status, _ = http_request(port, "POST", "/birth-chart", request_body(offset + i, unique_places))
+        except OSError:
+            status = None
+        return time.perf_counter() - start, status == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    return {
+        "requests_per_second": total / elapsed,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "failed": sum(not ok for _, ok in results)
+    }
+
+
+def run_server(name, port, geocoder_url, workers, threads, total, concurrency, unique_places, offset):
+    env = dict(
+        os.environ, PORT=str(port), GEOCODER_URL=geocoder_url,
+        # The stand-in has no usage policy, so the client-side rate limit is lifted
+        GEOCODER_RATE="100000", GEOCODER_BURST="100", GEOCODER_WORKERS=str(max(8, threads)),
+        WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads), ASGI_EXECUTOR_THREADS=str(threads)
+    )
+    command = [part.format(port=port) for part in SERVERS[name]]
+    process = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port, process)
+        return run_load(port, total, concurrency, unique_places, offset)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the serving configurations")
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["dev", "gunicorn"])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=16, help="Threads per gunicorn worker and ASGI executor")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in geocoder latency in seconds")
+    parser.add_argument("--unique-places", action="store_true",
+                        help="A new place per request, so every request waits on the geocoder")
+    parser.add_argument("--port", type=int, default=5300, help="First server port")
+    args = parser.parse_args()
+
+    geocoder = StandinGeocoder(latency=args.latency).start()
+    try:
+        print(f"{args.requests} POST /birth-chart, concurrency {args.concurrency}, geocoder latency "
+              f"{args.latency:g} s{', unique places' if args.unique_places else ''}")
+        for i, name in enumerate(args.servers):
+            label = f"{name} {args.workers}x{args.threads}" if name == "gunicorn" else name
+            # Places are not shared between runs, so no server starts with them cached
+            result = run_server(name, args.port + i, geocoder.url, args.workers, args.threads, args.requests,
+                                args.concurrency, args.unique_places, i * args.requests)
+            print(f"  {label:16} {result['requests_per_second']:7.1f} req/s  p50 {result['p50']:6.0f} ms  "
+                  f"p99 {result['p99']:6.0f} ms  failed {result['failed']}", flush=True)
+    finally:
+        geocoder.stop()
+
+
+if __name__ == "__main__":
+    main()
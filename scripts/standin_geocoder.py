@@ -0,0 +1,138 @@
+# Local stand-in for a Nominatim geocoder, for load tests and tests:
+#
+#     python scripts/standin_geocoder.py --port 8099 --latency 0.2
+#     GEOCODER_URL=http://127.0.0.1:8099 GEOCODER_RATE=100000 gunicorn -c gunicorn.conf.py main:app
+#
+# GET /search?q=<place>&format=json answers like Nominatim's search API. Every place
+# resolves to a point near one of a few cities (chosen by a hash of the name, so a
+# name always gets the same coordinates), except names starting with "Nowhere",
+# which are not found. Latency, stalls and server errors can be injected.
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+CITIES = [(48.8566, 2.3522), (40.7128, -74.0060), (51.5074, -0.1278), (35.6762, 139.6503)]
+
+
+def place_coordinates(place):
+    """Coordinates the stand-in gives a place name"""
+    h = zlib.crc32(place.encode("utf-8"))
+    latitude, longitude = CITIES[h % len(CITIES)]
+    return latitude + (h // 4 % 100) / 1000, longitude + (h // 400 % 100) / 1000
+
+
+class StandinGeocoder(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, stall_probability=0.0, stall_seconds=3.0,
+                 error_probability=0.0, down=False, seed=1):
+        """Stand-in geocoding server on 127.0.0.1 (port 0 picks a free port, see self.url)
+
+        Args:
+            latency: Seconds before every answer, plus up to jitter more
+            stall_probability: Share of requests that take stall_seconds longer
+            error_probability: Share of requests answered with 503
+            down: Answer every request with 503
+        """
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.error_probability = error_probability
+        self.down = down
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        """Serve from a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True, name="standin-geocoder").start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on stalled requests they no longer need
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive clients
+    # wait for the delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        place = parse_qs(url.query).get("q", [""])[0]
+        with server.lock:
+            server.requests[place] += 1
+            draw = server.random.random()
+            delay = server.latency + server.random.uniform(0, server.jitter)
+        if draw < server.stall_probability:
+            delay += server.stall_seconds
+        time.sleep(delay)
+
+        if url.path != "/search":
+            self.send(404, {"error": "Not found"})
+        elif server.down or server.stall_probability <= draw < server.stall_probability + server.error_probability:
+            self.send(503, {"error": "Service unavailable"})
+        elif place.startswith("Nowhere"):
+            self.send(200, [])
+        else:
+            latitude, longitude = place_coordinates(place)
+            self.send(200, [{"lat": str(latitude), "lon": str(longitude), "display_name": place}])
+
+    def send(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Nominatim geocoder")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before every answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds, at random")
+    parser.add_argument("--stall-probability", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=3.0)
+    parser.add_argument("--error-probability", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--down", action="store_true", help="Answer every request with 503")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = StandinGeocoder(args.port, args.latency, args.jitter, args.stall_probability, args.stall_seconds,
+                             args.error_probability, args.down, args.seed)
+    print(f"Stand-in geocoder on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import pickle
+import stat
+import threading
+import time
+
+
+# How long a result written by one process is handed to processes that were waiting
+# on the same key. Only requests that overlapped the computation should share it.
+SHARED_RESULT_SECONDS = 5.0
+
+# Keys are hashed into this many lock files, which keeps the lock directory bounded.
+# Keys that share a bucket are computed one at a time.
+LOCK_BUCKETS = 256
+
+
+def private_directory(path):
+    """Create a directory only this user can use, or check that an existing one is
+
+    Results are unpickled from the lock directory, so anyone who could write there
+    could run code in the server; the directory must be owned by this user, not a
+    symlink, and closed to group and others (mode 0700).
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise ValueError(f"Lock directory {path} is not a directory")
+    if info.st_uid != os.getuid():
+        raise ValueError(f"Lock directory {path} is not owned by this user")
+    if info.st_mode & 0o077:
+        raise ValueError(f"Lock directory {path} must not be accessible to other users (chmod 700)")
+    return path
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=None, shared_result_seconds=SHARED_RESULT_SECONDS, shareable=None):
+        """Coalesce concurrent calls with the same key into one computation
+
+        Within a process, callers that arrive while a key is in flight wait for the
+        first caller and get its result (or its exception). With lock_dir set,
+        processes also take a lock file for the key's bucket, and the process that
+        computed a key leaves the result next to it so the processes that were waiting
+        can reuse it. Exceptions, and results for which shareable(result) is false
+        (such as error values), are not passed to other processes. lock_dir must be
+        private to the server's user (see private_directory).
+
+        Results are shared between callers, so they must be treated as read-only.
+        """
+        self.lock_dir = lock_dir
+        self.shared_result_seconds = shared_result_seconds
+        self.shareable = shareable
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+        if lock_dir:
+            private_directory(lock_dir)
+
+    def do(self, key, func, *args, **kwargs):
+        """Call func(*args, **kwargs) unless a call for the same key is already in flight"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                call.result = self._do_across_processes(key, func, args, kwargs)
+            else:
+                call.result = func(*args, **kwargs)
+                with self.lock:
+                    self.executed += 1
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def _do_across_processes(self, key, func, args, kwargs):
+        """Compute under the key's lock file, reusing a result just written by another process"""
+        import fcntl
+
+        bucket = int(hashlib.sha1(repr(key).encode("utf-8")).hexdigest(), 16) % LOCK_BUCKETS
+        path = os.path.join(self.lock_dir, f"{bucket:03d}")
+        with os.fdopen(os.open(path + ".lock", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    if time.time() - os.path.getmtime(path + ".result") <= self.shared_result_seconds:
+                        with open(path + ".result", "rb") as f:
+                            stored_key, result = pickle.load(f)
+                        if stored_key == key:
+                            with self.lock:
+                                self.coalesced += 1
+                            return result
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    pass
+
+                result = func(*args, **kwargs)
+                with self.lock:
+                    self.executed += 1
+                if self.shareable is not None and not self.shareable(result):
+                    return result
+
+                # Write to a temporary file and rename, so readers never see a partial result
+                temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with os.fdopen(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                    pickle.dump((key, result), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary_path, path + ".result")
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+# The modules live at the top of the repository; the stand-in geocoder is in scripts/
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "scripts"))
+
+from astrology_tool import AstrologyTool  # noqa: E402
+from standin_geocoder import StandinGeocoder  # noqa: E402
+
+
+# Birth places resolved without a geocoder, so tests need no network
+PLACES = {
+    "Paris, France": (48.8566, 2.3522),
+    "New York, USA": (40.7128, -74.0060),
+    "London, UK": (51.5074, -0.1278),
+    "Tokyo, Japan": (35.6762, 139.6503),
+}
+
+
+@pytest.fixture(scope="session")
+def tool():
+    """AstrologyTool whose geocoding is a lookup in PLACES"""
+    tool = AstrologyTool()
+    tool.get_coordinates = lambda location: PLACES[location]
+    return tool
+
+
+@pytest.fixture
+def standin_geocoder():
+    """Start local stand-in geocoders: standin_geocoder(latency=..., down=...) returns a running server"""
+    servers = []
+
+    def start(**options):
+        server = StandinGeocoder(**options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
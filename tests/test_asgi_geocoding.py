@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+import uuid
+import pytest
+import asgi
+from astrology_tool import AstrologyTool
+from geocoding import CircuitBreaker, TokenBucket, cached_coordinates
+from standin_geocoder import place_coordinates
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate(monkeypatch):
+    # The stand-in has no usage policy to respect
+    monkeypatch.setattr(asgi, "geocoder_bucket", TokenBucket(100000, 100))
+    monkeypatch.setattr(asgi, "secondary_geocoder_bucket", TokenBucket(100000, 100))
+
+
+def unique_places(count, prefix="Place"):
+    """Place names no other test has looked up, so none is in the geocode cache"""
+    run = uuid.uuid4().hex[:8]
+    return [f"{prefix} {run} {i}" for i in range(count)]
+
+
+async def lookup_all(url, places, **options):
+    geocoder = asgi.AsyncGeocoder(url, **options)
+    try:
+        return await asyncio.gather(*(geocoder.get_coordinates(place) for place in places), return_exceptions=True)
+    finally:
+        await geocoder.aclose()
+
+
+def test_lookups_run_concurrently(standin_geocoder):
+    server = standin_geocoder(latency=0.2)
+    places = unique_places(50)
+
+    start = time.monotonic()
+    results = asyncio.run(lookup_all(server.url, places))
+    elapsed = time.monotonic() - start
+
+    assert results == [place_coordinates(place) for place in places]
+    # 50 sequential lookups would take 10 s
+    assert elapsed < 2.0
+    assert all(cached_coordinates(place) == place_coordinates(place) for place in places)
+
+
+def test_concurrency_is_bounded_by_the_pool(standin_geocoder):
+    server = standin_geocoder(latency=0.2)
+    places = unique_places(8)
+
+    start = time.monotonic()
+    asyncio.run(lookup_all(server.url, places, max_connections=2))
+    # Four rounds of two lookups
+    assert time.monotonic() - start >= 0.8
+
+
+def test_concurrent_lookups_of_one_place_share_a_request(standin_geocoder):
+    server = standin_geocoder(latency=0.2)
+    place, = unique_places(1)
+
+    results = asyncio.run(lookup_all(server.url, [place] * 20))
+
+    assert results == [place_coordinates(place)] * 20
+    assert server.requests[place] == 1
+
+
+def test_cached_places_are_not_requested_again(standin_geocoder):
+    server = standin_geocoder()
+    place, = unique_places(1)
+
+    asyncio.run(lookup_all(server.url, [place]))
+    asyncio.run(lookup_all(server.url, [place]))
+    assert server.requests[place] == 1
+
+
+def test_unknown_place(standin_geocoder):
+    server = standin_geocoder()
+    place, = unique_places(1, prefix="Nowhere")
+
+    error, = asyncio.run(lookup_all(server.url, [place]))
+
+    assert isinstance(error, ValueError)
+    assert str(error) == f"Could not find coordinates for location: {place}"
+    assert cached_coordinates(place) is None
+
+
+def test_server_errors_fail_every_waiting_lookup(standin_geocoder):
+    server = standin_geocoder(latency=0.1, down=True)
+    place, = unique_places(1)
+
+    errors = asyncio.run(lookup_all(server.url, [place] * 5, deadline=0.5))
+
+    assert all(isinstance(error, ValueError) and "Error getting coordinates" in str(error) for error in errors)
+    # One lookup, whose error every caller gets
+    assert all(error is errors[0] for error in errors)
+    assert cached_coordinates(place) is None
+
+
+def test_transient_errors_are_retried(standin_geocoder):
+    server = standin_geocoder(down=True)
+    place, = unique_places(1)
+    threading.Timer(0.3, lambda: setattr(server, "down", False)).start()
+
+    assert asyncio.run(lookup_all(server.url, [place])) == [place_coordinates(place)]
+    assert server.requests[place] >= 2
+
+
+def test_failed_lookup_is_retried_by_the_next_request(standin_geocoder):
+    server = standin_geocoder(down=True)
+    place, = unique_places(1)
+
+    async def lookup_twice():
+        geocoder = asgi.AsyncGeocoder(server.url, deadline=0.5)
+        try:
+            with pytest.raises(ValueError):
+                await geocoder.get_coordinates(place)
+            assert geocoder.pending == {}
+            failed_requests = server.requests[place]
+            server.down = False
+            return await geocoder.get_coordinates(place), failed_requests
+        finally:
+            await geocoder.aclose()
+
+    coordinates, failed_requests = asyncio.run(lookup_twice())
+    assert coordinates == place_coordinates(place)
+    assert server.requests[place] == failed_requests + 1
+
+
+def test_unreachable_geocoder(standin_geocoder):
+    server = standin_geocoder()
+    server.stop()
+    place, = unique_places(1)
+
+    error, = asyncio.run(lookup_all(server.url, [place], timeout=1.0, deadline=0.5))
+    assert isinstance(error, ValueError)
+
+
+def test_lookup_gives_up_at_the_deadline(standin_geocoder):
+    server = standin_geocoder(latency=2.0)
+    place, = unique_places(1)
+
+    start = time.monotonic()
+    error, = asyncio.run(lookup_all(server.url, [place], deadline=0.3))
+
+    assert time.monotonic() - start < 1.0
+    assert isinstance(error, ValueError) and "No geocoder answered within 0.3 s" in str(error)
+
+
+def test_waiting_for_a_rate_token_does_not_count_against_the_deadline(standin_geocoder, monkeypatch):
+    monkeypatch.setattr(asgi, "geocoder_bucket", TokenBucket(10, 1))
+    server = standin_geocoder()
+    places = unique_places(10)
+
+    # The last place waits about 0.9 s for its token, past the deadline
+    results = asyncio.run(lookup_all(server.url, places, deadline=0.3, secondary_url=None))
+
+    assert results == [place_coordinates(place) for place in places]
+    assert all(server.requests[place] == 1 for place in places)
+
+
+def test_slow_primary_is_hedged_to_the_secondary(standin_geocoder):
+    primary = standin_geocoder(latency=1.5)
+    secondary = standin_geocoder()
+    place, = unique_places(1)
+
+    async def lookup():
+        geocoder = asgi.AsyncGeocoder(primary.url, secondary_url=secondary.url, hedge_delay=0.1)
+        try:
+            start = time.monotonic()
+            coordinates = await geocoder.get_coordinates(place)
+            return coordinates, time.monotonic() - start, geocoder.hedged
+        finally:
+            await geocoder.aclose()
+
+    coordinates, elapsed, hedged = asyncio.run(lookup())
+    assert coordinates == place_coordinates(place)
+    assert elapsed < 1.0
+    assert hedged == 1
+    assert primary.requests[place] == secondary.requests[place] == 1
+
+
+def test_failing_primary_opens_its_breaker(standin_geocoder):
+    primary = standin_geocoder(down=True)
+    secondary = standin_geocoder()
+    places = unique_places(6)
+    breaker = CircuitBreaker(window=2, reset_seconds=60)
+
+    async def lookup():
+        geocoder = asgi.AsyncGeocoder(primary.url, secondary_url=secondary.url, breakers=[breaker, CircuitBreaker()])
+        try:
+            return [await geocoder.get_coordinates(place) for place in places]
+        finally:
+            await geocoder.aclose()
+
+    assert asyncio.run(lookup()) == [place_coordinates(place) for place in places]
+    assert breaker.state == "open"
+    # Two failures opened the breaker; later lookups went straight to the secondary
+    assert sum(primary.requests.values()) == 2
+    assert sum(secondary.requests.values()) == 6
+
+
+def test_no_available_provider_fails_at_once(standin_geocoder):
+    server = standin_geocoder()
+    place, = unique_places(1)
+    breaker = CircuitBreaker(window=1, reset_seconds=60)
+    breaker.record_failure()
+
+    error, = asyncio.run(lookup_all(server.url, [place], breakers=[breaker]))
+
+    assert isinstance(error, ValueError) and "No geocoding provider is available" in str(error)
+    assert server.requests[place] == 0
+
+
+def test_route_reports_a_failed_async_lookup_without_retrying(tool, standin_geocoder):
+    server = standin_geocoder(down=True)
+    place, = unique_places(1)
+    asyncio.run(lookup_all(server.url, [place], deadline=0.5))
+
+    # The blocking path that the route runs next fails at once
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="Error getting coordinates: No geocoder answered within 0.5 s"):
+        AstrologyTool.get_coordinates(tool, place)
+    assert time.monotonic() - start < 0.1
@@ -0,0 +1,55 @@
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import astrology_tool
+from astrocartography import Astrocartography
+from conftest import PLACES
+from transit_search import TransitSearch
+
+
+PLACE_NAMES = list(PLACES)
+BIRTHS = [
+    ((1950 + i % 60, 1 + i % 12, 1 + i % 28), (i % 24, (7 * i) % 60, 0), PLACE_NAMES[i % 4], ["Male", "Female", "Other"][i % 3])
+    for i in range(48)
+]
+
+
+def serialize(result):
+    return json.dumps(result, sort_keys=True, default=str)
+
+
+def chart_job(tool, i):
+    """Everything computed from one birth, each result serialized for comparison"""
+    chart = tool.create_birth_chart(*BIRTHS[i])
+    partner = tool.create_birth_chart(*BIRTHS[(i + 1) % len(BIRTHS)])
+    compatibility = tool.analyze_compatibility(chart, partner)
+    prediction = tool.generate_weekly_prediction(chart, datetime.datetime(2026, 1 + i % 12, 5))
+    transits = TransitSearch(tool).find_transits(chart["chart_data"]["planets"], 2461000.5, 2461030.5)
+    lines = Astrocartography(tool).angle_lines(chart["chart_data"]["julian_day"], 5.0)
+    return [serialize(result) for result in (chart, partner, compatibility, prediction, transits, lines)]
+
+
+@pytest.fixture(scope="module")
+def serial_results(tool):
+    results = [chart_job(tool, i) for i in range(len(BIRTHS))]
+    assert all("error" not in json.loads(result[0]) for result in results)
+    return results
+
+
+@pytest.mark.parametrize("threads", [8, 32])
+def test_threaded_results_match_serial(tool, serial_results, threads):
+    # Computed again rather than served from the compatibility cache
+    with astrology_tool._compatibility_cache_lock:
+        astrology_tool._compatibility_cache.clear()
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda i: chart_job(tool, i), range(len(BIRTHS))))
+    assert results == serial_results
+
+
+def test_concurrent_identical_charts_match_serial(tool, serial_results):
+    # Every thread asks for the same few charts at once
+    with ThreadPoolExecutor(16) as pool:
+        charts = list(pool.map(lambda i: tool.create_birth_chart(*BIRTHS[i % 4]), range(64)))
+    assert [serialize(chart) for chart in charts] == [serial_results[i % 4][0] for i in range(64)]
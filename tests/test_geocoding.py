@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+from geocoding import BATCH, INTERACTIVE, GeocodingScheduler, TokenBucket
+
+
+class SlowGeocoder:
+    """Geocode function that holds each request until released, counting the calls per place"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, place):
+        with self.lock:
+            self.calls[place] += 1
+        self.started.set()
+        self.release.wait(5)
+        return SimpleNamespace(latitude=1.0, longitude=2.0)
+
+
+def new_scheduler(geocode, workers=2):
+    return GeocodingScheduler(geocode, bucket=TokenBucket(100000, 100), workers=workers)
+
+
+def test_promoting_a_lookup_in_flight_does_not_send_it_again():
+    geocode = SlowGeocoder()
+    scheduler = new_scheduler(geocode)
+    place = f"Place {uuid.uuid4()}"
+
+    batch = scheduler.submit(place, BATCH)
+    assert geocode.started.wait(5)
+    interactive = scheduler.submit(place, INTERACTIVE)
+    time.sleep(0.2)
+    geocode.release.set()
+
+    assert batch.result(5) == interactive.result(5) == (1.0, 2.0)
+    assert geocode.calls[place] == 1
+    assert scheduler.pending == {}
+
+
+def worker_threads():
+    return sum(thread.name == "geocoder" and thread.is_alive() for thread in threading.enumerate())
+
+
+def test_workers_survive_promotions():
+    geocode = SlowGeocoder()
+    geocode.release.set()
+    threads = worker_threads()
+    scheduler = new_scheduler(geocode)
+    places = [f"Place {uuid.uuid4()}" for _ in range(50)]
+
+    futures = [scheduler.submit(place, BATCH) for place in places]
+    futures += [scheduler.submit(place, INTERACTIVE) for place in places]
+    assert all(future.result(5) == (1.0, 2.0) for future in futures)
+    assert max(geocode.calls.values()) == 1
+    assert worker_threads() == threads + 2
+
+
+def test_interactive_lookups_jump_the_batch_queue():
+    order = []
+    geocode = SlowGeocoder()
+    blocker = f"Blocker {uuid.uuid4()}"
+
+    def record(place):
+        if place != blocker:
+            order.append(place)
+        return geocode(place)
+
+    scheduler = new_scheduler(record, workers=1)
+    first = scheduler.submit(blocker, BATCH)
+    assert geocode.started.wait(5)
+    batch = [scheduler.submit(f"Batch {uuid.uuid4()} {i}", BATCH) for i in range(3)]
+    promoted_place = f"Promoted {uuid.uuid4()}"
+    promoted = [scheduler.submit(promoted_place, BATCH), scheduler.submit(promoted_place, INTERACTIVE)]
+    geocode.release.set()
+
+    for future in [first] + batch + promoted:
+        future.result(5)
+    assert order[0] == promoted_place
+    assert geocode.calls[promoted_place] == 1
@@ -0,0 +1,51 @@
+import os
+import pytest
+from singleflight import SingleFlight, private_directory
+
+
+def chart_shareable(chart):
+    return "error" not in chart
+
+
+def test_results_are_shared_across_processes(tmp_path):
+    # Two groups on one directory stand for two server processes
+    calls = []
+    first = SingleFlight(str(tmp_path / "charts"), shareable=chart_shareable)
+    second = SingleFlight(str(tmp_path / "charts"), shareable=chart_shareable)
+
+    assert first.do("key", lambda: calls.append(1) or {"chart": 1}) == {"chart": 1}
+    assert second.do("key", lambda: calls.append(2) or {"chart": 2}) == {"chart": 1}
+    assert calls == [1]
+
+
+def test_error_results_are_not_shared_across_processes(tmp_path):
+    calls = []
+    first = SingleFlight(str(tmp_path / "charts"), shareable=chart_shareable)
+    second = SingleFlight(str(tmp_path / "charts"), shareable=chart_shareable)
+
+    assert first.do("key", lambda: calls.append(1) or {"error": "geocoder down"}) == {"error": "geocoder down"}
+    assert second.do("key", lambda: calls.append(2) or {"chart": 2}) == {"chart": 2}
+    assert calls == [1, 2]
+
+
+def test_result_files_are_private(tmp_path):
+    flight = SingleFlight(str(tmp_path / "charts"))
+    flight.do("key", lambda: 1)
+    assert oct(os.stat(tmp_path / "charts").st_mode & 0o777) == oct(0o700)
+    for name in os.listdir(tmp_path / "charts"):
+        assert os.stat(tmp_path / "charts" / name).st_mode & 0o077 == 0
+
+
+def test_shared_lock_directory_is_rejected(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir(mode=0o777)
+    os.chmod(directory, 0o777)
+    with pytest.raises(ValueError, match="chmod 700"):
+        SingleFlight(str(directory))
+
+
+def test_symlinked_lock_directory_is_rejected(tmp_path):
+    (tmp_path / "target").mkdir(mode=0o700)
+    os.symlink(tmp_path / "target", tmp_path / "link")
+    with pytest.raises(ValueError, match="not a directory"):
+        private_directory(str(tmp_path / "link"))
@@ -0,0 +1,37 @@
+import datetime
+import numpy as np
+import pytest
+import swisseph as swe
+from astrology_tool import ASPECTS
+from transit_alerts import PLANET_NAMES, TRANSIT_ORB_FACTOR, NatalIndex, hit_records
+
+USERS = 2000
+
+
+def aspect_loop(user_ids, longitudes, day_planets):
+    """Transit hits found like the weekly prediction: every transit, natal planet and aspect of every user"""
+    hits = []
+    for user, natal in zip(user_ids, longitudes):
+        for transit_name, transit in day_planets.items():
+            for natal_index, natal_longitude in enumerate(natal):
+                angle = abs(transit["longitude"] - natal_longitude)
+                if angle > 180:
+                    angle = 360 - angle
+                for aspect_name, aspect in ASPECTS.items():
+                    if abs(angle - aspect["angle"]) <= aspect["orb"] * TRANSIT_ORB_FACTOR:
+                        hits.append((user, transit_name, PLANET_NAMES[natal_index], aspect_name))
+    return sorted(hits)
+
+
+@pytest.mark.parametrize("day", range(0, 360, 36))
+def test_transit_hits_match_the_aspect_loop(tool, day):
+    random = np.random.default_rng(day)
+    user_ids = np.arange(USERS)
+    longitudes = random.uniform(0, 360, (USERS, len(PLANET_NAMES)))
+    date = datetime.date(2026, 1, 1) + datetime.timedelta(days=day)
+    day_planets = tool.get_daily_transits(swe.julday(date.year, date.month, date.day, 12.0))
+
+    hits = NatalIndex(user_ids, longitudes).transit_hits(day_planets)
+    found = sorted((record["user"], record["transit_planet"], record["natal_planet"], record["aspect"])
+                   for record in hit_records(hits))
+    assert found == aspect_loop(user_ids, longitudes, day_planets)
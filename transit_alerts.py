@@ -0,0 +1,180 @@
+import datetime
+import numpy as np
+import pyarrow.parquet as pq
+import swisseph as swe
+from astrology_tool import ASPECTS, PLANETS
+
+
+PLANET_NAMES = tuple(PLANETS.values())
+ASPECT_NAMES = tuple(ASPECTS.keys())
+
+# Transit orbs are tighter than natal ones, as in generate_weekly_prediction
+TRANSIT_ORB_FACTOR = 0.8
+
+# Range queries are widened by this much and then filtered with the exact orb test,
+# so hits match the per-user aspect loop exactly at the orb boundaries
+RANGE_MARGIN_DEGREES = 1e-9
+
+
+class NatalIndex:
+    def __init__(self, user_ids, longitudes):
+        """Inverted index of many users' natal planet longitudes
+
+        For every natal planet the users are kept sorted by longitude, so all users
+        with that planet in an arc of the zodiac are found with two binary searches.
+        A transiting planet in aspect to natal planets within orb is such an arc (one
+        on each side for aspects other than conjunction and opposition), which makes
+        a day's alerts for N users cost O(log N + hits) per transit, aspect and natal
+        planet instead of a loop over every user.
+
+        Args:
+            user_ids: One id per user, shape (n,)
+            longitudes: Natal longitudes in degrees, shape (n, len(PLANET_NAMES)) in PLANET_NAMES order
+        """
+        self.user_ids = np.asarray(user_ids)
+        longitudes = np.mod(np.asarray(longitudes, dtype=float), 360.0)
+        if longitudes.shape != (len(self.user_ids), len(PLANET_NAMES)):
+            raise ValueError(f"Expected longitudes of shape ({len(self.user_ids)}, {len(PLANET_NAMES)}), "
+                             f"got {longitudes.shape}")
+
+        index_type = np.int32 if len(self.user_ids) < 2 ** 31 else np.int64
+        self.order = []
+        self.sorted_longitudes = []
+        for planet in range(len(PLANET_NAMES)):
+            order = np.argsort(longitudes[:, planet], kind="stable").astype(index_type)
+            self.order.append(order)
+            self.sorted_longitudes.append(longitudes[order, planet])
+
+    @classmethod
+    def from_charts(cls, charts):
+        """Build the index from (user_id, chart) pairs, charts as returned by create_birth_chart"""
+        user_ids = []
+        longitudes = []
+        for user_id, chart in charts:
+            planets = chart["chart_data"]["planets"]
+            user_ids.append(user_id)
+            longitudes.append([planets[name]["longitude"] for name in PLANET_NAMES])
+        return cls(user_ids, np.array(longitudes, dtype=float).reshape(-1, len(PLANET_NAMES)))
+
+    @classmethod
+    def from_parquet(cls, directory, id_column="id"):
+        """Build the index from a chart store written by ChartParquetWriter"""
+        columns = [f"{name.lower()}_longitude" for name in PLANET_NAMES]
+        table = pq.read_table(f"{directory}/charts.parquet", columns=[id_column] + columns)
+        longitudes = np.column_stack([table.column(column).to_numpy() for column in columns])
+        return cls(table.column(id_column).to_numpy(zero_copy_only=False), longitudes)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def users_in_arc(self, planet, start, width):
+        """Users whose natal planet (index into PLANET_NAMES) lies in an arc of the zodiac
+
+        The arc runs from start for width degrees, wrapping at 0 Aries.
+
+        Returns:
+            Tuple (positions, longitudes): the users' positions in the index and their natal longitudes
+        """
+        longitudes = self.sorted_longitudes[planet]
+        start = start % 360.0
+        end = start + width
+        if end < 360.0:
+            ranges = [(start, end)]
+        else:
+            ranges = [(start, 360.0), (0.0, end - 360.0)]
+        bounds = [(np.searchsorted(longitudes, low, "left"), np.searchsorted(longitudes, high, "right"))
+                  for low, high in ranges]
+        if len(bounds) == 1:
+            (first, last), = bounds
+            return self.order[planet][first:last], longitudes[first:last]
+        return (np.concatenate([self.order[planet][first:last] for first, last in bounds]),
+                np.concatenate([longitudes[first:last] for first, last in bounds]))
+
+    def transit_hits(self, day_planets, next_day_planets=None, transit_planets=None, orb_factor=TRANSIT_ORB_FACTOR):
+        """Find every user with a natal planet in aspect to a transiting planet
+
+        Args:
+            day_planets: Transiting positions ({planet: {"longitude": ...}}), e.g. from get_daily_transits
+            next_day_planets: Positions one day later; when given, each hit says whether it is applying
+            transit_planets: Transiting planets to check (default: all in day_planets)
+            orb_factor: Share of each aspect's natal orb used for transits
+
+        Returns:
+            Dictionary of equal-length arrays: "user" (ids), "transit_planet", "natal_planet"
+            and "aspect" (indices into PLANET_NAMES and ASPECT_NAMES), "orb" and, with
+            next_day_planets, "applying"
+        """
+        parts = []
+        for transit_name in transit_planets or day_planets:
+            transit_longitude = day_planets[transit_name]["longitude"]
+            for aspect_index, aspect_name in enumerate(ASPECT_NAMES):
+                aspect_angle = ASPECTS[aspect_name]["angle"]
+                orb = ASPECTS[aspect_name]["orb"] * orb_factor
+                # Natal points at the aspect angle on either side of the transit. For 0 and 180
+                # both sides are the same point, which must be searched once: the two sums can
+                # differ in the last bit, and two arcs would return every user twice.
+                centers = [(transit_longitude + aspect_angle) % 360.0]
+                if aspect_angle % 180:
+                    centers.append((transit_longitude - aspect_angle) % 360.0)
+                for natal_planet in range(len(PLANET_NAMES)):
+                    arcs = [self.users_in_arc(natal_planet, center - orb - RANGE_MARGIN_DEGREES,
+                                              2 * (orb + RANGE_MARGIN_DEGREES))
+                            for center in centers]
+                    positions = np.concatenate([arc[0] for arc in arcs])
+                    if not len(positions):
+                        continue
+
+                    # Exact test of the per-user loop: separation folded to 0-180 degrees
+                    natal_longitudes = np.concatenate([arc[1] for arc in arcs])
+                    angle = np.abs(transit_longitude - natal_longitudes)
+                    angle = np.where(angle > 180, 360 - angle, angle)
+                    hit_orbs = np.abs(angle - aspect_angle)
+                    hit = hit_orbs <= orb
+                    positions, natal_longitudes, angle, hit_orbs = (
+                        positions[hit], natal_longitudes[hit], angle[hit], hit_orbs[hit]
+                    )
+                    part = {
+                        "position": positions,
+                        "transit_planet": np.full(len(positions), PLANET_NAMES.index(transit_name), dtype=np.int8),
+                        "natal_planet": np.full(len(positions), natal_planet, dtype=np.int8),
+                        "aspect": np.full(len(positions), aspect_index, dtype=np.int8),
+                        "orb": hit_orbs
+                    }
+                    if next_day_planets is not None:
+                        tomorrow_angle = np.abs(next_day_planets[transit_name]["longitude"] - natal_longitudes)
+                        tomorrow_angle = np.where(tomorrow_angle > 180, 360 - tomorrow_angle, tomorrow_angle)
+                        part["applying"] = np.abs(tomorrow_angle - aspect_angle) < hit_orbs
+                    parts.append(part)
+
+        fields = ["position", "transit_planet", "natal_planet", "aspect", "orb"]
+        if next_day_planets is not None:
+            fields.append("applying")
+        hits = {field: np.concatenate([part[field] for part in parts]) if parts else np.array([]) for field in fields}
+        hits["user"] = self.user_ids[hits.pop("position").astype(np.int64)]
+        return hits
+
+
+def hit_records(hits):
+    """Turn the arrays from transit_hits into one dictionary per hit, like the weekly prediction's aspects"""
+    columns = {field: values.tolist() for field, values in hits.items()}
+    for index, user in enumerate(columns["user"]):
+        record = {
+            "user": user,
+            "transit_planet": PLANET_NAMES[columns["transit_planet"][index]],
+            "natal_planet": PLANET_NAMES[columns["natal_planet"][index]],
+            "aspect": ASPECT_NAMES[columns["aspect"][index]],
+            "orb": round(columns["orb"][index], 2)
+        }
+        if "applying" in columns:
+            record["applying"] = columns["applying"][index]
+        yield record
+
+
+def daily_alerts(tool, index, date=None, transit_planets=None):
+    """Transit hits for every user in the index on a date (at noon, as in the weekly prediction)
+
+    Transiting positions come from the tool's shared transit table.
+    """
+    date = date or datetime.date.today()
+    day_jd = swe.julday(date.year, date.month, date.day, 12.0)
+    return index.transit_hits(tool.get_daily_transits(day_jd), tool.get_daily_transits(day_jd + 1), transit_planets)
@@ -0,0 +1,187 @@
+import datetime
+import swisseph as swe
+import ephemeris
+
+
+# Sampling step in days for each transiting planet. Between two samples a planet
+# moving in one direction crosses an aspect point at most once, and moves far less
+# than 180 degrees, so a sign change of the wrapped separation brackets a crossing.
+# Stations (where the direction changes) are located separately and split the step.
+SAMPLE_STEP_DAYS = {
+    "Sun": 2.0,
+    "Moon": 0.5,
+    "Mercury": 1.0,
+    "Venus": 2.0,
+    "Mars": 3.0,
+    "Jupiter": 8.0,
+    "Saturn": 8.0,
+    "Uranus": 10.0,
+    "Neptune": 10.0,
+    "Pluto": 10.0
+}
+
+# Exact times are refined to about ten seconds
+TIME_TOLERANCE_DAYS = 1e-4
+
+
+def wrap_degrees(angle):
+    """Wrap an angle in degrees to the range [-180, 180)"""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def refine_root(func, t_a, t_b, f_a, f_b, tolerance=TIME_TOLERANCE_DAYS, max_iterations=60):
+    """Find a root of func bracketed by t_a and t_b
+
+    func(t) returns (value, slope). When a slope is available a Newton step is
+    tried and kept only if it stays inside the bracket, otherwise the bracket is
+    bisected, so convergence is guaranteed.
+    """
+    if f_a == 0:
+        return t_a
+    if f_b == 0:
+        return t_b
+
+    # Orient the bracket so the function is negative at t_neg
+    if f_a < 0:
+        t_neg, t_pos = t_a, t_b
+    else:
+        t_neg, t_pos = t_b, t_a
+
+    # Start from the linear interpolation between the bracket ends
+    t = t_a - f_a * (t_b - t_a) / (f_b - f_a)
+
+    for _ in range(max_iterations):
+        value, slope = func(t)
+        if value == 0:
+            return t
+        if value < 0:
+            t_neg = t
+        else:
+            t_pos = t
+
+        low, high = min(t_neg, t_pos), max(t_neg, t_pos)
+        t_next = t - value / slope if slope else None
+        if t_next is None or not low < t_next < high:
+            t_next = 0.5 * (low + high)
+
+        if abs(t_next - t) < tolerance or high - low < tolerance:
+            return t_next
+        t = t_next
+
+    return t
+
+
+def julian_day_to_datetime(jd):
+    """Convert a Julian day (UT) to a UTC datetime"""
+    year, month, day, hours = swe.revjul(jd)
+    return (datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+            + datetime.timedelta(seconds=round(hours * 3600)))
+
+
+class TransitSearch:
+    def __init__(self, tool):
+        self.tool = tool
+        self.ephemeris_calls = 0
+
+    def position(self, jd, planet_id):
+        """Ecliptic longitude and speed of a planet at a Julian day"""
+        self.ephemeris_calls += 1
+        result, _ = ephemeris.calc_ut(jd, planet_id, swe.FLG_SWIEPH | swe.FLG_SPEED)
+        return result[0], result[3]
+
+    def find_station(self, planet_id, t_a, t_b, speed_a, speed_b):
+        """Locate the time a planet's longitude speed changes sign between t_a and t_b"""
+        return refine_root(
+            lambda t: (self.position(t, planet_id)[1], None),
+            t_a, t_b, speed_a, speed_b
+        )
+
+    def sample_segments(self, planet_id, start_jd, end_jd, step):
+        """Sample a planet over a time range, split into segments of one-directional motion
+
+        Returns a list of (t_a, lon_a, speed_a, t_b, lon_b, speed_b) tuples.
+        """
+        segments = []
+        t_a = start_jd
+        lon_a, speed_a = self.position(t_a, planet_id)
+
+        while t_a < end_jd:
+            t_b = min(t_a + step, end_jd)
+            lon_b, speed_b = self.position(t_b, planet_id)
+
+            if (speed_a < 0) != (speed_b < 0):
+                # The planet stations inside this step: split it at the station
+                t_s = self.find_station(planet_id, t_a, t_b, speed_a, speed_b)
+                lon_s, speed_s = self.position(t_s, planet_id)
+                segments.append((t_a, lon_a, speed_a, t_s, lon_s, speed_s))
+                segments.append((t_s, lon_s, speed_s, t_b, lon_b, speed_b))
+            else:
+                segments.append((t_a, lon_a, speed_a, t_b, lon_b, speed_b))
+
+            t_a, lon_a, speed_a = t_b, lon_b, speed_b
+
+        return segments
+
+    def aspect_targets(self, natal_planets):
+        """List the ecliptic points where a transiting planet makes an exact aspect to a natal planet"""
+        targets = []
+        for natal_planet, natal_data in natal_planets.items():
+            natal_longitude = natal_data["longitude"]
+            for aspect_name, aspect_info in self.tool.aspects.items():
+                angle = aspect_info["angle"]
+                offsets = [angle] if angle in (0, 180) else [angle, -angle]
+                for offset in offsets:
+                    targets.append((natal_planet, aspect_name, (natal_longitude + offset) % 360))
+        return targets
+
+    def find_transits(self, natal_planets, start_jd, end_jd, transit_planets=None):
+        """Find the exact time of every transit aspect to natal planets between two Julian days
+
+        Args:
+            natal_planets: Natal planet positions (chart_data["planets"] from create_birth_chart)
+            start_jd: Start of the search range (Julian day, UT)
+            end_jd: End of the search range (Julian day, UT)
+            transit_planets: Optional list of transiting planet names to search (default all)
+
+        Returns:
+            List of transit events sorted by exact time
+        """
+        self.ephemeris_calls = 0
+        targets = self.aspect_targets(natal_planets)
+        events = []
+
+        for planet_id, planet_name in self.tool.planets.items():
+            if transit_planets is not None and planet_name not in transit_planets:
+                continue
+
+            step = SAMPLE_STEP_DAYS.get(planet_name, 1.0)
+            for t_a, lon_a, speed_a, t_b, lon_b, speed_b in self.sample_segments(planet_id, start_jd, end_jd, step):
+                for natal_planet, aspect_name, target in targets:
+                    f_a = wrap_degrees(lon_a - target)
+                    f_b = wrap_degrees(lon_b - target)
+
+                    # A crossing changes sign through zero; a jump across +-180 does not count
+                    if (f_a < 0) == (f_b < 0) or abs(f_a) + abs(f_b) >= 180:
+                        continue
+
+                    exact_jd = refine_root(
+                        lambda t: self.separation(t, planet_id, target),
+                        t_a, t_b, f_a, f_b
+                    )
+                    events.append({
+                        "transit_planet": planet_name,
+                        "natal_planet": natal_planet,
+                        "aspect": aspect_name,
+                        "julian_day": exact_jd,
+                        "exact_time": julian_day_to_datetime(exact_jd).isoformat(),
+                        "retrograde": speed_a + speed_b < 0
+                    })
+
+        events.sort(key=lambda event: event["julian_day"])
+        print(f"Exact transits found: {len(events)} ({self.ephemeris_calls} ephemeris calls)")
+        return events
+
+    def separation(self, jd, planet_id, target):
+        """Signed distance from a target point and its rate of change, for root finding"""
+        longitude, speed = self.position(jd, planet_id)
+        return wrap_degrees(longitude - target), speed